@@ -0,0 +1,58 @@
+# Cost of a lobby update (TitleView.add_player_id with six players) loading its images from disk every time, as
+# before clueless.client.assets, against finding them in the cache after the startup preload.
+# Uses SDL's dummy video driver, so it runs headless.
+# Run from the repository root: python benchmarks/asset_cache_benchmark.py [updates]
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "clueless" / "client"))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.chdir(ROOT / "clueless" / "client")  # elements load their assets from ../resources
+
+import pygame
+import pygame_gui
+
+from clueless.client.assets import IMAGES
+from clueless.client.view import View, TitleView, preloaded_images
+from clueless.model.board_enums import Character
+from clueless.model.player import PlayerID
+
+
+class IdleDelegate(TitleView.Delegate):
+    pass
+
+
+def lobby_updates(view: TitleView, updates: int, cold: bool) -> float:
+    players = [(PlayerID(character, f"player_{character.name.lower()}"), True) for character in Character]
+    start = time.perf_counter()
+    for _ in range(updates):
+        if cold:
+            IMAGES.clear()
+        view.add_player_id(players, players[0][0])
+    return (time.perf_counter() - start) / updates
+
+
+def main(updates: int):
+    pygame.init()
+    pygame.display.set_mode(View.SCREEN_SIZE)
+    view = TitleView(pygame.display.get_surface(), "127.0.0.1", pygame_gui.UIManager(View.SCREEN_SIZE),
+                     IdleDelegate())
+    cold = lobby_updates(view, updates, cold=True)
+    IMAGES.clear()
+    start = time.perf_counter()
+    IMAGES.preload(preloaded_images()).join()
+    preload = time.perf_counter() - start
+    hits, misses = IMAGES.hits, IMAGES.misses
+    warm = lobby_updates(view, updates, cold=False)
+    print(f"lobby update: {cold * 1000:.3f} ms loading from disk, {warm * 1000:.3f} ms cached "
+          f"({cold / warm:.0f}x)")
+    print(f"preload of {len(preloaded_images())} images: {preload * 1000:.1f} ms on a background thread")
+    print(f"after preload: {IMAGES.hits - hits} hits, {IMAGES.misses - misses} misses; {IMAGES.stats()}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,101 @@
+# Bulk Board.get_movement_options queries: the previous per-direction match + ValueError + print implementation
+# against the precomputed MOVEMENT_GRAPH lookup and CompactBoard, plus per-board memory and copy cost.
+# Run from the repository root: python benchmarks/board_benchmark.py
+import contextlib
+import copy
+import io
+import random
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from clueless.model.board import Board
+from clueless.model.compact_board import CompactBoard
+from clueless.model.board_enums import Character, Direction
+from clueless.model.player import PlayerID
+
+QUERIES = 100_000
+BOARDS = 1_000
+
+
+class LegacyBoard(Board):
+    # copy of the movement code MOVEMENT_GRAPH replaced
+    def get_movement_options(self, player_id):
+        player_token = self.player_tokens[player_id]
+        valid_directions = []
+        for direction in Direction:
+            try:
+                new_position = self.calculate_new_position(player_token.position, direction)
+                if self.grid[new_position[0]][new_position[1]].can_add():
+                    valid_directions.append((direction, new_position))
+            except ValueError:
+                print(f"Excluding {direction.name}")
+        return valid_directions
+
+    @staticmethod
+    def calculate_new_position(from_position, direction):
+        new_position = from_position
+        match direction:
+            case Direction.UP if from_position[0] > 0:
+                new_position = (from_position[0] - 1, from_position[1])
+            case Direction.DOWN if from_position[0] < 4:
+                new_position = (from_position[0] + 1, from_position[1])
+            case Direction.LEFT if from_position[1] > 0:
+                new_position = (from_position[0], from_position[1] - 1)
+            case Direction.RIGHT if from_position[1] < 4:
+                new_position = (from_position[0], from_position[1] + 1)
+            case Direction.SECRET_PASSAGEWAY if from_position == (0, 0) or from_position == (4, 4):
+                new_position = (4 - from_position[0], 4 - from_position[1])
+            case Direction.SECRET_PASSAGEWAY if from_position == (0, 4) or from_position == (4, 0):
+                new_position = (from_position[1], from_position[0])
+            case _:
+                raise ValueError("Invalid direction")
+        return new_position
+
+
+def scattered_board(board_type: type[Board], rng: random.Random) -> Board:
+    players = [PlayerID(character, character.name) for character in Character]
+    board = board_type(players=players)
+    rooms = [(row, column) for row in (0, 2, 4) for column in (0, 2, 4)]
+    board.set_positions({player_id: rng.choice(rooms) for player_id in players[:3]})
+    return board
+
+
+def allocated_per_board(build) -> float:
+    tracemalloc.start()
+    boards = [build() for _ in range(BOARDS)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del boards
+    return size / BOARDS
+
+
+def main():
+    players = [PlayerID(character, character.name) for character in Character]
+    queries = [random.Random(i).choice(players) for i in range(QUERIES)]
+    for board_type in (LegacyBoard, Board, CompactBoard):
+        board = scattered_board(board_type, random.Random(0))
+        with contextlib.redirect_stdout(io.StringIO()):
+            elapsed = timeit.timeit(lambda: [board.get_movement_options(p) for p in queries], number=1)
+        print(f"{board_type.__name__:<12}{QUERIES / elapsed:>12,.0f} queries/s{elapsed / QUERIES * 1e9:>8.0f} ns/query")
+    legacy, board = scattered_board(LegacyBoard, random.Random(1)), scattered_board(Board, random.Random(1))
+    compact = scattered_board(CompactBoard, random.Random(1))
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert all(legacy.get_movement_options(p) == board.get_movement_options(p) == compact.get_movement_options(p)
+                   for p in players)
+
+    print()
+    print(f"{'':<14}{'bytes/board':>12}{'bytes/copy':>12}{'copy':>10}")
+    for board in (board, compact):
+        clone = board.copy if isinstance(board, CompactBoard) else lambda: copy.deepcopy(board)
+        new_size = allocated_per_board(lambda: type(board)(players))
+        copy_size = allocated_per_board(clone)
+        copy_time = timeit.timeit(clone, number=BOARDS) / BOARDS
+        print(f"{type(board).__name__:<14}{new_size:>12,.0f}{copy_size:>12,.0f}{copy_time * 1e6:>8.1f}us")
+
+
+if __name__ == '__main__':
+    main()
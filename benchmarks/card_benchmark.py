@@ -0,0 +1,57 @@
+# Card matching and accusation checks: the previous string comparisons against interned cards and bitmasks.
+# Run from the repository root: python benchmarks/card_benchmark.py
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from clueless.model.board_enums import Character, Weapon, Location, CardType
+from clueless.model.card import CARDS, card_mask, suggestion_mask, cards_in
+
+ROUNDS = 100_000
+
+
+def legacy_matches(card, suggestion):
+    # copy of Card.matches before card ids
+    if card.card_type == CardType.CHARACTER:
+        return card.card_value == suggestion[0].value
+    if card.card_type == CardType.WEAPON:
+        return card.card_value == suggestion[1].value
+    if card.card_type == CardType.LOCATION:
+        return card.card_value == suggestion[2].value
+
+
+def legacy_accuse(accusation, winning_combination):
+    character, weapon, location = accusation
+    return (character.value, location.value, weapon.value) == (
+        winning_combination[0].card_value, winning_combination[1].card_value, winning_combination[2].card_value)
+
+
+def main():
+    rng = random.Random(10)
+    hands = [rng.sample(CARDS, 4) for _ in range(ROUNDS)]
+    hand_masks = [card_mask(hand) for hand in hands]
+    suggestions = [(rng.choice(list(Character)), rng.choice(list(Weapon)), rng.choice(list(Location)))
+                   for _ in range(ROUNDS)]
+    winning = (CARDS[0], CARDS[12], CARDS[6])
+    winning_mask = card_mask(winning)
+
+    legacy = timeit.timeit(lambda: [[card for card in hand if legacy_matches(card, s)]
+                                    for hand, s in zip(hands, suggestions)], number=1)
+    masks = timeit.timeit(lambda: [cards_in(mask & suggestion_mask(s))
+                                   for mask, s in zip(hand_masks, suggestions)], number=1)
+    print(f"{'matching hand':<16}{legacy / ROUNDS * 1e9:>8.0f} ns -> {masks / ROUNDS * 1e9:>6.0f} ns")
+
+    legacy = timeit.timeit(lambda: [legacy_accuse(s, winning) for s in suggestions], number=1)
+    masks = timeit.timeit(lambda: [suggestion_mask(s) == winning_mask for s in suggestions], number=1)
+    print(f"{'accusation':<16}{legacy / ROUNDS * 1e9:>8.0f} ns -> {masks / ROUNDS * 1e9:>6.0f} ns")
+
+    legacy = timeit.timeit(lambda: [list(Character).index(c) for c, _, _ in suggestions], number=1)
+    table = timeit.timeit(lambda: [c.ordinal_value for c, _, _ in suggestions], number=1)
+    print(f"{'ordinal_value':<16}{legacy / ROUNDS * 1e9:>8.0f} ns -> {table / ROUNDS * 1e9:>6.0f} ns")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+# Compares the binary codec against the previous pickle + hex format.
+# Run from the repository root: python benchmarks/codec_benchmark.py
+import pickle
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PodSixNet.rencode import dumps
+
+from clueless.messages.messages import BaseMessage, JoinGame, Ready, Move, Suggest, Disprove, EndTurn, \
+    AssignPlayerID, UpdatePlayers, StartGame, DealCards, YourTurn, RequestDisprove, Disproved, Accuse, EndGame
+from clueless.model.board import Board
+from clueless.model.board_enums import Character, Weapon, Location
+from clueless.model.card import Card
+from clueless.model.player import PlayerID
+
+ITERATIONS = 2000
+
+
+def legacy_serialize(message: BaseMessage):
+    return {"action": message.name, "uuid": message.uuid, "payload": pickle.dumps(message).hex()}
+
+
+def legacy_deserialize(data):
+    return pickle.loads(bytes.fromhex(data["payload"]))
+
+
+def sample_messages() -> list[BaseMessage]:
+    players = [PlayerID(character, f"player_{character.name.lower()}") for character in Character]
+    suggest = Suggest(players[0], (Character.PLUM, Weapon.ROPE, Location.STUDY))
+    accuse = Accuse(players[1], (Character.GREEN, Weapon.DAGGER, Location.KITCHEN))
+    return [
+        JoinGame(nickname="player_scarlet"),
+        Ready(),
+        Move(players[0], (0, 4)),
+        suggest,
+        Disprove(players[2], Card.new_weapon_card(Weapon.ROPE), suggest),
+        Disproved(players[2], players[0]),
+        EndTurn(players[0]),
+        AssignPlayerID(players[0]),
+        UpdatePlayers([(player_id, True) for player_id in players]),
+        StartGame(Board(players=players)),
+        DealCards([Card.new_character_card(Character.WHITE), Card.new_weapon_card(Weapon.WRENCH),
+                   Card.new_location_card(Location.HALL)]),
+        YourTurn(12, players[3]),
+        RequestDisprove(suggest),
+        accuse,
+        EndGame(accuse),
+    ]
+
+
+def main():
+    print(f"{'message':<18}{'legacy B':>10}{'binary B':>10}{'legacy enc+dec/s':>18}{'binary enc+dec/s':>18}")
+    total_legacy = total_binary = 0
+    for message in sample_messages():
+        legacy_bytes = len(dumps(legacy_serialize(message)))
+        binary_bytes = len(dumps(message.serialize()))
+        total_legacy += legacy_bytes
+        total_binary += binary_bytes
+        legacy_time = timeit.timeit(lambda: legacy_deserialize(legacy_serialize(message)), number=ITERATIONS)
+        binary_time = timeit.timeit(lambda: BaseMessage.deserialize(message.serialize()), number=ITERATIONS)
+        print(f"{type(message).__name__:<18}{legacy_bytes:>10}{binary_bytes:>10}"
+              f"{ITERATIONS / legacy_time:>18,.0f}{ITERATIONS / binary_time:>18,.0f}")
+    print(f"{'TOTAL':<18}{total_legacy:>10}{total_binary:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+# Many GameConnections in one process: N sessions in a ConnectionGroup join a local server and ready up in lobbies
+# of 6, then every session sends Moves and waits for the broadcast back. Reports setup time and round-trip latency.
+# Run from the repository root: python benchmarks/connection_group_benchmark.py [sessions]
+import contextlib
+import io
+import os
+import queue
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from clueless.client.connection import ConnectionGroup
+from clueless.messages.messages import AssignPlayerID, Move, YourTurn
+
+from server_runtime_benchmark import wait_for_port
+
+PORT = 10412
+LOBBY = 6
+ROUNDS = 20
+
+
+def drain(session_queue: queue.SimpleQueue) -> list:
+    messages = []
+    while not session_queue.empty():
+        messages.append(session_queue.get())
+    return messages
+
+
+def main(sessions: int):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(ROOT), str(ROOT / "clueless" / "server")]))
+    server = subprocess.Popen([sys.executable, str(ROOT / "clueless" / "server" / "server.py"), "--port", str(PORT)],
+                              env=env, stdout=subprocess.DEVNULL)
+    try:
+        wait_for_port(PORT)
+        group = ConnectionGroup()
+        queues = [queue.SimpleQueue() for _ in range(sessions)]
+        player_ids = [None] * sessions
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            connections = [group.connect("127.0.0.1", PORT, q) for q in queues]
+            # join one lobby at a time, so every lobby is full before its players ready up
+            for lobby_start in range(0, sessions, LOBBY):
+                lobby = range(lobby_start, min(sessions, lobby_start + LOBBY))
+                for i in lobby:
+                    connections[i].join_game(nickname=f"session-{i}")
+                while any(player_ids[i] is None for i in lobby):
+                    group.update()
+                    for i in lobby:
+                        for message in drain(queues[i]):
+                            if isinstance(message, AssignPlayerID):
+                                player_ids[i] = message.player_id
+            for c in connections:
+                c.ready()
+            started = set()
+            while len(started) < sessions:
+                group.update()
+                for i, q in enumerate(queues):
+                    if any(isinstance(message, YourTurn) for message in drain(q)):
+                        started.add(i)
+            setup = time.perf_counter() - start
+
+            latencies = []
+            for round_number in range(ROUNDS):
+                sent = {}
+                for i, c in enumerate(connections):
+                    move = Move(player_ids[i], (round_number % 5, 0))
+                    sent[(i, move.uuid)] = time.perf_counter()
+                    c.Send(move)
+                while sent:
+                    group.update()
+                    for i, q in enumerate(queues):
+                        for message in drain(q):
+                            if (i, message.uuid) in sent:
+                                latencies.append(time.perf_counter() - sent.pop((i, message.uuid)))
+
+        latencies.sort()
+        print(f"{sessions} sessions in one process, {len(group.socket_map)} sockets in one poll")
+        print(f"connect + join + start: {setup:.2f}s")
+        print(f"move round trip: p50 {statistics.median(latencies) * 1000:.2f} ms, "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms over {len(latencies)} moves")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
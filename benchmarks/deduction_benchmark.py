@@ -0,0 +1,72 @@
+# DeductionEngine cost per observed message and per solution() call, and how many suggestions it takes for a
+# player to be left with a single hypothesis when everyone suggests at random.
+# Run from the repository root: python benchmarks/deduction_benchmark.py [games]
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from clueless.messages.messages import Suggest, Disprove
+from clueless.model.board_enums import Character, Weapon, Location
+from clueless.model.card import CARDS, CHARACTER_CARDS, WEAPON_CARDS, LOCATION_CARDS, suggestion_mask, cards_in
+from clueless.model.deduction import DeductionEngine
+from clueless.model.player import PlayerID
+
+PLAYERS = 4
+MAX_SUGGESTIONS = 500
+
+
+def play(rng: random.Random) -> (int, list[float]):
+    # Deals like GameManager and answers suggestions like the server-resolved disprove mode
+    players = [PlayerID(character, character.name) for character in list(Character)[:PLAYERS]]
+    winning = (rng.choice(CHARACTER_CARDS), rng.choice(WEAPON_CARDS), rng.choice(LOCATION_CARDS))
+    cards = [card for card in CARDS if card not in winning]
+    rng.shuffle(cards)
+    hands = [cards[i::PLAYERS] for i in range(PLAYERS)]
+    engine = DeductionEngine(players, players[0], hands[0])
+    observe_times = []
+    for turn in range(MAX_SUGGESTIONS):
+        suggester = turn % PLAYERS
+        suggestion = (rng.choice(list(Character)), rng.choice(list(Weapon)), rng.choice(list(Location)))
+        suggest = Suggest(players[suggester], suggestion)
+        disprove = Disprove(players[suggester], None, suggest)
+        for offset in range(1, PLAYERS):
+            holder = (suggester + offset) % PLAYERS
+            matching = cards_in(sum(card.bit for card in hands[holder]) & suggestion_mask(suggestion))
+            if matching:
+                disprove = Disprove(players[holder], rng.choice(matching), suggest)
+                break
+        start = time.perf_counter()
+        engine.observe(disprove)
+        observe_times.append(time.perf_counter() - start)
+        if engine.solution():
+            assert engine.solution() == tuple(card.member for card in winning)
+            return turn + 1, observe_times
+    return MAX_SUGGESTIONS, observe_times
+
+
+def main(games: int):
+    rng = random.Random(11)
+    turns, observe_times = [], []
+    for _ in range(games):
+        taken, times = play(rng)
+        turns.append(taken)
+        observe_times.extend(times)
+
+    engine = DeductionEngine([PlayerID(c, c.name) for c in Character], PlayerID(Character.SCARLET, "SCARLET"), [])
+    engine.hypotheses = 1 << 42
+    start = time.perf_counter()
+    for _ in range(100_000):
+        engine.solution()
+    solution_time = (time.perf_counter() - start) / 100_000
+
+    print(f"{games} games, {PLAYERS} players")
+    print(f"suggestions until solved: mean {sum(turns) / games:.1f}, max {max(turns)}")
+    print(f"observe(Disprove): mean {sum(observe_times) / len(observe_times) * 1e6:.1f} us")
+    print(f"solution(): {solution_time * 1e9:.0f} ns")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,80 @@
+# Per-message dispatch cost: the old if/elif chain + f-string/getattr lookup against the registry's dict lookups.
+# Only the dispatch is timed, messages are already deserialized.
+# Run from the repository root: python benchmarks/dispatch_benchmark.py
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from clueless.messages.messages import AssignPlayerID, UpdatePlayers, StartGame, DealCards, YourTurn, EndGame, \
+    Move, Suggest, Disprove, RequestDisprove, Accuse, EndTurn
+from clueless.messages.registry import MESSAGES, handles, dispatch_table
+
+ITERATIONS = 200_000
+CLIENT_BOUND = [AssignPlayerID, UpdatePlayers, StartGame, DealCards, YourTurn, EndGame, Move, Suggest, Disprove,
+                RequestDisprove, Accuse, EndTurn]
+
+
+def resolve_with_if_chain(action_name):
+    # copy of the GameConnection.Network chain this replaced
+    if action_name == AssignPlayerID.name:
+        return AssignPlayerID
+    elif action_name == UpdatePlayers.name:
+        return UpdatePlayers
+    elif action_name == StartGame.name:
+        return StartGame
+    elif action_name == DealCards.name:
+        return DealCards
+    elif action_name == YourTurn.name:
+        return YourTurn
+    elif action_name == EndGame.name:
+        return EndGame
+    elif action_name == Move.client_action_name():
+        return Move
+    elif action_name == Suggest.client_action_name():
+        return Suggest
+    elif action_name == Disprove.client_action_name():
+        return Disprove
+    elif action_name == RequestDisprove.name:
+        return RequestDisprove
+    elif action_name == Accuse.client_action_name():
+        return Accuse
+    elif action_name == EndTurn.client_action_name():
+        return EndTurn
+
+
+class Handlers:
+    def __init__(self):
+        self.handled = 0
+        self.handlers = dispatch_table(type(self))
+
+
+for message_type in CLIENT_BOUND:
+    def handle(self, msg):
+        self.handled += 1
+    setattr(Handlers, f"handle_msg_{message_type.name}", handles(message_type)(handle))
+
+
+def dispatch_before(target: Handlers, action_name: str):
+    msg_type = resolve_with_if_chain(action_name)
+    fn_name = f"handle_msg_{msg_type.name}"
+    if hasattr(target, fn_name):
+        getattr(target, fn_name)(None)
+
+
+def dispatch_after(target: Handlers, action_name: str):
+    msg_type = MESSAGES.for_name(action_name)
+    target.handlers[msg_type.name](target, None)
+
+
+def main():
+    target = Handlers()
+    names = [message_type.name for message_type in CLIENT_BOUND]
+    for label, dispatch in (("before", dispatch_before), ("after", dispatch_after)):
+        elapsed = timeit.timeit(lambda: [dispatch(target, name) for name in names], number=ITERATIONS // len(names))
+        print(f"{label:<8}{elapsed / ITERATIONS * 1e9:>8.0f} ns/message")
+
+
+if __name__ == '__main__':
+    main()
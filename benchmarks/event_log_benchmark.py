@@ -0,0 +1,57 @@
+# Event log cost and replay speed: plays simulated bot games with and without an event log, then replays every
+# logged game through clueless.model.rules from its seed and checks the winner against the logged EndGame.
+# Run from the repository root: python benchmarks/event_log_benchmark.py [games]
+import contextlib
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "clueless" / "server"))
+
+from event_log import EventLogWriter, replay, logged_winner
+from simulator import play_game
+
+POLICIES = ["deduction", "random", "deduction", "random"]
+
+
+def play(games: int, writer: EventLogWriter | None) -> float:
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for seed in range(games):
+            play_game(seed, POLICIES, event_log=writer.open(seed) if writer else None)
+    if writer:
+        writer.close()
+    return time.perf_counter() - start
+
+
+def main(games: int):
+    with tempfile.TemporaryDirectory() as directory:
+        plain = play(games, None)
+        writer = EventLogWriter(directory)
+        logged = play(games, writer)
+        log_bytes = sum(path.stat().st_size for path in Path(directory).iterdir())
+        print(f"{games} games: {games / plain:,.0f} games/s without a log, {games / logged:,.0f} games/s logged "
+              f"({writer.records_written} records, {log_bytes / writer.records_written:.1f} bytes/record, "
+              f"{writer.fsyncs} fsyncs)")
+
+        paths = [Path(directory) / f"game-{seed}.log" for seed in range(games)]
+        start = time.perf_counter()
+        events = 0
+        states = []
+        for path in paths:
+            state, count = replay(path)
+            states.append(state)
+            events += count
+        elapsed = time.perf_counter() - start
+        mismatches = sum((state.players[state.winner] if state.winner >= 0 else None) != logged_winner(path)
+                         for state, path in zip(states, paths))
+        print(f"replay: {events} events in {elapsed:.2f}s, {events / elapsed:,.0f} events/s, "
+              f"{games / elapsed:,.0f} games/s, {mismatches} winners differ from the log")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,89 @@
+# Parsing a stream of messages arriving in 64 KiB recvs: PodSixNet's terminator framing (asynchat scanning for
+# the terminator, rencode dicts, latin-1 payload strings) against length-prefixed binary frames (FrameReader).
+# Reports frames per second and the memory allocated on the way, measured with tracemalloc while the decoded
+# messages are dropped as they arrive: the peak is what one recv costs in buffers and intermediate copies.
+# Run from the repository root: python benchmarks/framing_benchmark.py
+import time
+import tracemalloc
+import warnings
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+warnings.simplefilter("ignore", DeprecationWarning)  # asynchat
+
+from PodSixNet.Channel import Channel
+from PodSixNet.rencode import dumps
+
+from clueless.messages.framing import FrameReader, encode_frame
+from clueless.messages.messages import BaseMessage
+
+from codec_benchmark import sample_messages
+
+RECV_SIZE = 65536
+REPEAT = 400
+
+
+class PodSixNetParser(Channel):
+    # A PodSixNet channel without a socket: handle_read() pulls the chunks from a list
+    def __init__(self, chunks: list[bytes]):
+        super().__init__(map={})
+        self.ac_in_buffer_size = RECV_SIZE
+        self.chunks = iter(chunks)
+        self.frames = 0
+
+    def recv(self, buffer_size):
+        return next(self.chunks)
+
+    def Network(self, data):
+        BaseMessage.deserialize(data)
+        self.frames += 1
+
+
+def podsixnet(stream: bytes) -> int:
+    chunks = [stream[i:i + RECV_SIZE] for i in range(0, len(stream), RECV_SIZE)]
+    parser = PodSixNetParser(chunks)
+    for _ in chunks:
+        parser.handle_read()
+    return parser.frames
+
+
+def framed(stream: bytes) -> int:
+    reader = FrameReader(RECV_SIZE)
+    view = memoryview(stream)
+    frames = 0
+    for start in range(0, len(stream), RECV_SIZE):
+        # stands in for socket.recv_into(reader.writable())
+        size = min(RECV_SIZE, len(stream) - start)
+        with reader.writable(size) as buffer:
+            buffer[:size] = view[start:start + size]
+        reader.advance(size)
+        for _ in reader.messages():
+            frames += 1
+    return frames
+
+
+def measure(name: str, parse, stream: bytes, frame_count: int):
+    parse(stream)  # warm up
+    start = time.perf_counter()
+    assert parse(stream) == frame_count
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    parse(stream)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<12}{len(stream):>10}{frame_count / elapsed:>14,.0f}{peak / 1024:>14.1f}")
+
+
+def main():
+    messages = sample_messages() * REPEAT
+    podsixnet_stream = b"".join(dumps(message.serialize()) + Channel.endchars.encode() for message in messages)
+    framed_stream = b"".join(encode_frame(message) for message in messages)
+    print(f"{len(messages)} frames, received {RECV_SIZE // 1024} KiB at a time")
+    print(f"{'framing':<12}{'bytes':>10}{'frames/s':>14}{'peak KiB':>14}")
+    measure("podsixnet", podsixnet, podsixnet_stream, len(messages))
+    measure("framed", framed, framed_stream, len(messages))
+
+
+if __name__ == '__main__':
+    main()
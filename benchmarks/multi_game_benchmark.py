@@ -0,0 +1,65 @@
+# Memory per hosted game and per-message routing cost of GameRegistry.
+# Run from the repository root: python benchmarks/multi_game_benchmark.py [games]
+import contextlib
+import io
+import random
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT / "clueless" / "server")]
+
+from clueless.messages.messages import EndTurn
+from game_registry import GameRegistry
+
+ROUTED_MESSAGES = 100_000
+
+
+class FakeChannel:
+    def __init__(self, index):
+        self.addr = ("127.0.0.1", index)
+        self.sent = 0
+
+    def SendEncoded(self, outgoing: bytes):
+        self.sent += 1  # drop the bytes so only the game state is measured
+
+
+def host_games(registry: GameRegistry, games: int) -> list[FakeChannel]:
+    channels = [FakeChannel(i) for i in range(games * 6)]
+    for i, channel in enumerate(channels):
+        registry.join(channel, nickname=f"player_{i}")
+    for channel in channels:
+        registry.game_for(channel).set_ready_for_player(channel)
+    return channels
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    random.seed(0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        registry = GameRegistry()
+        channels = host_games(registry, games)
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    print(registry.stats())
+    print(f"memory per game: {allocated / games / 1024:.1f} KiB ({games} games, 6 players each)")
+
+    sample = [random.choice(channels) for _ in range(ROUTED_MESSAGES)]
+    lookup = timeit.timeit(lambda: [registry.game_for(channel) for channel in sample], number=1)
+    print(f"routing lookup: {lookup / ROUTED_MESSAGES * 1e9:.0f} ns/message")
+
+    current_players = [game.game_manager.current_player for game in registry.games.values()][:1000]
+    end_turns = [(player._channel, EndTurn(player.player_id)) for player in current_players]
+    with contextlib.redirect_stdout(io.StringIO()):
+        routed = timeit.timeit(lambda: [registry.game_for(channel).end_turn(channel, end_turn)
+                                        for channel, end_turn in end_turns], number=1)
+    print(f"route + handle EndTurn (2 broadcasts to 6 players): {routed / len(end_turns) * 1e6:.1f} us/message")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+# Message latency of the client's main loop: how long a server message waits between arriving and being handled.
+# A local server thread sends YourTurn frames at random intervals to a FramedConnection that is either pumped once
+# per frame on the main loop, as before, or read by a NetworkThread that wakes the main loop with a pygame event
+# (GameClient.wait_for_frame). Each frame that draws takes RENDER_SECONDS, standing in for a slow frame.
+# Uses SDL's dummy video driver, so it runs headless.
+# Run from the repository root: python benchmarks/network_thread_benchmark.py [messages]
+import os
+import queue
+import random
+import socket
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from clueless.client.connection import FramedConnection, NetworkThread
+from clueless.messages.framing import encode_frame
+from clueless.messages.messages import YourTurn
+from clueless.model.board_enums import Character
+from clueless.model.player import PlayerID
+
+FRAMES_PER_SECOND = 60
+RENDER_SECONDS = 0.008
+NETWORK_EVENT = pygame.event.custom_type()
+
+
+def serve(listener: socket.socket, count: int, sent_at: dict[int, float]):
+    player_id = PlayerID(Character.PLUM, "plum")
+    rng = random.Random(7)
+    client, _ = listener.accept()
+    with client:
+        for turn in range(count):
+            time.sleep(rng.uniform(0.002, 0.04))
+            sent_at[turn] = time.perf_counter()
+            client.sendall(encode_frame(YourTurn(turn, player_id)))
+        time.sleep(0.2)
+
+
+def pumped_per_frame(port: int, count: int, sent_at: dict[int, float]) -> (list[float], list[float]):
+    # the old loop: pump, handle, draw, then sleep until the next frame
+    messages = queue.SimpleQueue()
+    connection = FramedConnection("127.0.0.1", port, messages)
+    clock = pygame.time.Clock()
+    latencies = []
+    while len(latencies) < count:
+        connection.update(timeout=0.001)
+        while not messages.empty():
+            latencies.append(time.perf_counter() - sent_at[messages.get().turn_id])
+        time.sleep(RENDER_SECONDS)
+        clock.tick(FRAMES_PER_SECOND)
+    connection.close()
+    return latencies, []
+
+
+def network_thread(port: int, count: int, sent_at: dict[int, float]) -> (list[float], list[float]):
+    # the new loop: wait for the next frame or a NETWORK_EVENT, whichever comes first; only a frame with something
+    # new to show is drawn
+    messages = queue.SimpleQueue()
+    connection = NetworkThread(FramedConnection, "127.0.0.1", port, messages,
+                               on_message=lambda: pygame.event.post(pygame.event.Event(NETWORK_EVENT)))
+    latencies, waits = [], []
+    next_frame = 0.0
+    while len(latencies) < count:
+        now = time.monotonic()
+        if now < next_frame:
+            pygame.event.wait(max(1, int((next_frame - now) * 1000)))
+        else:
+            next_frame = now + 1 / FRAMES_PER_SECOND
+        handled = False
+        while not messages.empty():
+            message = messages.get()
+            handled_at = time.perf_counter()
+            latencies.append(handled_at - sent_at[message.turn_id])
+            waits.append(handled_at - message.received_at)
+            handled = True
+        pygame.event.pump()
+        if handled:
+            time.sleep(RENDER_SECONDS)
+    connection.close()
+    return latencies, waits
+
+
+def report(label: str, seconds: list[float]):
+    ms = sorted(s * 1000 for s in seconds)
+    print(f"{label:<34} p50 {statistics.median(ms):6.2f} ms  p95 {ms[int(len(ms) * 0.95)]:6.2f} ms  "
+          f"max {ms[-1]:6.2f} ms")
+
+
+def main(count: int):
+    pygame.init()
+    pygame.display.set_mode((100, 100))
+    for label, loop in (("pumped every frame", pumped_per_frame), ("network thread", network_thread)):
+        with socket.create_server(("127.0.0.1", 0)) as listener:
+            sent_at = {}
+            server = threading.Thread(target=serve, args=(listener, count, sent_at), daemon=True)
+            server.start()
+            cpu_start = time.process_time()
+            latencies, waits = loop(listener.getsockname()[1], count, sent_at)
+            cpu = time.process_time() - cpu_start
+            server.join()
+        report(f"{label}: sent to handled", latencies)
+        if waits:
+            report(f"{label}: arrived to handled", waits)
+        print(f"{'':<34} {cpu:.2f} s CPU for {count} messages")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
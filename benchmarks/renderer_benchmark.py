@@ -0,0 +1,86 @@
+# Frame time and CPU use of an idle client screen: the old loop (clear the screen, draw every element, push the
+# whole frame) against clueless.client.renderer, which skips frames where nothing changed.
+# Uses SDL's dummy video driver, so it runs headless. The game screen needs resources/GameBoardV2.png; without it
+# the lobby screen is measured instead.
+# Run from the repository root: python benchmarks/renderer_benchmark.py [frames]
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "clueless" / "client"))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.chdir(ROOT / "clueless" / "client")  # elements load their assets from ../resources
+
+import pygame
+import pygame_gui
+
+from clueless.client.client_game_manager import ClientGameManager
+from clueless.client.client_player import ClientPlayer
+from clueless.client.renderer import Renderer
+from clueless.client.view import View, TitleView, GameView
+from clueless.model.board import Board
+from clueless.model.board_enums import Character
+from clueless.model.player import PlayerID
+
+
+class IdleDelegate(TitleView.Delegate, GameView.Delegate):
+    pass
+
+
+def idle_view(screen, ui_manager) -> (str, View):
+    players = [PlayerID(character, f"player_{character.name.lower()}") for character in Character]
+    if Path("../resources/GameBoardV2.png").exists():
+        board = Board(players=players)
+        view = GameView(screen, ui_manager, delegate=IdleDelegate(),
+                        game_manager=ClientGameManager(ClientPlayer(players[0]), board))
+        view.initialize_player_list(players, players[0])
+        view.update_board_elements(board)
+        view.set_turn_pointer(1)
+        return "game", view
+    view = TitleView(screen, "127.0.0.1", ui_manager, delegate=IdleDelegate())
+    view.add_player_id([(player_id, True) for player_id in players], players[0])
+    return "lobby", view
+
+
+def full_frames(screen, ui_manager, view, frames: int) -> (float, float):
+    start, cpu_start = time.perf_counter(), time.process_time()
+    for _ in range(frames):
+        ui_manager.update(1 / 60)
+        screen.fill("white")
+        view.draw()
+        pygame.display.update()
+    return (time.perf_counter() - start) / frames, (time.process_time() - cpu_start) / frames
+
+
+def retained_frames(ui_manager, renderer, view, frames: int) -> (float, float):
+    start, cpu_start = time.perf_counter(), time.process_time()
+    for _ in range(frames):
+        ui_manager.update(1 / 60)
+        renderer.render(view)
+    return (time.perf_counter() - start) / frames, (time.process_time() - cpu_start) / frames
+
+
+def report(label: str, frame_seconds: float, cpu_seconds: float):
+    # the client ticks at 60 frames per second, so this is the share of a core it keeps busy
+    print(f"{label:<10} {frame_seconds * 1000:8.3f} ms/frame {cpu_seconds * 1000:8.3f} ms CPU/frame "
+          f"{cpu_seconds * 60 * 100:6.1f}% of a core at 60 fps")
+
+
+def main(frames: int):
+    pygame.init()
+    screen = pygame.display.set_mode(View.SCREEN_SIZE)
+    ui_manager = pygame_gui.UIManager(View.SCREEN_SIZE)
+    name, view = idle_view(screen, ui_manager)
+    renderer = Renderer(screen, ui_manager)
+    renderer.render(view)  # first frame draws everything
+    print(f"idle {name} screen, {frames} frames")
+    report("full", *full_frames(screen, ui_manager, view, frames))
+    report("retained", *retained_frames(ui_manager, renderer, view, frames))
+    print(renderer.stats)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 600)
@@ -0,0 +1,68 @@
+# Cost of resuming a seat: the single ResumeState a reconnecting player is sent, against replaying every message
+# that seat received during the game. Plays simulated bot games with an event log to measure the history.
+# Run from the repository root: python benchmarks/resume_benchmark.py [games]
+import contextlib
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "clueless" / "server"))
+
+from clueless.messages import codec
+from clueless.messages.registry import MESSAGES
+from clueless.model.board_enums import Character
+from clueless.model.player import PlayerID
+from event_log import EventLogWriter, OUTBOUND, read_log
+from game_manager import GameManager
+from server_player import ServerPlayer
+from simulator import play_game
+
+POLICIES = ["random", "random", "random", "random"]
+ROUNDS = 2000
+
+
+def history(path) -> (int, list[memoryview]):
+    # the payloads seat 0 received, which is what resuming by replay would have to send again
+    _, _, _, records = read_log(path)
+    payloads = [payload for kind, recipients, payload in records if kind == OUTBOUND and recipients & 1]
+    return sum(len(payload) for payload in payloads), payloads
+
+
+def main(games: int):
+    with tempfile.TemporaryDirectory() as directory:
+        writer = EventLogWriter(directory)
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            for seed in range(games):
+                play_game(seed, POLICIES, event_log=writer.open(seed))
+            writer.close()
+            players = [ServerPlayer(PlayerID(character, character.name), channel=None)
+                       for character, _ in zip(Character, POLICIES)]
+            game = GameManager(players)
+            game.start_game()
+        histories = [history(Path(directory) / f"game-{seed}.log") for seed in range(games)]
+
+    seats = [(player.player_id, True) for player in players]
+    encoded = codec.encode(game.snapshot(players[0], 0, seats))
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        codec.decode(codec.encode(game.snapshot(players[0], 0, seats)), MESSAGES.by_id)
+    snapshot_seconds = (time.perf_counter() - start) / ROUNDS
+
+    longest_bytes, longest = max(histories, key=lambda item: item[0])
+    start = time.perf_counter()
+    for payload in longest:
+        codec.decode(payload, MESSAGES.by_id)
+    replay_seconds = time.perf_counter() - start
+
+    mean_bytes = sum(size for size, _ in histories) / games
+    print(f"ResumeState: {len(encoded)} bytes, {snapshot_seconds * 1e6:.0f} us to build, encode and decode")
+    print(f"replay over {games} games: {mean_bytes:,.0f} bytes on average, longest {longest_bytes:,} bytes in "
+          f"{len(longest)} messages, {replay_seconds * 1e6:,.0f} us just to decode them")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
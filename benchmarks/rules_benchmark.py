@@ -0,0 +1,54 @@
+# Throughput of the functional rules core: random playouts through legal_actions + apply, and apply alone
+# replaying the recorded actions of those games.
+# Run from the repository root: python benchmarks/rules_benchmark.py [games]
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from clueless.model.board_enums import Character
+from clueless.model.card import cards_in
+from clueless.model.player import PlayerID
+from clueless.model.rules import new_game, legal_actions, apply, Phase, AccuseAction
+
+PLAYERS = 4
+MAX_TURNS = 200
+
+
+def playout(seed: int) -> (list, list):
+    # Plays randomly without accusing, then the current player accuses the solution after MAX_TURNS turns
+    rng = random.Random(seed)
+    state = new_game([PlayerID(character, character.name) for character in list(Character)[:PLAYERS]], rng)
+    initial, actions = state, []
+    while state.phase != Phase.GAME_OVER:
+        if state.turn >= MAX_TURNS and state.phase != Phase.DISPROVING:
+            character, weapon, location = (card.member for card in cards_in(state.solution))
+            action = AccuseAction(state.seat, character, weapon, location)
+        else:
+            action = rng.choice(legal_actions(state, accusations=False))
+        state = apply(state, action)
+        actions.append(action)
+    return initial, actions
+
+
+def main(games: int):
+    start = time.perf_counter()
+    recorded = [playout(seed) for seed in range(games)]
+    playout_time = time.perf_counter() - start
+    transitions = sum(len(actions) for _, actions in recorded)
+
+    start = time.perf_counter()
+    for state, actions in recorded:
+        for action in actions:
+            state = apply(state, action)
+    replay_time = time.perf_counter() - start
+
+    print(f"{games} games, {transitions:,} transitions")
+    print(f"legal_actions + apply: {transitions / playout_time:>12,.0f} transitions/s")
+    print(f"apply (replay):        {transitions / replay_time:>12,.0f} transitions/s")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,99 @@
+# Idle CPU and action round-trip latency of the asyncio and PodSixNet server runtimes.
+# Linux only (reads /proc). Run from the repository root: python benchmarks/server_runtime_benchmark.py
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from PodSixNet.rencode import dumps, loads
+
+from clueless.messages.messages import BaseMessage, JoinGame, Ready, Move
+
+TERMINATOR = b"\0---\0"
+IDLE_SECONDS = 3
+ROUND_TRIPS = 1000
+
+
+class RawClient:
+    # Minimal blocking client speaking the PodSixNet wire format
+    def __init__(self, port):
+        self.socket = socket.create_connection(("127.0.0.1", port))
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.buffer = b""
+
+    def send(self, message: BaseMessage):
+        self.socket.sendall(dumps(message.serialize()) + TERMINATOR)
+
+    def receive(self) -> dict:
+        while TERMINATOR not in self.buffer:
+            self.buffer += self.socket.recv(65536)
+        frame, self.buffer = self.buffer.split(TERMINATOR, 1)
+        return loads(frame)
+
+    def receive_action(self, action: str) -> dict:
+        while (data := self.receive())["action"] != action:
+            pass
+        return data
+
+
+def cpu_seconds(pid: int) -> float:
+    fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def wait_for_port(port: int):
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port)).close()
+            return
+        except ConnectionRefusedError:
+            time.sleep(0.05)
+    raise RuntimeError(f"server did not start on port {port}")
+
+
+def measure(runtime: str, port: int):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(ROOT), str(ROOT / "clueless" / "server")]))
+    server = subprocess.Popen([sys.executable, str(ROOT / "clueless" / "server" / "server.py"),
+                               "--runtime", runtime, "--port", str(port)],
+                              env=env, stdout=subprocess.DEVNULL)
+    try:
+        wait_for_port(port)
+        time.sleep(0.5)
+        start = cpu_seconds(server.pid)
+        time.sleep(IDLE_SECONDS)
+        idle_cpu = (cpu_seconds(server.pid) - start) / IDLE_SECONDS
+
+        client = RawClient(port)
+        client.send(JoinGame(nickname="bench"))
+        player_id = BaseMessage.deserialize(client.receive_action("assign_player_id")).player_id
+        client.send(Ready())
+        client.receive_action("start_turn")
+        latencies = []
+        for i in range(ROUND_TRIPS):
+            sent = time.perf_counter()
+            client.send(Move(player_id, (i % 5, 0)))
+            client.receive_action(Move.name)
+            latencies.append(time.perf_counter() - sent)
+        client.socket.close()
+    finally:
+        server.terminate()
+        server.wait()
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{runtime:<10}{idle_cpu * 100:>10.1f}%{statistics.median(latencies) * 1e6:>12.0f}{p99 * 1e6:>12.0f}")
+
+
+def main():
+    print(f"{'runtime':<10}{'idle CPU':>11}{'p50 RTT us':>12}{'p99 RTT us':>12}")
+    measure("asyncio", 10101)
+    measure("podsixnet", 10102)
+
+
+if __name__ == '__main__':
+    main()
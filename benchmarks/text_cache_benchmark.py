@@ -0,0 +1,60 @@
+# Cost of the text a client builds on its hot paths: a card list like GameView.display_player_cards, and a player
+# row being struck through and grayed out after a wrong accusation. Cold clears clueless.client.assets.TEXT before
+# every round, close to what TextElement paid when each one opened its own font; warm finds it all cached.
+# Uses SDL's dummy video driver, so it runs headless.
+# Run from the repository root: python benchmarks/text_cache_benchmark.py [rounds]
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "clueless" / "client"))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.chdir(ROOT / "clueless" / "client")  # elements load their fonts from ../resources
+
+import pygame
+
+from clueless.client.assets import TEXT
+from clueless.client.ui_elements import TextElement
+from clueless.client.ui_enums import Pico
+from clueless.model.board_enums import Character, Weapon, Location
+
+CARD_LIST = ([("YOUR CARDS:", 20), ("Character Cards:", 18), (f" - {Character.PLUM.value}", 16),
+              ("Weapon Cards:", 18), (f" - {Weapon.ROPE.value}", 16), (f" - {Weapon.DAGGER.value}", 16),
+              ("Location Cards:", 18), (f" - {Location.HALL.value}", 16), (f" - {Location.STUDY.value}", 16)])
+
+
+def text_round():
+    for text, size in CARD_LIST:
+        TextElement(text=text, size=size)
+    for character in Character:
+        row = TextElement(text=f"player_{character.name.lower()}", size=18, primary_color=Pico.from_character(character))
+        row.strikethrough = True
+        row.to_grayscale()
+
+
+def run(rounds: int, cold: bool) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        if cold:
+            TEXT.clear()
+        text_round()
+    return (time.perf_counter() - start) / rounds
+
+
+def main(rounds: int):
+    pygame.init()
+    pygame.display.set_mode((100, 100))
+    cold = run(rounds, cold=True)
+    hits, misses = TEXT.hits, TEXT.misses
+    warm = run(rounds, cold=False)
+    elements = len(CARD_LIST) + len(Character)
+    print(f"{elements} text elements: {cold * 1000:.3f} ms with nothing cached, {warm * 1000:.3f} ms cached "
+          f"({cold / warm:.0f}x)")
+    print(f"warm: {TEXT.hits - hits} hits, {TEXT.misses - misses} misses; {TEXT.stats()}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,113 @@
+# Bot games played through the real server and client connection code over each transport: the in-process
+# loopback (message objects, no serialization), TCP to a local asyncio server (a ConnectionGroup in this process)
+# and TCP with length-prefixed binary frames (FramedConnections against the framed runtime).
+# Reports client actions per second. Run from the repository root: python benchmarks/transport_benchmark.py [games]
+import contextlib
+import os
+import queue
+import random
+import select
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "clueless" / "server"))
+
+from clueless.client.connection import ClientConnection, ConnectionGroup, FramedConnection, LoopbackConnection
+from clueless.messages.messages import AssignPlayerID, UpdatePlayers, EndGame
+from clueless.model.bots import Bot, POLICIES
+
+from loopback_server import LoopbackServer
+from server_runtime_benchmark import wait_for_port
+
+PORT = 10413
+LOBBY = 6
+POLICY_NAMES = ["deduction", "random"]
+
+
+def play(connections: list[ClientConnection], update) -> (int, float):
+    # Plays len(connections) / LOBBY games with one bot per connection, returns (actions sent, seconds)
+    start = time.perf_counter()
+    bots: list[Bot | None] = [None] * len(connections)
+    ready = [False] * len(connections)
+    finished = set()
+    actions = 0
+    # join one lobby at a time, so every lobby gets the bots it is meant to have
+    for lobby_start in range(0, len(connections), LOBBY):
+        lobby = range(lobby_start, lobby_start + LOBBY)
+        for i in lobby:
+            connections[i].join_game(nickname=f"bot-{i}")
+        while any(bots[i] is None for i in lobby):
+            update()
+            for i in lobby:
+                while bots[i] is None and not connections[i].message_queue.empty():
+                    message = connections[i].message_queue.get()
+                    if isinstance(message, AssignPlayerID):
+                        bots[i] = Bot(message.player_id, POLICIES[POLICY_NAMES[i % len(POLICY_NAMES)]](),
+                                      random.Random(i))
+    while len(finished) < len(connections):
+        update()
+        for i, connection in enumerate(connections):
+            while not connection.message_queue.empty():
+                message = connection.message_queue.get()
+                if isinstance(message, UpdatePlayers) and not ready[i] and len(message.players) == LOBBY:
+                    ready[i] = True
+                    connection.ready()
+                    actions += 1
+                elif isinstance(message, EndGame):
+                    finished.add(i)
+                for action in bots[i].receive(message):
+                    connection.Send(action)
+                    actions += 1
+    return actions, time.perf_counter() - start
+
+
+def loopback(games: int) -> (int, float):
+    server = LoopbackServer()
+    connections = [LoopbackConnection(server, queue.SimpleQueue()) for _ in range(games * LOBBY)]
+    return play(connections, update=lambda: None)
+
+
+@contextlib.contextmanager
+def local_server(runtime: str):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(ROOT), str(ROOT / "clueless" / "server")]))
+    server = subprocess.Popen([sys.executable, str(ROOT / "clueless" / "server" / "server.py"), "--port", str(PORT),
+                               "--runtime", runtime], env=env, stdout=subprocess.DEVNULL)
+    try:
+        wait_for_port(PORT)
+        yield
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def tcp(games: int) -> (int, float):
+    with local_server("asyncio"):
+        group = ConnectionGroup()
+        connections = [group.connect("127.0.0.1", PORT, queue.SimpleQueue()) for _ in range(games * LOBBY)]
+        return play(connections, update=group.update)
+
+
+def framed(games: int) -> (int, float):
+    with local_server("framed"):
+        connections = [FramedConnection("127.0.0.1", PORT, queue.SimpleQueue()) for _ in range(games * LOBBY)]
+
+        def update():
+            readable, _, _ = select.select([c.socket for c in connections], [], [], 0.001)
+            for connection in connections:
+                if connection.socket in readable:
+                    connection.update(timeout=0)
+
+        return play(connections, update=update)
+
+
+if __name__ == '__main__':
+    game_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    for name, transport in (("loopback", loopback), ("tcp", tcp), ("framed", framed)):
+        # the server and connections report every message on stdout
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            sent, seconds = transport(game_count)
+        print(f"{name:<10}{game_count} games, {sent} actions in {seconds:.2f}s: {sent / seconds:,.0f} actions/s")
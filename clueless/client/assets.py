@@ -0,0 +1,121 @@
+import threading
+from collections import OrderedDict
+
+import pygame
+
+# Process-wide caches for the client's UI elements:
+#     IMAGES  the scaled images ImageElement shows, keyed by (name, size). Loading an image means reading the png,
+#             converting it to the display's format and smoothscaling it, far too slow to do on every lobby update.
+#     TEXT    the fonts and rendered text of TextElement.
+# Elements share the cached surfaces, so they must never draw onto them (to_grayscale makes a copy).
+
+
+class ImageCache:
+    def __init__(self, capacity=64, directory="../resources"):
+        self.capacity = capacity
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._images: OrderedDict[(str, (int, int)), pygame.Surface] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, name: str, size: (int, int)) -> pygame.Surface:
+        key = (name, tuple(size))
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return image
+            self.misses += 1
+        return self.__store(key, self.__load(name, key[1]))
+
+    def preload(self, images: list[(str, (int, int))]) -> threading.Thread:
+        # loads the images on a background thread, so the screens that show them first find them cached
+        thread = threading.Thread(target=self.__preload, args=(images,), name="image-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {"images": len(self._images), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+    def __preload(self, images: list[(str, (int, int))]):
+        for name, size in images:
+            key = (name, tuple(size))
+            if key in self._images:
+                continue
+            try:
+                self.__store(key, self.__load(name, key[1]))
+            except (FileNotFoundError, pygame.error) as e:
+                # left for get() to fail on, where the image is actually needed
+                print(f"Could not preload {name}: {e}")
+
+    def __load(self, name: str, size: (int, int)) -> pygame.Surface:
+        image = pygame.image.load(f'{self.directory}/{name}.png').convert_alpha()
+        return pygame.transform.smoothscale(image, size)
+
+    def __store(self, key: (str, (int, int)), image: pygame.Surface) -> pygame.Surface:
+        with self._lock:
+            # another thread may have loaded it meanwhile, every element should get the same surface
+            image = self._images.setdefault(key, image)
+            self._images.move_to_end(key)
+            while len(self._images) > self.capacity:
+                self._images.popitem(last=False)
+                self.evictions += 1
+        return image
+
+
+class TextCache:
+    # One pygame Font per size, shared by every TextElement, and a bounded LRU cache of rendered text. The style
+    # (align, strikethrough) is set on the shared font right before each render, so render only from the main thread.
+
+    def __init__(self, capacity=512, font_path="../resources/VT323-Regular.ttf"):
+        self.capacity = capacity
+        self.font_path = font_path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._fonts: dict[int, pygame.font.Font] = {}
+        self._surfaces: OrderedDict[tuple, pygame.Surface] = OrderedDict()
+
+    def font(self, size: int) -> pygame.font.Font:
+        font = self._fonts.get(size)
+        if font is None:
+            font = self._fonts[size] = pygame.font.Font(filename=self.font_path, size=size)
+        return font
+
+    def render(self, text: str, size: int, color: pygame.Color, align: int = pygame.FONT_LEFT,
+               strikethrough=False, background: pygame.Color | None = None) -> pygame.Surface:
+        key = (text, size, tuple(color), align, strikethrough, None if background is None else tuple(background))
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        font = self.font(size)
+        font.align = align
+        font.strikethrough = strikethrough
+        surface = font.render(text, True, color, bgcolor=background)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.capacity:
+            self._surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def clear(self):
+        self._fonts.clear()
+        self._surfaces.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {"fonts": len(self._fonts), "surfaces": len(self._surfaces), "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
+
+
+IMAGES = ImageCache()
+TEXT = TextCache()
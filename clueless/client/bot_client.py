@@ -0,0 +1,215 @@
+import argparse
+import asyncio
+import math
+import random
+import socket
+import time
+from collections import Counter, defaultdict
+
+from PodSixNet.Channel import Channel
+from PodSixNet.rencode import dumps, loads
+
+from clueless.messages import codec
+from clueless.messages.framing import HEADER, encode_frame
+from clueless.messages.messages import BaseMessage, BaseClientAction, JoinGame, Ready, AssignPlayerID, UpdatePlayers, \
+    StartGame, Disprove, Disproved, EndGame, Rejected
+from clueless.messages.registry import MESSAGES
+from clueless.model.bots import Bot, POLICIES, BotPolicy
+
+# Headless clients for load testing: each BotClient joins a lobby, readies once the lobby is full, and plays the game
+# with a Bot over a real socket. The launcher at the bottom runs many of them on one event loop against a running
+# server and reports round-trip latency per action, message throughput and errors. Bots speak the PodSixNet format
+# the asyncio, podsixnet and sharded runtimes use, or with --framed the length-prefixed frames of the framed runtime.
+#
+# An action's round trip is the time from sending it to receiving the server's broadcast of the same message
+# (matched by uuid). A Disprove with a card only goes back to the suggester, so the disprover's round trip ends at
+# the Disproved naming it instead. A Disprove without a card is passed on privately by the server, so it has no round
+# trip. A Rejected action ends its round trip as an error.
+
+TERMINATOR = Channel.endchars.encode()
+BUILT_IN_ACTIONS = {"connected", "error", "disconnected", "socketConnect"}
+
+
+class LoadStats:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.sent = 0
+        self.received = 0
+        self.games_started = 0
+        self.games_finished = 0
+        self.errors: Counter[str] = Counter()
+        self.elapsed = 0.0
+
+    def error(self, kind: str):
+        self.errors[kind] += 1
+
+    @staticmethod
+    def percentile(values: list[float], fraction: float) -> float:
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def report(self) -> str:
+        lines = [f"{self.games_finished}/{self.games_started} games finished in {self.elapsed:.1f}s, "
+                 f"{self.sent} sent, {self.received} received, "
+                 f"{(self.sent + self.received) / self.elapsed if self.elapsed else 0:,.0f} messages/s",
+                 f"{'action':<24}{'count':>8}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}  (ms)"]
+        for name, values in sorted(self.latencies.items()):
+            lines.append(f"{name:<24}{len(values):>8}" + "".join(
+                f"{self.percentile(values, fraction) * 1000:>10.2f}" for fraction in (0.5, 0.9, 0.99, 1.0)))
+        lines.append(f"errors: {dict(self.errors) or 0}")
+        return "\n".join(lines)
+
+
+class BotClient:
+    def __init__(self, host: str, port: int, nickname: str, policy: BotPolicy, rng: random.Random, stats: LoadStats,
+                 lobby_size: int, counts_game=False, framed=False):
+        self.host = host
+        self.port = port
+        self.nickname = nickname
+        self.policy = policy
+        self.rng = rng
+        self.stats = stats
+        self.lobby_size = lobby_size
+        self.counts_game = counts_game  # one client per game adds the game to the totals
+        self.framed = framed  # clueless.messages.framing instead of the PodSixNet format
+        self.bot: Bot | None = None
+        self.ready = False
+        self.started = asyncio.Event()
+        self.finished = False
+        self.pending: dict[str, (str, float)] = {}  # uuid -> (action name, time sent)
+        self.pending_disprove: str | None = None  # uuid of the Disprove waiting for its Disproved
+        self._writer: asyncio.StreamWriter | None = None
+
+    async def play(self):
+        reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        self._writer.get_extra_info("socket").setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.send(JoinGame(nickname=self.nickname))
+        try:
+            while not self.finished:
+                message = await (self.read_frame(reader) if self.framed else self.read_podsixnet(reader))
+                if message is not None:
+                    self.handle(message)
+                await self._writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            self.stats.error("disconnected")
+        finally:
+            self._writer.close()
+
+    async def read_podsixnet(self, reader: asyncio.StreamReader) -> BaseMessage | None:
+        frame = await reader.readuntil(TERMINATOR)
+        self.stats.received += 1
+        data = loads(frame[:-len(TERMINATOR)])
+        if data['action'] in BUILT_IN_ACTIONS:
+            return None
+        msg_type = MESSAGES.for_name(data['action'])
+        if msg_type is None:
+            self.stats.error("unknown message")
+            return None
+        return msg_type.deserialize(data)
+
+    async def read_frame(self, reader: asyncio.StreamReader) -> BaseMessage | None:
+        (length,) = HEADER.unpack(await reader.readexactly(HEADER.size))
+        payload = await reader.readexactly(length)
+        self.stats.received += 1
+        try:
+            return codec.decode(payload, MESSAGES.by_id)
+        except codec.CodecError:
+            self.stats.error("unknown message")
+            return None
+
+    def send(self, message: BaseMessage):
+        if isinstance(message, BaseClientAction) and not (isinstance(message, Disprove) and message.card is None):
+            self.pending[message.uuid] = (message.name, time.perf_counter())
+            if isinstance(message, Disprove):
+                self.pending_disprove = message.uuid
+        self._writer.write(encode_frame(message) if self.framed else dumps(message.serialize()) + TERMINATOR)
+        self.stats.sent += 1
+
+    def answered(self, message: BaseMessage) -> str | None:
+        # uuid of the action whose round trip the message ends
+        match message:
+            case EndGame():
+                return message.accuse.uuid
+            case Rejected():
+                return message.action_uuid
+            case Disproved() if self.bot is not None and message.player_id == self.bot.player_id:
+                answered, self.pending_disprove = self.pending_disprove, None
+                return answered
+        return message.uuid
+
+    def handle(self, message: BaseMessage):
+        answered = self.answered(message)
+        if answered in self.pending:
+            name, sent = self.pending.pop(answered)
+            if isinstance(message, Rejected):
+                self.stats.error(f"rejected {name}")
+            else:
+                self.stats.latencies[name].append(time.perf_counter() - sent)
+
+        match message:
+            case AssignPlayerID():
+                self.bot = Bot(message.player_id, self.policy, self.rng)
+            case UpdatePlayers() if not self.ready and len(message.players) >= self.lobby_size:
+                self.ready = True
+                self.send(Ready())
+            case StartGame():
+                self.started.set()
+                self.stats.games_started += self.counts_game
+            case EndGame():
+                self.finished = True
+                self.stats.games_finished += self.counts_game
+
+        if self.bot is not None:
+            try:
+                actions = self.bot.receive(message)
+            except Exception as e:
+                self.stats.error(f"bot {type(e).__name__}")
+                return
+            for action in actions:
+                self.send(action)
+
+
+async def run_load(host: str, port: int, bots: int, lobby_size: int, policies: list[str], seed=0,
+                   timeout=120.0, framed=False) -> LoadStats:
+    # Fills one lobby at a time, so every game gets exactly lobby_size bots, and lets all the games play concurrently
+    stats = LoadStats()
+    tasks = []
+    start = time.perf_counter()
+    for game in range(math.ceil(bots / lobby_size)):
+        size = min(lobby_size, bots - game * lobby_size)
+        group = [BotClient(host, port, f"bot-{game}-{seat}", POLICIES[policies[seat % len(policies)]](),
+                           random.Random(f"{seed}:{game}:{seat}"), stats, lobby_size=size, counts_game=seat == 0,
+                           framed=framed)
+                 for seat in range(size)]
+        tasks.extend(asyncio.create_task(client.play()) for client in group)
+        try:
+            await asyncio.wait_for(asyncio.gather(*(client.started.wait() for client in group)), timeout)
+        except asyncio.TimeoutError:
+            stats.error("lobby did not start")
+    done, unfinished = await asyncio.wait(tasks, timeout=max(0.0, timeout - (time.perf_counter() - start)))
+    for task in unfinished:
+        stats.error("timed out")
+        task.cancel()
+    for task in done:
+        if task.exception() is not None:
+            stats.error(type(task.exception()).__name__)
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Play Clueless games against a running server with bot clients")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=10000)
+    parser.add_argument("--bots", type=int, default=60)
+    parser.add_argument("--lobby-size", type=int, default=6, help="bots per game, at most 6")
+    parser.add_argument("--policies", default="deduction,random",
+                        help=f"comma separated policies, assigned to seats in turn, from: {', '.join(POLICIES)}")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds before unfinished games count as errors")
+    parser.add_argument("--framed", action="store_true",
+                        help="speak length-prefixed binary frames, for a server started with --runtime framed")
+    args = parser.parse_args()
+    result = asyncio.run(run_load(args.host, args.port, args.bots, args.lobby_size, args.policies.split(","),
+                                  args.seed, args.timeout, args.framed))
+    print(result.report())
@@ -1,19 +1,28 @@
 import queue
+import time
+from collections import deque
 
 import pygame
 import pygame_gui
-from typing import cast
+from typing import cast, Callable
 
+from clueless.client.assets import IMAGES
 from clueless.client.client_game_manager import ClientGameManager
 from clueless.client.client_player import ClientPlayer
-from clueless.client.connection import GameConnection
-from clueless.client.view import TitleView, View, GameView
+from clueless.client.connection import ClientConnection, GameConnection, NetworkThread
+from clueless.client.renderer import Renderer
+from clueless.client.view import TitleView, View, GameView, preloaded_images
 from clueless.messages.messages import AssignPlayerID, UpdatePlayers, StartGame, Move, DealCards, YourTurn, Suggest, \
-    RequestDisprove, Disprove, EndTurn, Accuse, EndGame
+    RequestDisprove, Disprove, Disproved, EndTurn, Accuse, EndGame, ResumeGame, ResumeState, Rejected
+from clueless.messages.registry import handles, dispatch_table
 from clueless.model.board import Room
 from clueless.model.board_enums import Direction, Character, Weapon, Location
 from clueless.model.card import Card
 from clueless.model.player import PlayerID
+from clueless.model.rules import Phase
+
+# posted by the network thread when messages arrive, to wake the main loop up
+NETWORK_EVENT = pygame.event.custom_type()
 
 
 class GameClient(TitleView.Delegate):
@@ -21,51 +30,96 @@ class GameClient(TitleView.Delegate):
     # GameClient will handle all server messages that are added to the message queue.
     # Has access to the View to update the pygame screen or transition to a new pygame screen.
     # Will call the client game manager to handle game logic and what data to send to the server.
-    def __init__(self):
+    RECONNECT_INTERVAL = 1.0  # seconds between attempts to reconnect after losing the server
+    FRAMES_PER_SECOND = 60
+    # connect(host, port, message_queue) opens the connection to the server, a GameConnection by default
+    def __init__(self, connect: Callable[[str, int, queue.SimpleQueue], ClientConnection] = GameConnection):
         pygame.init()
         width, height = View.SCREEN_SIZE
         self.screen: pygame.Surface = pygame.display.set_mode((width, height))
         pygame.display.set_caption("Clueless")
+        IMAGES.preload(preloaded_images())  # needs the display mode set, to convert to its format
         self.ui_manager = pygame_gui.UIManager((self.screen.get_rect().width, self.screen.get_rect().height))
+        self.renderer = Renderer(self.screen, self.ui_manager)
         self.game_clock = pygame.time.Clock()
+        self.next_frame = 0.0
+        # seconds from each message being read off the socket to its handler being called
+        self.message_latency: deque[float] = deque(maxlen=1000)
         self.server_ip_address = "127.0.0.1"
         self.view: View = TitleView(self.screen, self.server_ip_address, self.ui_manager, delegate=self)
         self.message_queue = queue.SimpleQueue()
-        self.connection: GameConnection | None = None
+        self.connect = connect
+        self.connection: ClientConnection | None = None
         self.game_manager: ClientGameManager = None
         self.player: ClientPlayer = None
         self.player_list: [PlayerID] = []
+        # from AssignPlayerID, to take our seat back after losing the connection
+        self.game_id: int | None = None
+        self.session_token: str | None = None
+        self.last_reconnect = 0.0
+        self.handlers = dispatch_table(type(self))
 
     def update(self):
+        events = self.wait_for_frame()
+        if self.connection and not self.connection.connected and self.session_token is not None:
+            if time.monotonic() - self.last_reconnect >= self.RECONNECT_INTERVAL:
+                self.reconnect()
         if self.connection:
             self.connection.update()
-        self.process_input()
-        self.ui_manager.update(self.game_clock.tick(60))
-        self.screen.fill('white')
-        self.view.draw()
-        pygame.display.update()
+        self.process_input(events)
+        self.ui_manager.update(self.game_clock.tick() / 1000)
+        self.view.update(time.monotonic())
+        self.renderer.render(self.view)
+
+    def wait_for_frame(self) -> list[pygame.event.Event]:
+        # Sleeps until the next frame is due, unless input or a server message (NETWORK_EVENT) arrives first, in
+        # which case it is handled right away. Frames where nothing changed are not drawn, see Renderer.
+        now = time.monotonic()
+        if now < self.next_frame:
+            event = pygame.event.wait(max(1, int((self.next_frame - now) * 1000)))
+            if event.type != pygame.NOEVENT:
+                return [event]
+        self.next_frame = time.monotonic() + 1 / self.FRAMES_PER_SECOND
+        return []
+
+    def open_connection(self) -> ClientConnection:
+        # the connection is pumped on its own thread, which wakes the main loop for every batch of messages
+        return NetworkThread(self.connect, self.server_ip_address, int(10000), self.message_queue,
+                             on_message=lambda: pygame.event.post(pygame.event.Event(NETWORK_EVENT)))
+
+    def reconnect(self):
+        # a new connection asks for our seat back, the server answers with a ResumeState
+        print("Reconnecting to the server")
+        self.last_reconnect = time.monotonic()
+        self.connection.close()
+        self.connection = self.open_connection()
+        self.connection.Send(ResumeGame(self.game_id, self.session_token, self.player.player_id.nickname))
 
     def redraw(self):
-        self.screen.fill('white')
-        self.view.draw()
-        pygame.display.update()
+        self.renderer.render(self.view)
 
     def transition(self, new_view: View):
-        self.screen.fill('white')
         self.view = new_view
+        self.renderer.invalidate()
 
-    def process_input(self):
+    def process_input(self, events: list[pygame.event.Event] = ()):
         while not self.message_queue.empty():
             next_message = self.message_queue.get()
-            fn_name = f"handle_msg_{next_message.name}"
-            if hasattr(self, fn_name):
-                getattr(self, fn_name)(next_message)
+            if next_message.received_at is not None:
+                self.message_latency.append(time.perf_counter() - next_message.received_at)
+            self.renderer.ui_changed()
+            handler = self.handlers.get(next_message.name)
+            if handler:
+                handler(self, next_message)
             else:
                 print(f"Couldn't find handler for {next_message.name}")
 
-        for event in pygame.event.get():
+        for event in [*events, *pygame.event.get()]:
+            if event.type == NETWORK_EVENT:
+                continue  # only there to wake us up, the messages were handled above
             # quit if the quit button was pressed
             self.ui_manager.process_events(event)
+            self.renderer.ui_changed()
             if event.type == pygame.QUIT:
                 exit()
             else:
@@ -80,7 +134,7 @@ class GameClient(TitleView.Delegate):
 
     def did_set_nickname(self, nickname: str):
         # on_text_finished: text input element
-        self.connection = GameConnection(self.server_ip_address, int(10000), self.message_queue)
+        self.connection = self.open_connection()
         if type(self.view) is not TitleView:
             print("Error: received ready but no longer showing title view")
         self.connection.join_game(nickname=nickname)
@@ -137,33 +191,70 @@ class GameClient(TitleView.Delegate):
     #######################################
     ###         SERVER MESSAGE          ###
     #######################################
+    @handles(AssignPlayerID)
     def handle_msg_assign_player_id(self, msg: AssignPlayerID):
         if type(self.view) is not TitleView:
             print("Error: received AssignPlayerID but no longer showing title view")
         self.player = ClientPlayer(msg.player_id)
+        self.game_id = msg.game_id
+        self.session_token = msg.session_token
 
+    @handles(ResumeState)
+    def handle_msg_resume_state(self, msg: ResumeState):
+        print(f"Resumed game {msg.game_id} as {msg.player_id}")
+        self.player_list = [player[0] for player in msg.players]
+        if msg.board is None:
+            cast(TitleView, self.view).add_player_id(msg.players, self.player.player_id)
+            return
+        if self.game_manager is None:
+            self.handle_msg_start_game(StartGame(board=msg.board))
+        game_view = cast(GameView, self.view)
+        self.player.cards = msg.cards
+        self.game_manager.resume_game(self.player_list, msg)
+        if self.game_manager.deduction is None:
+            self.game_manager.start_deduction(self.player_list, msg.cards)
+        self.game_manager.observe(msg)
+        # what was deduced before the disconnect still holds, it just misses the messages sent meanwhile
+        game_view.update_board_elements(msg.board)
+        game_view.display_player_cards(self.player.cards)
+        if msg.turn_id is not None:
+            game_view.set_turn_pointer(msg.turn_id % len(self.player_list))
+        if msg.current_player == self.player.player_id and msg.phase != Phase.GAME_OVER:
+            # a suggester waiting on a disprove gets their actions back once the Disprove arrives
+            if msg.phase != Phase.DISPROVING:
+                game_view.show_actions()
+        if msg.pending_disprove is not None:
+            game_view.show_disprove(self.game_manager.disproving_cards(msg.pending_disprove), msg.pending_disprove)
+
+    @handles(UpdatePlayers)
     def handle_msg_update_players(self, msg: UpdatePlayers):
         if type(self.view) is not TitleView:
             print("Error: received UpdatePlayers but no longer showing title view")
+            return
         self.player_list = [player[0] for player in msg.players]
         cast(TitleView, self.view).add_player_id(msg.players, self.player.player_id)
         print("Received UpdatePlayers!")
         self.redraw()
 
+    @handles(StartGame)
     def handle_msg_start_game(self, msg: StartGame):
         if type(self.view) is not TitleView:
             print("Error: received StartGame but no longer showing title view")
         print("Received StartGame!")
         self.game_manager = ClientGameManager(self.player, msg.board)
+        self.game_manager.start_game(self.player_list)
         game_view = GameView(self.screen, self.ui_manager, self, self.game_manager)
         self.transition(game_view)
         game_view.initialize_player_list(self.player_list, self.player.player_id)
         game_view.update_board_elements(msg.board)
 
+    @handles(DealCards)
     def handle_msg_deal_cards(self, msg: DealCards):
         print("Received DealCards!")
         self.player.cards = msg.cards
+        self.game_manager.start_deduction(self.player_list, msg.cards)
 
+    @handles(YourTurn)
     def handle_msg_start_turn(self, msg: YourTurn):
         print("Received Start Turn!")
         if type(self.view) is not GameView:
@@ -172,41 +263,40 @@ class GameClient(TitleView.Delegate):
         game_view.set_turn_pointer(msg.turn_id % len(self.player_list))
         if type(self.view) is GameView:
             cast(GameView, self.view).display_player_cards(self.player.cards)
+        self.game_manager.start_turn(msg)
         if self.player.player_id == msg.player_id:
-            self.game_manager.start_turn(msg.turn_id)
             game_view.show_actions()
 
 
 
+    @handles(Move)
     def handle_msg_ClientAction_move(self, msg: Move):
         print("Received Move!")
         game_view = cast(GameView, self.view)
-        self.game_manager.board.move(msg.player_id, msg.position)
+        self.game_manager.follow(msg)
         print(self.game_manager.board)
         game_view.update_board_elements(self.game_manager.board)
         if msg.player_id == self.player.player_id:
             game_view.show_actions()
         else:
-            game_view.set_dialog(f"{msg.player_id.character.value} moved to the "
-                                 f"{self.game_manager.board.get_character_position_description(msg.player_id)}.")
-            self.redraw()
-            pygame.time.delay(2000)
-            game_view.restore_default_menu_text()
+            game_view.notify(f"{msg.player_id.character.value} moved to the "
+                             f"{self.game_manager.board.get_character_position_description(msg.player_id)}.",
+                             key=(Move.name, msg.player_id))
 
+    @handles(Suggest)
     def handle_msg_ClientAction_suggest(self, suggest: Suggest):
-        self.game_manager.handle_suggestion(suggest)
+        # the suggested character is brought into the room
+        self.game_manager.follow(suggest)
+        self.game_manager.observe(suggest)
         game_view = cast(GameView, self.view)
 
         game_view.update_board_elements(self.game_manager.board)
-        if self.player.player_id == suggest.player_id:
-            self.game_manager.suggest(suggest.suggestion)
-        else:
-            game_view.set_dialog(f"{suggest.player_id.nickname} suggested that {suggest.suggestion[0].value} committed murder\n"
-                                 f"using the {suggest.suggestion[1].value} in the {suggest.suggestion[2].value}.")
-            self.redraw()
-            pygame.time.delay(2000)
-            game_view.restore_default_menu_text()
+        if self.player.player_id != suggest.player_id:
+            game_view.notify(f"{suggest.player_id.nickname} suggested that {suggest.suggestion[0].value} committed murder\n"
+                             f"using the {suggest.suggestion[1].value} in the {suggest.suggestion[2].value}.",
+                             key=(Suggest.name, suggest.player_id))
 
+    @handles(RequestDisprove)
     def handle_msg_request_disprove(self, request_disprove: RequestDisprove):
         print("Received Request Disprove")
         print(request_disprove.suggest.suggestion)
@@ -214,43 +304,72 @@ class GameClient(TitleView.Delegate):
         game_view = cast(GameView, self.view)
         game_view.show_disprove(disproving_cards, request_disprove.suggest)
 
+    @handles(Disprove)
     def handle_msg_ClientAction_disprove(self, disprove: Disprove):
+        # only the suggester is sent the Disprove, with the card
+        self.game_manager.observe(disprove)
         game_view = cast(GameView, self.view)
-
-        if disprove.suggest.player_id == self.player.player_id:
-            if not disprove.card:
-                text = "No one was able to disprove your suggestion."
-            else:
-                text = (f"{disprove.player_id.nickname} disproved your suggestion!\n"
-                        + f"The disproving card is {disprove.card.card_value}.")
-            game_view.set_dialog(text)
-            self.redraw()
-            pygame.time.delay(2000)
-            game_view.show_actions()
-        elif disprove.player_id != self.player.player_id:
-            if not disprove.card:
-                text = f"No one was able to disprove {disprove.suggest.player_id.nickname}'s suggestion."
+        if not disprove.card:
+            text = "No one was able to disprove your suggestion."
+        else:
+            text = (f"{disprove.player_id.nickname} disproved your suggestion!\n"
+                    + f"The disproving card is {disprove.card.card_value}.")
+        # the actions are there right away, the card stays on screen above them for a while
+        game_view.show_actions()
+        game_view.notify(text)
+
+    @handles(Disproved)
+    def handle_msg_disproved(self, disproved: Disproved):
+        self.game_manager.observe(disproved)
+        game_view = cast(GameView, self.view)
+        if disproved.player_id != self.player.player_id:
+            if disproved.player_id == disproved.suggester:
+                text = f"No one was able to disprove {disproved.suggester.nickname}'s suggestion."
             else:
-                text = f"{disprove.suggest.player_id.nickname}'s suggestion was disproved by {disprove.player_id.nickname}."
-            game_view.set_dialog(text)
-            self.redraw()
-            pygame.time.delay(2000)
-            game_view.restore_default_menu_text()
+                text = f"{disproved.suggester.nickname}'s suggestion was disproved by {disproved.player_id.nickname}."
+            game_view.notify(text, key=(Disproved.name, disproved.suggester))
 
+    @handles(Accuse)
     def handle_msg_ClientAction_accuse(self, accuse: Accuse):
+        # only wrong accusations are broadcast, a right one ends the game
+        self.game_manager.follow(accuse)
+        self.game_manager.observe(accuse)
         game_view = cast(GameView, self.view)
         game_view.show_accusation_incorrect(accuse, is_own_accusation=self.player.player_id == accuse.player_id)
         if self.player.player_id == accuse.player_id:
+            self.player.active = False
             self.connection.Send(self.game_manager.end_turn())
-        self.redraw()
-        pygame.time.delay(2000)
-        game_view.restore_default_menu_text()
 
+    @handles(EndTurn)
     def handle_msg_ClientAction_end_turn(self, end_turn: EndTurn):
         print("Received End Turn!")
-        # if self.player.player_id == end_turn.player_id:
+        self.game_manager.follow(end_turn)
+
+
+    @handles(Rejected)
+    def handle_msg_rejected(self, rejected: Rejected):
+        # the server did not allow an action of ours, nothing happened and it is still up to us
+        print(f"Rejected {rejected.action}: {rejected.reason}")
+        if rejected.action == ResumeGame.name:
+            self.leave_game()
+            return
+        if type(self.view) is not GameView:
+            return
+        game_view = cast(GameView, self.view)
+        game_view.notify(f"That is not allowed: {rejected.reason}.")
+        if self.game_manager.state.seat == self.game_manager.seat:
+            game_view.show_actions()
 
+    def leave_game(self):
+        # Our seat is gone, the server has put us in a new lobby instead. Its AssignPlayerID and UpdatePlayers
+        # follow, and are handled by the title view as after joining.
+        self.game_manager = None
+        self.player_list = []
+        title_view = TitleView(self.screen, self.server_ip_address, self.ui_manager, delegate=self)
+        self.transition(title_view)
+        title_view.transition_to_ready_button()
 
+    @handles(EndGame)
     def handle_msg_end_game(self, end_game: EndGame):
         print(f"{end_game.accuse.player_id.nickname} guessed correctly. Game Over!")
         game_view = cast(GameView, self.view)
@@ -1,32 +1,64 @@
-from typing import cast
-
 from client_player import ClientPlayer
-from clueless.messages.messages import BaseClientAction, Move, Suggest, Disprove, EndTurn, Accuse, EndGame
-from clueless.model.board import Board, Room
-from clueless.model.board_enums import ActionType, Direction, Character, Weapon, Location
+from clueless.messages.messages import Move, Suggest, Disprove, EndTurn, Accuse, EndGame, BaseMessage, YourTurn, \
+    ResumeState
+from clueless.model import rules
+from clueless.model.board import Board
+from clueless.model.board_enums import Character, Weapon, Location
 from clueless.model.card import Card
-
-
-class Turn:
-
-    def __init__(self, turn_id):
-        self.turn_id: int = turn_id
-        self.actions_taken: list[BaseClientAction] = []
-
-    def is_last_action_move(self):
-        return self.actions_taken and self.actions_taken[-1].action_type == ActionType.MOVE
+from clueless.model.compact_board import board_at
+from clueless.model.deduction import DeductionEngine
+from clueless.model.observer import public_game, resumed_game, follow, movement_options
+from clueless.model.player import PlayerID
 
 
 class ClientGameManager:
+    # Follows the game through the rules from the server's messages (see observer). The board the view draws is
+    # rebuilt from the positions the rules come up with, the one the server sent is never changed.
     def __init__(self, player, board):
         self.player: ClientPlayer = player
-        self.previous_turn = None
-        self.current_turn = None
         self.board: Board = board
-
-    def start_turn(self, turn_id: int):
-        self.previous_turn = self.current_turn
-        self.current_turn = Turn(turn_id=turn_id)
+        self.board_players: list[PlayerID] = list(board.player_tokens)
+        self.state: rules.GameState | None = None
+        self.turn_id: int | None = None
+        self.deduction: DeductionEngine | None = None
+
+    def start_game(self, players: list[PlayerID]):
+        # players in turn order, which is the order they joined the lobby
+        self.state = public_game(players, self.board)
+
+    def resume_game(self, players: list[PlayerID], resume: ResumeState):
+        self.board = resume.board
+        self.board_players = list(resume.board.player_tokens)
+        self.state = resumed_game(players, resume)
+        self.turn_id = resume.turn_id
+        self.player.active = bool(resume.active >> self.seat & 1)
+
+    @property
+    def seat(self) -> int:
+        return rules.seat_of(self.state, self.player.player_id)
+
+    def start_deduction(self, players: list[PlayerID], cards: list[Card]):
+        # players in turn order, which is the order they joined the lobby
+        self.deduction = DeductionEngine(players, self.player.player_id, cards)
+
+    def observe(self, message: BaseMessage):
+        if self.deduction is not None:
+            self.deduction.observe(message)
+            if self.deduction.solution():
+                print(f"Deduced solution: {self.deduction.solution()}")
+
+    def follow(self, message: BaseMessage):
+        # The server has checked the action already, an IllegalAction means we missed something
+        try:
+            self.state = follow(self.state, message)
+        except rules.IllegalAction as e:
+            print(f"Error: {message.name} does not follow from the game as we know it: {e}")
+            return
+        self.board = board_at(self.board_players, self.state.positions)
+
+    def start_turn(self, your_turn: YourTurn):
+        self.turn_id = your_turn.turn_id
+        self.follow(your_turn)
 
     def disproving_cards(self, suggestion: Suggest):
         disproving_cards = []
@@ -46,12 +78,10 @@ class ClientGameManager:
             player_id=self.player.player_id,
             position=position
         )
-        self.current_turn.actions_taken.append(move_command)
         return move_command
 
     def suggest(self, suggestion: (Character, Weapon, Location)):
         suggest_command = Suggest(player_id=self.player.player_id, suggestion=suggestion)
-        self.current_turn.actions_taken.append(suggest_command)
         return suggest_command
 
     def accuse(self, accusation: (Character, Weapon, Location)):
@@ -59,24 +89,12 @@ class ClientGameManager:
             player_id=self.player.player_id,
             accusation=accusation
         )
-        self.current_turn.actions_taken.append(accuse_command)
         return accuse_command
 
     def end_turn(self):
         selected_action = EndTurn(player_id=self.player.player_id)
-        self.current_turn.actions_taken.append(selected_action)
         return selected_action
 
-    def handle_suggestion(self, suggest: Suggest):
-        suggested_player_id = self.board.get_player_id(suggest.suggestion[0])
-        location = suggest.suggestion[2].get_position()
-        if not location == self.board.get_player_position(
-                suggested_player_id):  # no change in location so we don't move
-            self.board.move(suggested_player_id, location)
-            if suggested_player_id == self.player.player_id:
-                self.player.is_lastmove_suggested = True
-                print(f"Moved current player by suggestion: {self.player.is_lastmove_suggested}")
-
     def handle_accusation_response(self, accuse: Accuse):
 
         if accuse.is_correct:
@@ -90,23 +108,8 @@ class ClientGameManager:
         return selected_action
 
     def available_movement_options(self):
-        return self.board.get_movement_options(self.player.player_id)
+        return movement_options(self.state, self.seat)
 
     def available_actions(self):
-
-        available = []
-
-        if self.board.get_movement_options(self.player.player_id) and not self.current_turn.actions_taken:
-            available.append(ActionType.MOVE)
-        if self.player.is_lastmove_suggested or (self.current_turn.is_last_action_move() and
-                                                 self.board.is_in_room(
-                                                     self.player.player_id)):  # or moved by suggestion
-            available.append(ActionType.SUGGEST)
-        available.append(ActionType.ACCUSE)
-        if len(available) == 1 and available[0] == ActionType.ACCUSE:
-            available.append(ActionType.END_TURN)
-
-        if not self.current_turn.actions_taken:
-            self.player.is_lastmove_suggested = False  # reset is_lastmove_suggested if it is the first action to be taken
-            # TODO: remove the SUGGEST option if we suggested in this room last turn,
-        return available
+        # TODO: remove the SUGGEST option if we suggested in this room last turn,
+        return rules.current_action_types(self.state)
@@ -8,7 +8,6 @@ class ClientPlayer(PlayerIDWrapper):
         self.cards = []
         # self.can_suggest = False
         self.active = True
-        self.is_lastmove_suggested = False
     @property
     def active(self):
         return self._active
@@ -1,38 +1,38 @@
+import asyncore
 import queue
+import select
+import socket
+import threading
 import time
-from typing import Type
+from typing import Callable
 
-from PodSixNet.Connection import ConnectionListener, connection
+from PodSixNet.Connection import ConnectionListener
+from PodSixNet.Channel import Channel
+from PodSixNet.EndPoint import EndPoint
 
-from clueless.messages.messages import JoinGame, Ready, UpdatePlayers, AssignPlayerID, DealCards, YourTurn, \
-    RequestDisprove, \
-    Disprove, BaseMessage, StartGame, Move, Suggest, Accuse, BaseClientAction, EndGame, EndTurn
+from clueless.messages.framing import FrameReader, encode_frame
+from clueless.messages.messages import JoinGame, Ready, BaseMessage, Move, BaseClientAction
+from clueless.messages.registry import MESSAGES
 
 
-class GameConnection(ConnectionListener):
-    # Responsible for sending and receiving messages to and from the server.
-    # When receiving messages from the server, these messages will be added to the message queue
-    # which the game client will react to.
-    def __init__(self, host, port, message_queue: queue.SimpleQueue):
-        self.Connect((host, port))
-        self.message_queue = message_queue
-        print("Connected to server")
-        print("Ctrl-C to exit")
-
-    def update(self):
-        connection.Pump()
-        self.Pump()
-
-        time.sleep(0.001)
+class ClientConnection:
+    # What GameClient needs from a transport: Send() a message, and update() to move messages from the server
+    # into message_queue, waiting up to timeout seconds for them. GameConnection and FramedConnection talk to a
+    # server over TCP (PodSixNet format and length-prefixed frames), LoopbackConnection to one in this process.
+    message_queue: queue.SimpleQueue
+    connected: bool
 
     def Send(self, data: BaseMessage):
-        connection.Send(data.serialize())
+        raise NotImplementedError
+
+    def update(self, timeout=0.001):
+        raise NotImplementedError
 
     #######################################
     ### SEND HELPERS                    ###
     #######################################
-    def join_game(self, nickname: str):
-        self.Send(JoinGame(nickname=nickname))
+    def join_game(self, nickname: str, game_id: int | None = None):
+        self.Send(JoinGame(nickname=nickname, game_id=game_id))
 
     def ready(self):
         self.Send(Ready())
@@ -43,6 +43,46 @@ class GameConnection(ConnectionListener):
     def next_action(self, msg: BaseClientAction):
         self.Send(msg)
 
+
+class GameConnection(ClientConnection, ConnectionListener):
+    # Responsible for sending and receiving messages to and from the server.
+    # When receiving messages from the server, these messages will be added to the message queue
+    # which the game client will react to.
+
+    # PodSixNet's own events, handled by the Network_* methods below
+    BUILT_IN_ACTIONS = {"connected", "error", "disconnected", "socketConnect"}
+
+    # Each connection owns its socket (an EndPoint) instead of using PodSixNet's module-level `connection`,
+    # so a process can hold any number of them. Connections created with the same socket_map can be pumped
+    # together by a ConnectionGroup.
+    def __init__(self, host, port, message_queue: queue.SimpleQueue, socket_map: dict | None = None):
+        self.socket_map = {} if socket_map is None else socket_map
+        self.endpoint = EndPoint((host, port), map=self.socket_map)
+        self.message_queue = message_queue
+        self.connected = True
+        self.Connect()
+        print("Connected to server")
+        print("Ctrl-C to exit")
+
+    def Connect(self, *args, **kwargs):
+        self.endpoint.DoConnect(*args, **kwargs)
+        self.Pump()
+
+    def Pump(self):
+        # same as ConnectionListener.Pump, reading this connection's endpoint
+        for data in self.endpoint.GetQueue():
+            [getattr(self, n)(data) for n in ("Network_" + data['action'], "Network") if hasattr(self, n)]
+
+    def update(self, timeout=0.001):
+        # EndPoint.Pump, except that it waits on the socket instead of sleeping after it
+        Channel.Pump(self.endpoint)
+        self.endpoint.queue = []
+        asyncore.poll2(timeout, self.socket_map)
+        self.Pump()
+
+    def Send(self, data: BaseMessage):
+        self.endpoint.Send(data.serialize())
+
     #######################################
     ### Network event/message callbacks ###
     #######################################
@@ -51,35 +91,12 @@ class GameConnection(ConnectionListener):
     def Network(self, data):
         # Deserializes the server payload as a Message and adds Message to the message queue
         # The message queue will be polled by the game client.
-        msg_type: Type[BaseMessage]
         action_name = data['action']
-        if action_name == AssignPlayerID.name:
-            msg_type = AssignPlayerID
-        elif action_name == UpdatePlayers.name:
-            msg_type = UpdatePlayers
-        elif action_name == StartGame.name:
-            msg_type = StartGame
-        elif action_name == DealCards.name:
-            msg_type = DealCards
-        elif action_name == YourTurn.name:
-            msg_type = YourTurn
-        elif action_name == EndGame.name:
-            msg_type = EndGame
-        # CLIENT ACTIONS
-        elif action_name == Move.client_action_name():
-            msg_type = Move
-        elif action_name == Suggest.client_action_name():
-            msg_type = Suggest
-        elif action_name == Disprove.client_action_name():
-            msg_type = Disprove
-        elif action_name == RequestDisprove.name:
-            msg_type = RequestDisprove
-        elif action_name == Accuse.client_action_name():
-            msg_type = Accuse
-        elif action_name == EndTurn.client_action_name():
-            msg_type = EndTurn
-        else:
-            print(f"ERROR: couldn't find corresponding message for {data['action']}")
+        if action_name in self.BUILT_IN_ACTIONS:
+            return
+        msg_type = MESSAGES.for_name(action_name)
+        if msg_type is None:
+            print(f"ERROR: couldn't find corresponding message for {action_name}")
             return
         self.message_queue.put(msg_type.deserialize(data))
 
@@ -90,8 +107,156 @@ class GameConnection(ConnectionListener):
 
     def Network_error(self, data):
         print('error:', data['error'][1])
-        connection.Close()
+        self.endpoint.Close()
 
     def Network_disconnected(self, data):
+        # the owner decides what to do about it, GameClient reconnects and resumes its seat
         print('Server disconnected')
-        exit()
+        self.connected = False
+
+
+class ConnectionGroup:
+    # Multiplexes many GameConnections on one thread: they share a socket map, so one poll() call waits on all
+    # of their sockets at once.
+
+    def __init__(self):
+        self.socket_map: dict = {}
+        self.connections: list[GameConnection] = []
+
+    def connect(self, host, port, message_queue: queue.SimpleQueue) -> GameConnection:
+        game_connection = GameConnection(host, port, message_queue, socket_map=self.socket_map)
+        self.connections.append(game_connection)
+        return game_connection
+
+    def update(self, timeout=0.001):
+        # EndPoint.Pump split in two, so the sockets are polled once per update rather than once per connection
+        for game_connection in self.connections:
+            Channel.Pump(game_connection.endpoint)
+            game_connection.endpoint.queue = []
+        # poll2 uses poll(2), which unlike select(2) has no limit on descriptor numbers
+        asyncore.poll2(timeout, self.socket_map)
+        for game_connection in self.connections:
+            game_connection.Pump()
+        self.connections = [c for c in self.connections if c.connected]
+
+
+class FramedConnection(ClientConnection):
+    # Talks to a server started with --runtime framed, using length-prefixed binary frames. Every update() reads
+    # whatever has arrived straight into a FrameReader and queues all the complete messages in it.
+
+    def __init__(self, host, port, message_queue: queue.SimpleQueue):
+        self.message_queue = message_queue
+        self.socket = socket.create_connection((host, port))
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = FrameReader()
+        self.connected = True
+        print("Connected to server")
+
+    def Send(self, data: BaseMessage):
+        if self.connected:
+            self.socket.sendall(encode_frame(data))
+
+    def update(self, timeout=0.001):
+        readable, _, _ = select.select([self.socket], [], [], timeout)
+        if readable and self.connected:
+            with self.reader.writable() as buffer:
+                received = self.socket.recv_into(buffer)
+            if received == 0:
+                print('Server disconnected')
+                self.connected = False
+                self.socket.close()
+                return
+            self.reader.advance(received)
+            for message in self.reader.messages():
+                self.message_queue.put(message)
+
+    def close(self):
+        self.connected = False
+        self.socket.close()
+
+
+class LoopbackConnection(ClientConnection):
+    # Connects to a loopback_server.LoopbackServer in the same process. Messages are handed over as objects:
+    # Send() runs the server's handler right away, and the server's replies land in message_queue directly.
+
+    def __init__(self, server, message_queue: queue.SimpleQueue):
+        self.message_queue = message_queue
+        self.connected = True
+        self.channel = server.accept(self)
+
+    def Send(self, data: BaseMessage):
+        if self.connected:
+            self.channel.Receive(data)
+
+    def deliver(self, message: BaseMessage):
+        self.message_queue.put(message)
+
+    def update(self, timeout=0.0):
+        # replies are queued as they are sent, there is nothing to pump
+        if timeout:
+            time.sleep(timeout)
+
+    def close(self):
+        self.connected = False
+        self.channel.Close()
+
+
+class NetworkThread(ClientConnection):
+    # Runs a connection on its own thread, so server messages are read as they arrive instead of once per frame,
+    # and a slow frame no longer holds them up. They still land in message_queue, stamped with received_at, and
+    # on_message is called from the network thread after each batch (GameClient posts a pygame event to wake up).
+    # Send() only queues the message, the connection itself is only ever used from its own thread.
+
+    def __init__(self, connect: Callable[[str, int, queue.SimpleQueue], ClientConnection], host, port,
+                 message_queue: queue.SimpleQueue, on_message: Callable[[], None] | None = None,
+                 poll_interval=0.005):
+        self.message_queue = message_queue
+        self.on_message = on_message
+        self.poll_interval = poll_interval  # longest a Send() waits for the thread to pick it up
+        self._arrivals: queue.SimpleQueue[BaseMessage] = queue.SimpleQueue()
+        self._outgoing: queue.SimpleQueue[BaseMessage] = queue.SimpleQueue()
+        self._running = True
+        self._failed = False  # the thread stopped on an error, the connection counts as disconnected
+        self.connection = connect(host, port, self._arrivals)
+        self._thread = threading.Thread(target=self.__run, name="client-network", daemon=True)
+        self._thread.start()
+
+    @property
+    def connected(self) -> bool:
+        return not self._failed and self.connection.connected
+
+    def Send(self, data: BaseMessage):
+        self._outgoing.put(data)
+
+    def update(self, timeout=0.0):
+        # the network thread does the work
+        pass
+
+    def close(self):
+        self._running = False
+        self._thread.join()
+        if hasattr(self.connection, "close"):
+            self.connection.close()
+
+    def __run(self):
+        while self._running and not self._failed:
+            try:
+                while not self._outgoing.empty():
+                    self.connection.Send(self._outgoing.get())
+                if self.connection.connected:
+                    self.connection.update(timeout=self.poll_interval)
+                else:
+                    time.sleep(self.poll_interval)
+            except Exception as e:
+                # GameClient reconnects as if the server had closed the connection, on_message below wakes it up
+                print(f"Network thread stopped: {type(e).__name__}: {e}")
+                self._failed = True
+            if self._arrivals.empty() and not self._failed:
+                continue
+            received_at = time.perf_counter()
+            while not self._arrivals.empty():
+                message = self._arrivals.get()
+                message.received_at = received_at
+                self.message_queue.put(message)
+            if self.on_message is not None:
+                self.on_message()
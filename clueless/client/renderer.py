@@ -0,0 +1,114 @@
+import time
+
+import pygame
+import pygame_gui
+from pygame import Color
+
+from clueless.client.view import View
+
+# Retained-mode drawing: the screen keeps last frame's pixels, and each frame only the areas that changed are
+# cleared, redrawn and pushed to the display. A frame where nothing changed draws nothing at all.
+#
+# Elements report their own changes (Element.collect_damage). pygame_gui draws its sprites itself, so they are
+# compared with the previous frame, and redrawn in full for a moment after input (hover and press states) and while
+# one of them has focus (the text cursor blinks).
+
+
+class FrameStats:
+    def __init__(self):
+        self.frames = 0
+        self.drawn = 0
+        self.pixels = 0  # pushed to the display
+        self.seconds = 0.0  # spent in render(), skipped frames included
+        self.cpu_seconds = 0.0
+
+    def add(self, seconds: float, cpu_seconds: float, pixels: int):
+        self.frames += 1
+        self.drawn += pixels > 0
+        self.pixels += pixels
+        self.seconds += seconds
+        self.cpu_seconds += cpu_seconds
+
+    def __repr__(self):
+        frames = self.frames or 1
+        return (f"FrameStats(frames={self.frames}, drawn={self.drawn}, "
+                f"mean_frame_ms={self.seconds / frames * 1000:.3f}, "
+                f"mean_cpu_ms={self.cpu_seconds / frames * 1000:.3f}, pixels_per_frame={self.pixels // frames})")
+
+
+class Renderer:
+    UI_SETTLE_SECONDS = 0.5  # pygame_gui sprites are redrawn for this long after input
+    MAX_RECTS = 8  # more damaged areas than this are drawn as their union
+
+    def __init__(self, screen: pygame.Surface, ui_manager: pygame_gui.UIManager, background=Color("white")):
+        self.screen = screen
+        self.ui_manager = ui_manager
+        self.background = background
+        self.stats = FrameStats()
+        self.__full_redraw = True
+        self.__ui_busy_until = 0.0
+        self.__ui_drawn: dict[int, (pygame.Surface, pygame.Rect)] = {}
+
+    def invalidate(self):
+        # redraws the whole screen next frame, e.g. after switching views
+        self.__full_redraw = True
+
+    def ui_changed(self):
+        # input or a message may have changed pygame_gui elements in place
+        self.__ui_busy_until = time.monotonic() + self.UI_SETTLE_SECONDS
+
+    def render(self, view: View) -> bool:
+        # Returns whether anything was drawn
+        start, cpu_start = time.perf_counter(), time.process_time()
+        damage = view.collect_damage() + self.__ui_damage()
+        if self.__full_redraw:
+            self.__full_redraw = False
+            damage = [self.screen.get_rect()]
+        rects = self.__merge(damage)
+        for rect in rects:
+            self.screen.set_clip(rect)
+            self.screen.fill(self.background, rect)
+            view.draw()
+        self.screen.set_clip(None)
+        if rects:
+            pygame.display.update(rects)
+        self.stats.add(time.perf_counter() - start, time.process_time() - cpu_start,
+                       sum(rect.width * rect.height for rect in rects))
+        return bool(rects)
+
+    def __ui_damage(self) -> list[pygame.Rect]:
+        busy = time.monotonic() < self.__ui_busy_until
+        drawn = {}
+        damage = []
+        for sprite in self.ui_manager.get_sprite_group().sprites():
+            if not sprite.visible or sprite.image is None:
+                continue
+            drawn[id(sprite)] = (sprite.image, sprite.rect.copy())
+            before = self.__ui_drawn.pop(id(sprite), None)
+            if busy or before is None or before[0] is not sprite.image or before[1] != sprite.rect:
+                damage.append(sprite.rect.copy())
+                if before is not None and before[1] != sprite.rect:
+                    damage.append(before[1])
+        # whatever is left was killed or hidden since the last frame
+        damage += [rect for _, rect in self.__ui_drawn.values()]
+        self.__ui_drawn = drawn
+        for element in self.ui_manager.get_focus_set() or ():
+            if element.visible:
+                damage.append(element.rect.copy())
+        return damage
+
+    def __merge(self, damage: list[pygame.Rect]) -> list[pygame.Rect]:
+        screen = self.screen.get_rect()
+        rects = []
+        for rect in damage:
+            rect = rect.clip(screen)
+            if rect.width == 0 or rect.height == 0:
+                continue
+            # overlapping areas are drawn once, as their union
+            for i in reversed(range(len(rects))):
+                if rect.colliderect(rects[i]):
+                    rect = rect.union(rects.pop(i))
+            rects.append(rect)
+        if len(rects) > self.MAX_RECTS:
+            return [rects[0].unionall(rects[1:])]
+        return rects
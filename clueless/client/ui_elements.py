@@ -4,6 +4,7 @@ import pygame
 import pygame_gui
 from pygame import Color
 
+from clueless.client.assets import IMAGES, TEXT
 from clueless.client.ui_enums import Alignment
 from clueless.model.board_enums import ActionType, Direction, Character, Weapon, Location
 from clueless.model.card import Card
@@ -16,6 +17,8 @@ class Element(Protocol):
         self.wrapped = wrapped
         self._hidden = False
         self._rectangle: pygame.Rect = rectangle
+        # (wrapped, rectangle, hidden) when the renderer last collected this element's damage
+        self._drawn: (object, (int, int, int, int), bool) | None = None
 
     def hide(self):
         self._hidden = True
@@ -42,6 +45,18 @@ class Element(Protocol):
         if not self._hidden:
             screen.blit(self.wrapped, self.rectangle)
 
+    def collect_damage(self) -> list[pygame.Rect]:
+        # The areas of the screen to redraw since the last call: where the element was and where it is now, if it
+        # was moved, hidden, shown or given a new surface. Nothing if it is unchanged.
+        drawn = self._drawn
+        self._drawn = (self.wrapped, tuple(self.rectangle), self._hidden)
+        if drawn is not None and drawn[0] is self.wrapped and drawn[1:] == self._drawn[1:]:
+            return []
+        damage = [pygame.Rect(drawn[1])] if drawn is not None and not drawn[2] else []
+        if not self._hidden:
+            damage.append(self.rectangle.copy())
+        return damage
+
     # Permanently remove and clean up element from any managers.
     def kill(self):
         pass
@@ -55,6 +70,10 @@ class ManagedElement(Element):
     def draw_onto(self, screen: pygame.Surface):
         pass
 
+    def collect_damage(self) -> list[pygame.Rect]:
+        # drawn by the UIManager, the renderer watches its sprites instead
+        return []
+
     def set_top_left(self, top_left: (int, int)):
         self.wrapped.set_position(top_left)
 
@@ -150,21 +169,26 @@ class TextElement(Element):
                  align: int = pygame.FONT_LEFT,
                  size: int = 32,
                  primary_color: Color = Color("black")):
-        self.font = pygame.font.Font(filename="../resources/VT323-Regular.ttf", size=size)
-        self.font.align = align
-        surface = self.font.render(text, True, primary_color, bgcolor=Color("white"))
+        # fonts and rendered text are shared through the TEXT cache
+        self.align = align
+        self._strikethrough = False
+        surface = TEXT.render(text, size, primary_color, align, background=Color("white"))
         super().__init__(surface, surface.get_rect())
         self._text = text
         self.size = size
         self.primary_color = primary_color
 
+    @property
+    def font(self) -> pygame.font.Font:
+        return TEXT.font(self.size)
+
     @property
     def strikethrough(self):
-        return self.font.strikethrough
+        return self._strikethrough
 
     @strikethrough.setter
     def strikethrough(self, is_strikethrough):
-        self.font.strikethrough = is_strikethrough
+        self._strikethrough = is_strikethrough
         self.__rerender()
 
     @property
@@ -178,7 +202,7 @@ class TextElement(Element):
 
     def __rerender(self):
         old_rect = self.rectangle
-        self.wrapped = self.font.render(self.text, True, self.primary_color)
+        self.wrapped = TEXT.render(self.text, self.size, self.primary_color, self.align, self._strikethrough)
         self._rectangle = self.wrapped.get_rect()
         self.rectangle.center = old_rect.center
 
@@ -197,9 +221,8 @@ class TextElement(Element):
 
 class ImageElement(Element):
     def __init__(self, name, size):
-        image = pygame.image.load(f'../resources/{name}.png').convert_alpha()
-        # Scale the image to your needed size
-        scaled_image = pygame.transform.smoothscale(image, size)
+        # loaded and scaled once per size, the surface is shared with every other element showing it
+        scaled_image = IMAGES.get(name, size)
         super().__init__(scaled_image, scaled_image.get_rect())
 
     def to_grayscale(self):
@@ -255,6 +278,15 @@ class Stack(Element):
         for element in self.elements:
             element.draw_onto(screen)
 
+    def collect_damage(self) -> list[pygame.Rect]:
+        damage = [rect for element in self.elements for rect in element.collect_damage()]
+        # elements taken out of the stack no longer report where they were, the stack covered them all
+        drawn = self._drawn
+        self._drawn = (tuple(self.elements), tuple(self.rectangle), False)
+        if drawn is not None and drawn != self._drawn:
+            damage += [pygame.Rect(drawn[1]), self.rectangle.copy()]
+        return damage
+
     def respond_to_event(self, fn_name, event):
         for element in self.elements:
             if hasattr(element, fn_name):
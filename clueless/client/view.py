@@ -1,3 +1,5 @@
+import time
+from collections import deque
 from enum import Enum
 from math import sqrt
 from typing import Protocol, Type, cast
@@ -32,6 +34,12 @@ class View(Protocol):
         # elements is a private property. adding and deleting elements require dedicated methods so that we can
         # kill pygame_gui elements when we want to remove them from the screen.
         self.__elements: list[Element] = []
+        # areas of elements deleted since the renderer last collected the damage
+        self.__damage: list[pygame.Rect] = []
+
+    def update(self, now: float):
+        # called every frame with time.monotonic(), for anything that changes with time
+        pass
 
     def draw(self):
         self.ui_manager.draw_ui(self.screen)
@@ -42,9 +50,18 @@ class View(Protocol):
         self.__elements.append(element)
 
     def del_element(self, element: Element):
+        element.hide()
+        self.__damage += element.collect_damage()
         element.kill()
         self.__elements.remove(element)
 
+    def collect_damage(self) -> list[pygame.Rect]:
+        # what changed on screen since the last call, see Element.collect_damage
+        damage, self.__damage = self.__damage, []
+        for element in self.__elements:
+            damage += element.collect_damage()
+        return damage
+
     def respond_to_event(self, event):
         """
         An element declares it can respond to event if it has the function named "respond_to_{event_name}"
@@ -78,6 +95,7 @@ class View(Protocol):
 class TitleView(View):
     DEFAULT_BUTTON_SIZE = (250, 30)
     DEFAULT_LOBBY_IMAGE_SIZE = (65, 65)
+    READY_IMAGE_SIZE = (20, 20)
 
     class Delegate(Protocol):
         def did_update_server_ip(self, new_ip_address: str):
@@ -137,8 +155,7 @@ class TitleView(View):
     def __on_ready(self):
         self.delegate.did_ready()
         cast(ManagedButton, self.interactive_element).set_text("")
-        check_height = self.interactive_element.rectangle.height - 10
-        ready_check = ImageElement("check_mark", (check_height, check_height))
+        ready_check = ImageElement("check_mark", self.READY_IMAGE_SIZE)
         ready_check.set_center(self.interactive_element.rectangle.center)
         self.add_element(ready_check)
 
@@ -149,7 +166,7 @@ class TitleView(View):
             formatted_text = f"{player_id.character.value}: {player_id.nickname}"
             if player_id == current_player_id:
                 formatted_text = formatted_text + " (YOU)"
-            player_ready_avatar = ImageElement("check_mark" if ready else "cross_mark", (20, 20))
+            player_ready_avatar = ImageElement("check_mark" if ready else "cross_mark", self.READY_IMAGE_SIZE)
             player_avatar = ImageElement(name=player_id.character.file_name, size=self.DEFAULT_LOBBY_IMAGE_SIZE)
             player_text = TextElement(text=formatted_text,
                                       size=16,
@@ -160,6 +177,45 @@ class TitleView(View):
         self.lobby_stack.set_bottom_right(self.SCREEN_SIZE)
 
 
+class Notification:
+    def __init__(self, text: str, seconds: float, key):
+        self.text = text
+        self.seconds = seconds
+        self.key = key
+        self.shown_at: float | None = None
+
+
+class NotificationQueue:
+    # Timed messages shown one after another without blocking the main loop. While others are waiting, each one
+    # is only shown for BACKLOG_SECONDS so a burst of events does not fall behind, and a new notification with the
+    # key of one still in the queue replaces its text instead of queueing behind it.
+    BACKLOG_SECONDS = 0.75
+
+    def __init__(self):
+        self.__queue: deque[Notification] = deque()
+
+    def push(self, text: str, seconds: float, key=None):
+        if key is not None:
+            for notification in self.__queue:
+                if notification.key == key:
+                    notification.text = text
+                    return
+        self.__queue.append(Notification(text, seconds, key))
+
+    def current(self, now: float) -> str | None:
+        # the text to show at time now, or None once every notification has expired
+        while self.__queue:
+            notification = self.__queue[0]
+            if notification.shown_at is None:
+                notification.shown_at = now
+            seconds = notification.seconds if len(self.__queue) == 1 else min(notification.seconds,
+                                                                              self.BACKLOG_SECONDS)
+            if now < notification.shown_at + seconds:
+                return notification.text
+            self.__queue.popleft()
+        return None
+
+
 class GameView(View):
     HORIZONTAL_PADDING = 15
     VERTICAL_PADDING = 5
@@ -169,6 +225,9 @@ class GameView(View):
     MENU_BUTTON_HEIGHT = 24
     MAX_LEVELS = 4
     BOARD_SIZE = (600, 600)
+    PLAYER_LIST_IMAGE_SIZE = (40, 40)
+    TOKEN_SIZE = (50, 50)
+    POINTER_SIZE = (30, 30)
     BOARD_TOP_LEFT = (200, 0)
     # This is the distance from the top left corner to the center of the cell on the board in either direction
     # So for example, (120, 120) is the center of the first cell, if screen size is 1000.
@@ -176,6 +235,7 @@ class GameView(View):
 
     DIALOG_TEXT_WAITING = "Waiting for turn..."
     DIALOG_TEXT_INCORRECT = "You have accused incorrectly."
+    NOTIFICATION_SECONDS = 2.0
 
     class Delegate(Protocol):
         def did_move(self, direction: (Direction, (int, int))):
@@ -199,6 +259,9 @@ class GameView(View):
         self.delegate = delegate
         self.game_manager = game_manager
         self.default_menu_text = self.DIALOG_TEXT_WAITING
+        # notifications cover the dialog for a while, it goes back to dialog_text once they expire
+        self.dialog_text = self.default_menu_text
+        self.notifications = NotificationQueue()
         self.current_selection = []
         self.levels: list[list[PayloadButton]] = []
         self.__setup_elements()
@@ -273,7 +336,7 @@ class GameView(View):
 
         self.lobby_stack = VerticalStack([], alignment=clueless.client.ui_enums.Alignment.LEFT, padding=10)
         self.add_element(self.lobby_stack)
-        self.turn_pointer = ImageElement("pointer", (30, 30))
+        self.turn_pointer = ImageElement("pointer", self.POINTER_SIZE)
         self.turn_pointer.hide()
         self.add_element(self.turn_pointer)
 
@@ -288,7 +351,7 @@ class GameView(View):
         next_button_stack = VerticalStack(elements=button_stack, padding=self.VERTICAL_PADDING)
         self.levels.append(button_stack)
         self.menu.add_element(next_button_stack)
-        self.menu_dialog.text = dialog
+        self.__set_dialog_text(dialog)
 
     def __generate_next_menu_level(self) -> (str, list[PayloadButton]):
         button_list = []
@@ -339,7 +402,7 @@ class GameView(View):
         if len(button_stack) > 0:
             # push next level
             self.menu.add_element(VerticalStack(elements=button_stack, padding=self.VERTICAL_PADDING))
-            self.menu_dialog.text = dialog
+            self.__set_dialog_text(dialog)
         else:
             # no more buttons to show, means we need to call the matching delegate method
             match self.current_selection[0]:
@@ -395,7 +458,7 @@ class GameView(View):
             formatted_text = f"{player_id.nickname}"
             if player_id == current_player_id:
                 formatted_text = formatted_text + " (YOU)"
-            player_avatar = ImageElement(name=player_id.character.file_name, size=(40, 40))
+            player_avatar = ImageElement(name=player_id.character.file_name, size=self.PLAYER_LIST_IMAGE_SIZE)
             player_text = TextElement(text=formatted_text,
                                       size=18,
                                       primary_color=Pico.from_character(player_id.character))
@@ -416,7 +479,7 @@ class GameView(View):
             if player_id in self.board_elements:
                 image_element = self.board_elements[player_id]
             else:
-                image_element = ImageElement(player_id.character.file_name, (50, 50))
+                image_element = ImageElement(player_id.character.file_name, self.TOKEN_SIZE)
                 self.add_element(image_element)
                 self.board_elements[player_id] = image_element
             new_board_position = player_token.position
@@ -453,7 +516,7 @@ class GameView(View):
 
     def show_disprove(self, disproving_cards: [Card], suggest: Suggest):
         suggestion_text = f"Please disprove suggestion ({suggest.suggestion[0].value}, {suggest.suggestion[1].value}, {suggest.suggestion[2].value}):"
-        self.menu_dialog.text = suggestion_text
+        self.__set_dialog_text(suggestion_text)
 
         if not disproving_cards:
             none_button = PayloadButton.card_button(card=None, button=pygame_gui.elements.UIButton(
@@ -495,7 +558,7 @@ class GameView(View):
         self.delegate.did_disprove(payload, suggest)
 
     def restore_default_menu_text(self):
-        self.menu_dialog.text = self.default_menu_text
+        self.__set_dialog_text(self.default_menu_text)
         self.menu.clear()
 
     def show_accusation_incorrect(self, accuse: Accuse, is_own_accusation: bool):
@@ -509,18 +572,43 @@ class GameView(View):
             self.default_menu_text = "Sorry, your accusation was incorrect. You are eliminated from the game."
             self.set_dialog(self.default_menu_text)
         else:
-            self.set_dialog(f"{accuse.player_id.nickname} incorrectly accused {accuse.accusation[0].value} of murder\n" +
-                            f"with the {accuse.accusation[1].value} in the {accuse.accusation[2].value}.")
+            self.notify(f"{accuse.player_id.nickname} incorrectly accused {accuse.accusation[0].value} of murder\n" +
+                        f"with the {accuse.accusation[1].value} in the {accuse.accusation[2].value}.",
+                        key=(ActionType.ACCUSE, accuse.player_id))
 
     def set_dialog(self, text: str):
-        self.menu_dialog.text = text
+        self.__set_dialog_text(text)
         self.menu.clear()
 
+    def notify(self, text: str, seconds: float = NOTIFICATION_SECONDS, key=None):
+        # shows text in the dialog for a while, without blocking; see NotificationQueue
+        self.notifications.push(text, seconds, key)
+        self.update(time.monotonic())
+
+    def update(self, now: float):
+        text = self.notifications.current(now)
+        text = self.dialog_text if text is None else text
+        if self.menu_dialog.text != text:
+            self.menu_dialog.text = text
+
+    def __set_dialog_text(self, text: str):
+        self.dialog_text = text
+        self.update(time.monotonic())
+
     ####################
     ###   Game Over  ###
     ####################
     def game_over(self, accuse: Accuse):
-        self.menu_dialog.text = (
+        self.__set_dialog_text(
             f"Game Over!\n{accuse.player_id.nickname} correctly accused {accuse.accusation[0].value} of "
             f"using the {accuse.accusation[1].value} in the {accuse.accusation[2].value}")
         self.menu.clear()
+
+
+def preloaded_images() -> list[(str, (int, int))]:
+    # the images the title and game screens show, at each size they show them in
+    characters = [character.file_name for character in Character]
+    sizes = [TitleView.DEFAULT_LOBBY_IMAGE_SIZE, GameView.PLAYER_LIST_IMAGE_SIZE, GameView.TOKEN_SIZE]
+    return ([("check_mark", TitleView.READY_IMAGE_SIZE), ("cross_mark", TitleView.READY_IMAGE_SIZE),
+             ("pointer", GameView.POINTER_SIZE)]
+            + [(name, size) for size in sizes for name in characters])
@@ -0,0 +1,240 @@
+from enum import Enum
+from typing import Type
+
+from clueless.model.board import Board
+from clueless.model.board_enums import Character
+from clueless.model.card import Card, CARDS
+from clueless.model.player import PlayerID
+
+# Compact binary wire format for messages.
+#
+# Every message is encoded as:
+#     [type_id: varint][uuid: 16 bytes][field_1]...[field_n]
+# where the fields are described by the message class' `schema`, a tuple of (attribute name, Field) pairs.
+# Enums, cards and player ids are packed as small integers instead of being pickled.
+
+
+class CodecError(ValueError):
+    pass
+
+
+def _write_varint(value: int, out: bytearray):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos: int) -> (int, int):
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+class Field:
+    def encode(self, value, out: bytearray):
+        raise NotImplementedError
+
+    def decode(self, data, pos: int):
+        raise NotImplementedError
+
+
+class UInt(Field):
+    def encode(self, value, out):
+        _write_varint(value, out)
+
+    def decode(self, data, pos):
+        return _read_varint(data, pos)
+
+
+class Bool(Field):
+    def encode(self, value, out):
+        out.append(1 if value else 0)
+
+    def decode(self, data, pos):
+        return data[pos] != 0, pos + 1
+
+
+class Str(Field):
+    def encode(self, value, out):
+        encoded = value.encode("utf-8")
+        _write_varint(len(encoded), out)
+        out += encoded
+
+    def decode(self, data, pos):
+        length, pos = _read_varint(data, pos)
+        # str() decodes straight from a memoryview slice, without copying it into a bytes object first
+        return str(data[pos:pos + length], "utf-8"), pos + length
+
+
+class EnumField(Field):
+    # Packs an enum member as its one byte ordinal
+    def __init__(self, enum_type: Type[Enum]):
+        self.members = list(enum_type)
+        self.ordinals = {member: i for i, member in enumerate(self.members)}
+
+    def encode(self, value, out):
+        out.append(self.ordinals[value])
+
+    def decode(self, data, pos):
+        return self.members[data[pos]], pos + 1
+
+
+class CardField(Field):
+    # Cards are sent as their card_id, see clueless.model.card
+    def encode(self, value: Card, out):
+        out.append(value.card_id)
+
+    def decode(self, data, pos):
+        return CARDS[data[pos]], pos + 1
+
+
+class PlayerIDField(Field):
+    def __init__(self):
+        self.character = EnumField(Character)
+        self.nickname = Str()
+
+    def encode(self, value: PlayerID, out):
+        self.character.encode(value.character, out)
+        self.nickname.encode(value.nickname, out)
+
+    def decode(self, data, pos):
+        character, pos = self.character.decode(data, pos)
+        nickname, pos = self.nickname.decode(data, pos)
+        return PlayerID(character=character, nickname=nickname), pos
+
+
+class Position(Field):
+    # (row, column) on the 5x5 board, packed into one byte
+    def encode(self, value: (int, int), out):
+        out.append((value[0] << 4) | value[1])
+
+    def decode(self, data, pos):
+        packed = data[pos]
+        return (packed >> 4, packed & 0x0F), pos + 1
+
+
+class Optional(Field):
+    def __init__(self, field: Field):
+        self.field = field
+
+    def encode(self, value, out):
+        if value is None:
+            out.append(0)
+        else:
+            out.append(1)
+            self.field.encode(value, out)
+
+    def decode(self, data, pos):
+        if data[pos] == 0:
+            return None, pos + 1
+        return self.field.decode(data, pos + 1)
+
+
+class ListOf(Field):
+    def __init__(self, field: Field):
+        self.field = field
+
+    def encode(self, value, out):
+        _write_varint(len(value), out)
+        for item in value:
+            self.field.encode(item, out)
+
+    def decode(self, data, pos):
+        count, pos = _read_varint(data, pos)
+        items = []
+        for _ in range(count):
+            item, pos = self.field.decode(data, pos)
+            items.append(item)
+        return items, pos
+
+
+class TupleOf(Field):
+    def __init__(self, *fields: Field):
+        self.fields = fields
+
+    def encode(self, value, out):
+        for field, item in zip(self.fields, value):
+            field.encode(item, out)
+
+    def decode(self, data, pos):
+        items = []
+        for field in self.fields:
+            item, pos = field.decode(data, pos)
+            items.append(item)
+        return tuple(items), pos
+
+
+class Nested(Field):
+    # A message embedded in another message, e.g. the Suggest inside a Disprove.
+    # The type is known from the schema, so only the uuid and fields are written.
+    def __init__(self, message_type):
+        self.message_type = message_type
+
+    def encode(self, value, out):
+        _encode_body(value, out)
+
+    def decode(self, data, pos):
+        return _decode_body(self.message_type, data, pos)
+
+
+class BoardField(Field):
+    # Only token positions are sent, the grid is rebuilt on the receiving side
+    def __init__(self):
+        self.tokens = ListOf(TupleOf(PlayerIDField(), Position()))
+
+    def encode(self, value: Board, out):
+        self.tokens.encode([(player_id, token.position) for player_id, token in value.player_tokens.items()], out)
+
+    def decode(self, data, pos):
+        tokens, pos = self.tokens.decode(data, pos)
+        board = Board(players=[player_id for player_id, _ in tokens])
+        board.set_positions(dict(tokens))
+        return board, pos
+
+
+def _encode_body(message, out: bytearray):
+    # same as uuid.UUID(message.uuid).bytes without building a UUID object
+    out += bytes.fromhex(message.uuid.replace("-", ""))
+    for attribute, field in message.schema:
+        field.encode(getattr(message, attribute), out)
+
+
+def _decode_body(message_type, data, pos: int):
+    message = message_type.__new__(message_type)
+    hex_uuid = data[pos:pos + 16].hex()
+    message.uuid = f"{hex_uuid[:8]}-{hex_uuid[8:12]}-{hex_uuid[12:16]}-{hex_uuid[16:20]}-{hex_uuid[20:]}"
+    pos += 16
+    for attribute, field in message_type.schema:
+        value, pos = field.decode(data, pos)
+        setattr(message, attribute, value)
+    return message, pos
+
+
+def encode(message) -> bytes:
+    out = bytearray()
+    encode_into(message, out)
+    return bytes(out)
+
+
+def encode_into(message, out: bytearray):
+    # encode(), appending to a buffer the caller owns (framing writes the length prefix in front)
+    _write_varint(message.type_id, out)
+    _encode_body(message, out)
+
+
+def decode(data: bytes, message_types: dict[int, type]):
+    view = memoryview(data)
+    type_id, pos = _read_varint(view, 0)
+    if type_id not in message_types:
+        raise CodecError(f"Unknown message type id {type_id}")
+    message, pos = _decode_body(message_types[type_id], view, pos)
+    if pos != len(view):
+        raise CodecError(f"{len(view) - pos} trailing bytes after {message_types[type_id].__name__}")
+    return message
@@ -0,0 +1,75 @@
+import struct
+from typing import Iterator
+
+from clueless.messages import codec
+from clueless.messages.codec import CodecError
+from clueless.messages.registry import MESSAGES
+
+# Length-prefixed binary frames: a 4 byte big-endian payload length followed by the codec payload
+# (type id varint, uuid, fields). Unlike the PodSixNet format there is no terminator to scan for, no rencoded dict
+# around the payload and no latin-1 string in between; a frame is the codec bytes and nothing else.
+
+HEADER = struct.Struct("!I")
+MAX_FRAME_SIZE = 1 << 20
+
+
+def encode_frame(message) -> bytearray:
+    # The payload is encoded behind a placeholder header that is filled in afterwards, so the frame is built in
+    # a single buffer. Sockets and asyncio transports take the bytearray as is.
+    frame = bytearray(HEADER.size)
+    codec.encode_into(message, frame)
+    HEADER.pack_into(frame, 0, len(frame) - HEADER.size)
+    return frame
+
+
+class FrameReader:
+    # Receive buffer for a stream of frames. Received bytes are written straight into the buffer through
+    # writable() (socket.recv_into, asyncio.BufferedProtocol.get_buffer) and every complete frame in it is decoded
+    # from a memoryview slice, so one recv can yield many messages and no bytes are copied on the way.
+
+    def __init__(self, capacity=65536):
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._start = 0  # first byte of the first frame not decoded yet
+        self._end = 0  # end of the received bytes
+
+    def writable(self, size_hint=-1) -> memoryview:
+        # Free space at the end of the buffer, made by moving a partial frame to the front or by growing the buffer
+        if self._end == len(self._buffer) or len(self._buffer) - self._end < size_hint:
+            self.__make_room(max(size_hint, 1))
+        return self._view[self._end:]
+
+    def advance(self, received: int):
+        self._end += received
+
+    def messages(self) -> Iterator:
+        # Decodes the complete frames one at a time, so each message can be handled (and dropped) before the next
+        # one is built. Whatever is left is the start of a frame still on its way.
+        view = self._view
+        while self._end - self._start >= HEADER.size:
+            pos = self._start
+            (length,) = HEADER.unpack_from(view, pos)
+            if length > MAX_FRAME_SIZE:
+                raise CodecError(f"Frame of {length} bytes is larger than {MAX_FRAME_SIZE}")
+            if self._end - pos - HEADER.size < length:
+                break
+            with view[pos + HEADER.size:pos + HEADER.size + length] as payload:
+                message = codec.decode(payload, MESSAGES.by_id)
+            self._start = pos + HEADER.size + length
+            yield message
+        if self._start == self._end:
+            # everything was decoded, the next recv starts at the front again
+            self._start = self._end = 0
+
+    def __make_room(self, needed: int):
+        pending = self._end - self._start
+        if len(self._buffer) - pending < needed:
+            # not enough room even after compacting: a frame larger than the buffer
+            grown = bytearray(max(2 * len(self._buffer), pending + needed))
+            grown[:pending] = self._view[self._start:self._end]
+            self._view.release()
+            self._buffer, self._view = grown, memoryview(grown)
+        else:
+            # memoryview assignment is a memmove, so the regions may overlap
+            self._view[:pending] = self._view[self._start:self._end]
+        self._start, self._end = 0, pending
@@ -1,46 +1,81 @@
-import pickle
 import uuid
 from typing import Self
 
+from clueless.messages import codec
+from clueless.messages.codec import UInt, Bool, Str, EnumField, CardField, PlayerIDField, Position, Optional, \
+    ListOf, TupleOf, Nested, BoardField
+from clueless.messages.registry import MESSAGES
 from clueless.model.board import Board
 from clueless.model.board_enums import ActionType, Character, Weapon, Location
 from clueless.model.card import Card
 from clueless.model.player import PlayerID
+from clueless.model.rules import Phase
+
+# PodSixNet frames messages with this terminator, so a payload must never contain it
+_PODSIXNET_TERMINATOR = b"\0---\0"
+
+_PLAYER_ID = PlayerIDField()
+_CARD = CardField()
+_SUGGESTION = TupleOf(EnumField(Character), EnumField(Weapon), EnumField(Location))
 
 
 class BaseMessage:
     name = "base_message"
+    type_id = 0
+    schema: tuple[(str, codec.Field)] = ()
+    received_at: float | None = None  # perf_counter() when a client's network thread read it, never sent
 
     def __init__(self):
         self.uuid = str(uuid.uuid4())
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "type_id" in cls.__dict__:
+            MESSAGES.register(cls)
+
+    def encode(self) -> bytes:
+        return codec.encode(self)
+
     def serialize(self):
-        return {"action": self.name, "uuid": self.uuid, "payload": pickle.dumps(self).hex()}
+        # PodSixNet decodes every string it receives as utf-8, so the binary payload travels as a latin-1 string
+        # (one char per byte). The rare payload containing the PodSixNet terminator is sent as hex instead.
+        payload = self.encode()
+        if _PODSIXNET_TERMINATOR in payload:
+            return {"action": self.name, "hex_payload": payload.hex()}
+        return {"action": self.name, "payload": payload.decode("latin-1")}
 
     @classmethod
     def deserialize(cls, data) -> Self:
-        return pickle.loads(bytes.fromhex(data["payload"]))
+        if "hex_payload" in data:
+            return codec.decode(bytes.fromhex(data["hex_payload"]), MESSAGES.by_id)
+        return codec.decode(data["payload"].encode("latin-1"), MESSAGES.by_id)
+
+
+MESSAGES.register(BaseMessage)
 
 
 # SERVER BOUND
 
 class JoinGame(BaseMessage):
     name = "join_game"
+    type_id = 1
+    schema = (("nickname", Str()), ("game_id", Optional(UInt())))
 
-    def __init__(self, nickname):
+    def __init__(self, nickname, game_id: int | None = None):
         super().__init__()
         self.nickname = nickname
+        self.game_id = game_id  # None joins any lobby with a free seat
 
 
 class Ready(BaseMessage):
     name = "ready"
+    type_id = 2
 
-class EndGame(BaseMessage):
-    name = "end_game"
 
 class BaseClientAction(BaseMessage):
     action_type = None
     name = "ClientAction"
+    schema = (("player_id", _PLAYER_ID),)
 
     @classmethod
     def client_action_name(cls):
@@ -49,14 +84,19 @@ class BaseClientAction(BaseMessage):
         else:
             return "ClientAction"
 
+    def __init_subclass__(cls, **kwargs):
+        cls.name = cls.client_action_name()  # before registering, the registry is keyed by name
+        super().__init_subclass__(**kwargs)
+
     def __init__(self, player_id: PlayerID):
         super().__init__()
         self.player_id = player_id
-        self.name = self.client_action_name()
 
 
 class Move(BaseClientAction):
     action_type = ActionType.MOVE
+    type_id = 3
+    schema = BaseClientAction.schema + (("position", Position()),)
 
     def __init__(self, player_id: PlayerID, position: (int, int)):
         super().__init__(player_id)
@@ -65,6 +105,8 @@ class Move(BaseClientAction):
 
 class Suggest(BaseClientAction):
     action_type = ActionType.SUGGEST
+    type_id = 4
+    schema = BaseClientAction.schema + (("suggestion", _SUGGESTION),)
 
     def __init__(self, player_id: PlayerID, suggestion: (Character, Weapon, Location)):
         super().__init__(player_id)
@@ -73,6 +115,8 @@ class Suggest(BaseClientAction):
 
 class Disprove(BaseClientAction):
     action_type = ActionType.DISPROVE
+    type_id = 5
+    schema = BaseClientAction.schema + (("card", Optional(_CARD)), ("suggest", Nested(Suggest)))
 
     def __init__(self, player_id: PlayerID, card: Card | None, suggest: Suggest):
         super().__init__(player_id)
@@ -82,23 +126,42 @@ class Disprove(BaseClientAction):
 
 class EndTurn(BaseClientAction):
     action_type = ActionType.END_TURN
+    type_id = 6
 
     def __init__(self, player_id: PlayerID):
         super().__init__(player_id)
 
 
+class ResumeGame(BaseMessage):
+    name = "resume_game"
+    type_id = 15
+    schema = (("game_id", UInt()), ("session_token", Str()), ("nickname", Str()))
+
+    def __init__(self, game_id: int, session_token: str, nickname: str):
+        super().__init__()
+        self.game_id = game_id  # from AssignPlayerID, also lets a sharded server find the worker hosting the game
+        self.session_token = session_token
+        self.nickname = nickname  # joins a new lobby under this name if the seat is gone
+
+
 # CLIENT BOUND
 
 class AssignPlayerID(BaseMessage):
     name = "assign_player_id"
+    type_id = 7
+    schema = (("player_id", _PLAYER_ID), ("game_id", Optional(UInt())), ("session_token", Optional(Str())))
 
-    def __init__(self, player_id: PlayerID):
+    def __init__(self, player_id: PlayerID, game_id: int | None = None, session_token: str | None = None):
         super().__init__()
         self.player_id = player_id
+        self.game_id = game_id
+        self.session_token = session_token  # sent back in ResumeGame to take the seat again after a disconnect
 
 
 class UpdatePlayers(BaseMessage):
     name = "update_players"
+    type_id = 8
+    schema = (("players", ListOf(TupleOf(_PLAYER_ID, Bool()))),)
 
     def __init__(self, players: [(PlayerID, bool)]):
         super().__init__()
@@ -107,6 +170,8 @@ class UpdatePlayers(BaseMessage):
 
 class StartGame(BaseMessage):
     name = "start_game"
+    type_id = 9
+    schema = (("board", BoardField()),)
 
     def __init__(self, board: Board):
         super().__init__()
@@ -115,6 +180,8 @@ class StartGame(BaseMessage):
 
 class DealCards(BaseMessage):
     name = "deal_cards"
+    type_id = 10
+    schema = (("cards", ListOf(_CARD)),)
 
     def __init__(self, cards: [Card]):
         super().__init__()
@@ -123,6 +190,8 @@ class DealCards(BaseMessage):
 
 class YourTurn(BaseMessage):
     name = "start_turn"
+    type_id = 11
+    schema = (("turn_id", UInt()), ("player_id", _PLAYER_ID))
 
     def __init__(self, turn_id: int, player_id: PlayerID):
         super().__init__()
@@ -132,16 +201,33 @@ class YourTurn(BaseMessage):
 
 class RequestDisprove(BaseMessage):
     name = "request_disprove"
+    type_id = 12
+    schema = (("suggest", Nested(Suggest)),)
 
     def __init__(self, suggest: Suggest):
         super().__init__()
         self.suggest = suggest
 
 
+class Disproved(BaseMessage):
+    # What everyone but the suggester is told about a Disprove: who disproved the suggestion, not with which card.
+    # The suggestion itself is the Suggest broadcast just before.
+    name = "disproved"
+    type_id = 17
+    schema = (("player_id", _PLAYER_ID), ("suggester", _PLAYER_ID))
+
+    def __init__(self, player_id: PlayerID, suggester: PlayerID):
+        super().__init__()
+        self.player_id = player_id  # the suggester again when nobody could disprove it, as in Disprove
+        self.suggester = suggester
+
+
 # added accuse class
 
 class Accuse(BaseClientAction):
     action_type = ActionType.ACCUSE
+    type_id = 13
+    schema = BaseClientAction.schema + (("accusation", _SUGGESTION), ("is_correct", Bool()))
     is_correct = False
 
     def __init__(self, player_id: PlayerID, accusation: (Character, Weapon, Location)):
@@ -151,7 +237,50 @@ class Accuse(BaseClientAction):
 
 class EndGame(BaseMessage):
     name = "end_game"
+    type_id = 14
+    schema = (("accuse", Nested(Accuse)),)
 
     def __init__(self, accuse: Accuse):
         super().__init__()
         self.accuse = accuse
+
+
+class ResumeState(BaseMessage):
+    # Everything a reconnecting client needs to pick its seat back up, in place of the messages it missed
+    name = "resume_state"
+    type_id = 16
+    schema = (("player_id", _PLAYER_ID), ("game_id", UInt()), ("players", ListOf(TupleOf(_PLAYER_ID, Bool()))),
+              ("board", Optional(BoardField())), ("cards", ListOf(_CARD)), ("turn_id", Optional(UInt())),
+              ("current_player", Optional(_PLAYER_ID)), ("phase", EnumField(Phase)), ("active", UInt()),
+              ("moved_by_suggestion", UInt()), ("pending_disprove", Optional(Nested(Suggest))))
+
+    def __init__(self, player_id: PlayerID, game_id: int, players: [(PlayerID, bool)], board: Board | None = None,
+                 cards: [Card] = (), turn_id: int | None = None, current_player: PlayerID | None = None,
+                 phase: Phase = Phase.TURN_START, active=0, moved_by_suggestion=0,
+                 pending_disprove: Suggest | None = None):
+        super().__init__()
+        self.player_id = player_id
+        self.game_id = game_id
+        self.players = players  # (player, ready) in turn order, as in UpdatePlayers
+        self.board = board  # None while the game is still in its lobby
+        self.cards = list(cards)
+        self.turn_id = turn_id
+        self.current_player = current_player
+        self.phase = phase  # of the current turn
+        # bitmasks over the seats of `players`, as in rules.GameState
+        self.active = active
+        self.moved_by_suggestion = moved_by_suggestion
+        self.pending_disprove = pending_disprove  # the suggestion this player was asked to disprove
+
+
+class Rejected(BaseMessage):
+    # Sent back to a player instead of broadcasting an action the rules do not allow in the current state
+    name = "rejected"
+    type_id = 18
+    schema = (("action", Str()), ("action_uuid", Str()), ("reason", Str()))
+
+    def __init__(self, action: str, action_uuid: str, reason: str):
+        super().__init__()
+        self.action = action  # name of the rejected message
+        self.action_uuid = action_uuid
+        self.reason = reason
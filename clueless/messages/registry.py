@@ -0,0 +1,50 @@
+from functools import cache
+from typing import Callable
+
+
+class MessageRegistry:
+    # Maps both the PodSixNet action name and the binary type id of a message to its class
+    def __init__(self):
+        self.by_name: dict[str, type] = {}
+        self.by_id: dict[int, type] = {}
+
+    def register(self, message_type: type):
+        self.by_name[message_type.name] = message_type
+        self.by_id[message_type.type_id] = message_type
+        return message_type
+
+    def for_name(self, name: str) -> type | None:
+        return self.by_name.get(name)
+
+    def for_id(self, type_id: int) -> type | None:
+        return self.by_id.get(type_id)
+
+
+MESSAGES = MessageRegistry()
+
+
+def handles(*message_types: type):
+    """
+    Marks a method as the handler for the given message types. Use dispatch_table() on the class to collect them.
+
+        @handles(Move)
+        def handle_msg_ClientAction_move(self, msg: Move): ...
+    """
+    def decorator(fn: Callable):
+        fn.handled_messages = getattr(fn, "handled_messages", ()) + message_types
+        return fn
+    return decorator
+
+
+@cache
+def dispatch_table(cls: type) -> dict[str, Callable]:
+    """
+    Builds the message name -> handler function table for a class once. Handlers are plain functions, so call them
+    with the instance: dispatch_table(type(self))[msg.name](self, msg). Subclasses override their parents' handlers.
+    """
+    table = {}
+    for klass in reversed(cls.__mro__):
+        for attribute in vars(klass).values():
+            for message_type in getattr(attribute, "handled_messages", ()):
+                table[message_type.name] = attribute
+    return table
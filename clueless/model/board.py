@@ -35,6 +35,37 @@ class Void(Space):
         super().__init__(0)
 
 
+VOID_POSITIONS = {(1, 1), (1, 3), (3, 1), (3, 3)}
+
+
+def _calculate_new_position(from_position, direction) -> tuple[int, int] | None:
+    match direction:
+        case Direction.UP if from_position[0] > 0:
+            return from_position[0] - 1, from_position[1]
+        case Direction.DOWN if from_position[0] < 4:
+            return from_position[0] + 1, from_position[1]
+        case Direction.LEFT if from_position[1] > 0:
+            return from_position[0], from_position[1] - 1
+        case Direction.RIGHT if from_position[1] < 4:
+            return from_position[0], from_position[1] + 1
+        case Direction.SECRET_PASSAGEWAY if from_position == (0, 0) or from_position == (4, 4):
+            return 4 - from_position[0], 4 - from_position[1]
+        case Direction.SECRET_PASSAGEWAY if from_position == (0, 4) or from_position == (4, 0):
+            return from_position[1], from_position[0]
+        case _:
+            return None
+
+
+# position -> every (direction, position) a token could move to on an empty board, including secret passages.
+# Computed once, so a movement query only has to check whether the destination has room.
+MOVEMENT_GRAPH: dict[(int, int), tuple[(Direction, (int, int))]] = {
+    (row, column): tuple((direction, new_position) for direction in Direction
+                         if (new_position := _calculate_new_position((row, column), direction)) is not None
+                         and new_position not in VOID_POSITIONS)
+    for row in range(5) for column in range(5) if (row, column) not in VOID_POSITIONS
+}
+
+
 class Board:
     def __init__(self, players: list[PlayerID]):
         self.player_tokens: dict[PlayerID, PlayerToken] = dict(
@@ -72,40 +103,20 @@ class Board:
             self.grid[position[0]][position[1]].add(player_token)
         player_token.position = position
 
+    def set_positions(self, positions: dict[PlayerID, (int, int)]):
+        # Places tokens directly without capacity checks, used to restore a board that was sent over the network.
+        for player_id, position in positions.items():
+            player_token = self.player_tokens[player_id]
+            if player_token.position is not None:
+                self.grid[player_token.position[0]][player_token.position[1]].remove(player_token)
+        for player_id, position in positions.items():
+            self.grid[position[0]][position[1]].add(self.player_tokens[player_id])
+            self.player_tokens[player_id].position = position
+
     def get_movement_options(self, player_id) -> list[(Direction, (int, int))]:
         player_token = self.player_tokens[player_id]
-        # if not player_token.position:
-        #     return [(Direction.INITIALIZE, player_id.character.get_starting_position())]
-        valid_directions = []
-        # for direction in [d for d in Direction if d.value > Direction.INITIALIZE.value]:
-        for direction in Direction:
-            try:
-                new_position = self.__calculate_new_position(player_token.position, direction)
-                if self.grid[new_position[0]][new_position[1]].can_add():
-                    valid_directions.append((direction, new_position))
-            except ValueError:
-                print(f"Excluding {direction.name}") #what's going on here
-        return valid_directions
-
-    def __calculate_new_position(self, from_position, direction):
-        new_position = from_position
-        match direction:
-            case Direction.UP if from_position[0] > 0:
-                new_position = (from_position[0] - 1, from_position[1])
-
-            case Direction.DOWN if from_position[0] < 4:
-                new_position = (from_position[0] + 1, from_position[1])
-            case Direction.LEFT if from_position[1] > 0:
-                new_position = (from_position[0], from_position[1] - 1)
-            case Direction.RIGHT if from_position[1] < 4:
-                new_position = (from_position[0], from_position[1] + 1)
-            case Direction.SECRET_PASSAGEWAY if from_position == (0, 0) or from_position == (4, 4):
-                new_position = (4 - from_position[0], 4 - from_position[1])
-            case Direction.SECRET_PASSAGEWAY if from_position == (0, 4) or from_position == (4, 0):
-                new_position = (from_position[1], from_position[0])
-            case _:
-                raise ValueError("Invalid direction")
-        return new_position
+        return [(direction, new_position) for direction, new_position in MOVEMENT_GRAPH[player_token.position]
+                if self.grid[new_position[0]][new_position[1]].can_add()]
 
     def get_player_space(self, player_id) -> Space:
         position = self.player_tokens[player_id].position
@@ -13,25 +13,7 @@ class Location(Enum):
     KITCHEN = "Kitchen"
 
     def get_position(self) -> (int, int):
-        match self:
-            case Location.STUDY:
-                return (0, 0)
-            case Location.HALL:
-                return (0, 2)
-            case Location.LOUNGE:
-                return (0, 4)
-            case Location.LIBRARY:
-                return (2, 0)
-            case Location.BILLIARD:
-                return (2, 2)
-            case Location.DINING:
-                return (2, 4)
-            case Location.CONSERVATORY:
-                return (4, 0)
-            case Location.BALLROOM:
-                return (4, 2)
-            case Location.KITCHEN:
-                return (4, 4)
+        return _ROOM_POSITIONS[self]
 
 
 class Weapon(Enum):
@@ -52,15 +34,7 @@ class Character(Enum):
     PEACOCK = "Peacock"
 
     def get_starting_position(self):
-        char_to_position = {
-            self.SCARLET: (0, 3),
-            self.PLUM: (1, 0),
-            self.MUSTARD: (1, 4),
-            self.WHITE: (4, 3),
-            self.GREEN: (4, 1),
-            self.PEACOCK: (3, 0)
-        }
-        return char_to_position[self]
+        return _STARTING_POSITIONS[self]
 
     @property
     def file_name(self):
@@ -80,7 +54,30 @@ class Character(Enum):
 
     @property
     def ordinal_value(self):
-        return list(Character).index(self)
+        return _CHARACTER_ORDINALS[self]
+
+
+# Lookup tables for the methods above, built once instead of on every call
+_ROOM_POSITIONS = {
+    Location.STUDY: (0, 0),
+    Location.HALL: (0, 2),
+    Location.LOUNGE: (0, 4),
+    Location.LIBRARY: (2, 0),
+    Location.BILLIARD: (2, 2),
+    Location.DINING: (2, 4),
+    Location.CONSERVATORY: (4, 0),
+    Location.BALLROOM: (4, 2),
+    Location.KITCHEN: (4, 4),
+}
+_STARTING_POSITIONS = {
+    Character.SCARLET: (0, 3),
+    Character.PLUM: (1, 0),
+    Character.MUSTARD: (1, 4),
+    Character.WHITE: (4, 3),
+    Character.GREEN: (4, 1),
+    Character.PEACOCK: (3, 0)
+}
+_CHARACTER_ORDINALS = {character: i for i, character in enumerate(Character)}
 
 
 class Direction(Enum):
@@ -0,0 +1,207 @@
+import random
+
+from clueless.messages.messages import BaseClientAction, BaseMessage, UpdatePlayers, StartGame, DealCards, YourTurn, \
+    Move, Suggest, RequestDisprove, Disprove, Disproved, Accuse, EndTurn, EndGame, ResumeState
+from clueless.messages.registry import handles, dispatch_table
+from clueless.model import rules
+from clueless.model.board_enums import Character, Weapon, Location, CardType, ActionType
+from clueless.model.card import Card
+from clueless.model.compact_board import ROOM_AT, to_index
+from clueless.model.deduction import DeductionEngine
+from clueless.model.observer import public_game, resumed_game, follow, movement_options
+from clueless.model.player import PlayerID
+from clueless.model.rules import Phase
+
+
+class BotPolicy:
+    # Decisions a bot has to make during its game. The base policy never moves, suggests at random, shows the first
+    # card it can and accuses once its deduction engine has narrowed the case down to one solution.
+    name = "passive"
+
+    def choose_move(self, bot: "Bot", options: list[(int, int)]) -> tuple[int, int] | None:
+        return None
+
+    def choose_suggestion(self, bot: "Bot", location: Location) -> (Character, Weapon):
+        return bot.rng.choice(list(Character)), bot.rng.choice(list(Weapon))
+
+    def choose_disprove(self, bot: "Bot", cards: list[Card], suggest: Suggest) -> Card:
+        return cards[0]
+
+    def choose_accusation(self, bot: "Bot") -> tuple[Character, Weapon, Location] | None:
+        return bot.deduction.solution()
+
+
+class RandomPolicy(BotPolicy):
+    name = "random"
+
+    def choose_move(self, bot, options):
+        return bot.rng.choice(options)
+
+    def choose_disprove(self, bot, cards, suggest):
+        return bot.rng.choice(cards)
+
+
+class DeductionPolicy(BotPolicy):
+    # Heads for rooms that may still be the crime scene and suggests cards that are still in the running
+    name = "deduction"
+
+    def choose_move(self, bot, options):
+        candidates = {card.member for card in bot.deduction.envelope_candidates()}
+        promising = [position for position in options if ROOM_AT[to_index(position)] in candidates]
+        return bot.rng.choice(promising or options)
+
+    def choose_suggestion(self, bot, location):
+        candidates = bot.deduction.envelope_candidates()
+        characters = [card.member for card in candidates if card.card_type == CardType.CHARACTER]
+        weapons = [card.member for card in candidates if card.card_type == CardType.WEAPON]
+        return bot.rng.choice(characters), bot.rng.choice(weapons)
+
+    def choose_disprove(self, bot, cards, suggest):
+        # keep showing the same cards so the other players learn as little as possible
+        shown = [card for card in cards if card in bot.shown_cards]
+        return shown[0] if shown else bot.rng.choice(cards)
+
+
+POLICIES: dict[str, type[BotPolicy]] = {policy.name: policy for policy in (BotPolicy, RandomPolicy, DeductionPolicy)}
+
+
+class Bot:
+    # Plays one seat from the messages a client receives, returning the actions it sends back.
+    # It follows the game through the rules (see observer) and keeps its own DeductionEngine, so it needs nothing but
+    # the message stream.
+
+    def __init__(self, player_id: PlayerID, policy: BotPolicy, rng: random.Random):
+        self.player_id = player_id
+        self.policy = policy
+        self.rng = rng
+        self.players: list[PlayerID] = []
+        self.cards: list[Card] = []
+        self.shown_cards: set[Card] = set()
+        self.state: rules.GameState | None = None
+        self.deduction: DeductionEngine | None = None
+        self.winner: PlayerID | None = None
+        self.handlers = dispatch_table(type(self))
+
+    @property
+    def seat(self) -> int:
+        return rules.seat_of(self.state, self.player_id)
+
+    @property
+    def active(self) -> bool:
+        return bool(self.state.active >> self.seat & 1)
+
+    def receive(self, message: BaseMessage) -> list[BaseClientAction]:
+        handler = self.handlers.get(message.name)
+        if handler is None:
+            return []
+        return handler(self, message) or []
+
+    @handles(UpdatePlayers)
+    def on_update_players(self, msg: UpdatePlayers):
+        self.players = [player_id for player_id, _ in msg.players]
+
+    @handles(StartGame)
+    def on_start_game(self, msg: StartGame):
+        self.state = public_game(self.players, msg.board)
+
+    @handles(DealCards)
+    def on_deal_cards(self, msg: DealCards):
+        self.cards = msg.cards
+        self.deduction = DeductionEngine(self.players, self.player_id, self.cards)
+
+    @handles(YourTurn)
+    def on_your_turn(self, msg: YourTurn):
+        self.state = follow(self.state, msg)
+        if msg.player_id != self.player_id:
+            return
+        accusation = self.policy.choose_accusation(self)
+        if accusation:
+            return [Accuse(self.player_id, accusation)]
+        if ActionType.MOVE in rules.current_action_types(self.state):
+            options = [position for _, position in movement_options(self.state, self.seat)]
+            position = self.policy.choose_move(self, options)
+            if position is not None:
+                return [Move(self.player_id, position)]
+        return self.__suggest_or_finish()
+
+    @handles(Move)
+    def on_move(self, msg: Move):
+        self.state = follow(self.state, msg)
+        if msg.player_id == self.player_id:
+            return self.__suggest_or_finish()
+
+    @handles(Suggest)
+    def on_suggest(self, msg: Suggest):
+        self.deduction.observe(msg)
+        # the suggested character is brought into the room
+        self.state = follow(self.state, msg)
+
+    @handles(RequestDisprove)
+    def on_request_disprove(self, msg: RequestDisprove):
+        matching = [card for card in self.cards if card.matches(msg.suggest.suggestion)]
+        card = self.policy.choose_disprove(self, matching, msg.suggest) if matching else None
+        if card is not None:
+            self.shown_cards.add(card)
+        return [Disprove(self.player_id, card, msg.suggest)]
+
+    @handles(Disprove)
+    def on_disprove(self, msg: Disprove):
+        self.deduction.observe(msg)
+        if msg.suggest.player_id == self.player_id:
+            return self.__finish_turn()
+
+    @handles(Disproved)
+    def on_disproved(self, msg: Disproved):
+        self.deduction.observe(msg)
+
+    @handles(Accuse)
+    def on_accuse(self, msg: Accuse):
+        # only wrong accusations are broadcast, a right one ends the game
+        self.deduction.observe(msg)
+        self.state = follow(self.state, msg)
+        if msg.player_id == self.player_id:
+            return [EndTurn(self.player_id)]
+
+    @handles(EndTurn)
+    def on_end_turn(self, msg: EndTurn):
+        self.state = follow(self.state, msg)
+
+    @handles(EndGame)
+    def on_end_game(self, msg: EndGame):
+        self.winner = msg.accuse.player_id
+
+    @handles(ResumeState)
+    def on_resume_state(self, msg: ResumeState):
+        # picks the turn back up where the server left it; deduction keeps what it saw before the disconnect
+        self.players = [player_id for player_id, _ in msg.players]
+        if msg.board is None:
+            return
+        self.state = resumed_game(self.players, msg)
+        self.cards = msg.cards
+        if self.deduction is None:
+            self.deduction = DeductionEngine(self.players, self.player_id, self.cards)
+        self.deduction.observe(msg)
+        if msg.pending_disprove is not None:
+            return self.on_request_disprove(RequestDisprove(msg.pending_disprove))
+        if msg.current_player != self.player_id or msg.phase in (Phase.DISPROVING, Phase.GAME_OVER):
+            return
+        if not self.active:
+            return [EndTurn(self.player_id)]  # accused wrongly, the server is waiting for the turn to end
+        if msg.phase == Phase.TURN_START:
+            return self.on_your_turn(YourTurn(msg.turn_id, self.player_id))
+        if msg.phase == Phase.MOVED:
+            return self.__suggest_or_finish()
+        return self.__finish_turn()
+
+    def __suggest_or_finish(self) -> list[BaseClientAction]:
+        if ActionType.SUGGEST in rules.current_action_types(self.state):
+            room = ROOM_AT[rules.position_of(self.state, self.seat)]
+            character, weapon = self.policy.choose_suggestion(self, room)
+            return [Suggest(self.player_id, (character, weapon, room))]
+        return self.__finish_turn()
+
+    def __finish_turn(self) -> list[BaseClientAction]:
+        accusation = self.policy.choose_accusation(self)
+        if accusation:
+            return [Accuse(self.player_id, accusation)]
+        return [EndTurn(self.player_id)]
@@ -1,31 +1,87 @@
+from enum import Enum
+
 from clueless.model.board_enums import CardType, Weapon, Location, Character
 
+# All 21 cards are numbered 0-20: characters first, then weapons, then locations.
+# There is exactly one Card object per id, so cards compare by identity, and a set of cards (a hand, a suggestion,
+# the winning combination) can be held as a bitmask with bit `card_id` set for each card.
+CARD_ENUMS: tuple[(CardType, type[Enum]), ...] = (
+    (CardType.CHARACTER, Character), (CardType.WEAPON, Weapon), (CardType.LOCATION, Location)
+)
+
 
 class Card:
-    def __init__(self, card_type: CardType, card_value: int | str):
-        self.card_type = card_type
-        self.card_value = card_value
+    __slots__ = ("card_type", "card_value", "card_id", "member", "bit")
+
+    def __new__(cls, card_type: CardType, card_value: int | str):
+        # Card(CardType.WEAPON, "Rope") returns the interned card instead of building a new one
+        return _BY_VALUE[(card_type, card_value)]
+
+    @classmethod
+    def _intern(cls, card_type: CardType, member: Enum, card_id: int) -> "Card":
+        card = object.__new__(cls)
+        card.card_type = card_type
+        card.card_value = member.value
+        card.card_id = card_id
+        card.member = member
+        card.bit = 1 << card_id
+        return card
+
+    @staticmethod
+    def for_id(card_id: int) -> "Card":
+        return CARDS[card_id]
+
+    @staticmethod
+    def for_member(member: Character | Weapon | Location) -> "Card":
+        return _BY_MEMBER[member]
 
     @staticmethod
     def new_weapon_card(weapon_type: Weapon):
-        return Card(card_type=CardType.WEAPON, card_value=weapon_type.value)
+        return _BY_MEMBER[weapon_type]
 
     @staticmethod
     def new_location_card(room_type: Location):
-        return Card(card_type=CardType.LOCATION, card_value=room_type.value)
+        return _BY_MEMBER[room_type]
 
     @staticmethod
     def new_character_card(character: Character):
-        return Card(card_type=CardType.CHARACTER, card_value=character.value)
+        return _BY_MEMBER[character]
 
     def matches(self, suggestion: (Character, Weapon, Location)):
-        if self.card_type == CardType.CHARACTER:
-            return self.card_value == suggestion[0].value
-        if self.card_type == CardType.WEAPON:
-            return self.card_value == suggestion[1].value
-        if self.card_type == CardType.LOCATION:
-            return self.card_value == suggestion[2].value
+        return bool(self.bit & suggestion_mask(suggestion))
+
+    def __reduce__(self):
+        return Card.for_id, (self.card_id,)
 
     def __repr__(self):
         return f"Card({self.card_type}, value={self.card_value})"
 
+
+CARDS: tuple[Card, ...] = tuple(Card._intern(card_type, member, card_id) for card_id, (card_type, member) in
+                                enumerate((card_type, member) for card_type, enum in CARD_ENUMS for member in enum))
+CHARACTER_CARDS = tuple(card for card in CARDS if card.card_type == CardType.CHARACTER)
+WEAPON_CARDS = tuple(card for card in CARDS if card.card_type == CardType.WEAPON)
+LOCATION_CARDS = tuple(card for card in CARDS if card.card_type == CardType.LOCATION)
+_BY_VALUE: dict[(CardType, str), Card] = {(card.card_type, card.card_value): card for card in CARDS}
+_BY_MEMBER: dict[Enum, Card] = {card.member: card for card in CARDS}
+
+
+def card_mask(cards) -> int:
+    # Bitmask of the given cards, enum members are accepted too
+    mask = 0
+    for card in cards:
+        mask |= card.bit if type(card) is Card else _BY_MEMBER[card].bit
+    return mask
+
+
+def suggestion_mask(suggestion: (Character, Weapon, Location)) -> int:
+    return _BY_MEMBER[suggestion[0]].bit | _BY_MEMBER[suggestion[1]].bit | _BY_MEMBER[suggestion[2]].bit
+
+
+def cards_in(mask: int) -> list[Card]:
+    cards = []
+    while mask:
+        lowest = mask & -mask
+        cards.append(CARDS[lowest.bit_length() - 1])
+        mask ^= lowest
+    return cards
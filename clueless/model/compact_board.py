@@ -0,0 +1,172 @@
+from array import array
+
+from clueless.model.board import Board, Room, MOVEMENT_GRAPH
+from clueless.model.board_enums import Location, Direction, Character
+from clueless.model.player import PlayerID
+
+# Same rules as Board, with the state kept in two flat arrays instead of Space objects holding token lists:
+#   positions[slot]   = flat index (row * 5 + column) of the player in that slot, -1 if not on the board
+#   occupancy[index]  = bitmask of the player slots on that space
+# Copying a board copies the two arrays, the player tuple and slot table are shared between copies.
+
+NOT_PLACED = -1
+_COLUMNS = 5
+
+_LAYOUT = [space for row in Board(players=[]).grid for space in row]
+SPACE_CAPACITY: tuple[int, ...] = tuple(space.capacity for space in _LAYOUT)
+ROOM_AT: tuple[Location | None, ...] = tuple(space.room_type if isinstance(space, Room) else None for space in _LAYOUT)
+# flat index -> ((direction, (row, column), flat index), ...) on an empty board
+FLAT_MOVEMENT_GRAPH: dict[int, tuple[(Direction, (int, int), int)]] = {
+    row * _COLUMNS + column: tuple((direction, position, position[0] * _COLUMNS + position[1])
+                                   for direction, position in options)
+    for (row, column), options in MOVEMENT_GRAPH.items()
+}
+
+
+def to_index(position: (int, int)) -> int:
+    return position[0] * _COLUMNS + position[1]
+
+
+def to_position(index: int) -> (int, int):
+    return divmod(index, _COLUMNS)
+
+
+def board_positions(board: Board) -> tuple[int, ...]:
+    # Flat index of every character's token, in Character order, as rules.GameState keeps them. A character missing
+    # from the board is at its starting position.
+    positions = []
+    for character in Character:
+        player_id = board.get_player_id(character)
+        position = board.get_player_position(player_id) if player_id is not None else None
+        positions.append(to_index(position or character.get_starting_position()))
+    return tuple(positions)
+
+
+def board_at(players: list[PlayerID], positions: tuple[int, ...]) -> Board:
+    # A new Board with the tokens of the players at the positions of a rules.GameState
+    board = Board(players=players)
+    board.set_positions({player_id: to_position(positions[player_id.character.ordinal_value])
+                         for player_id in players})
+    return board
+
+
+class BoardToken:
+    # Read-only snapshot of a player's token, so code written against Board.player_tokens works unchanged
+    __slots__ = ("player_id", "position")
+
+    def __init__(self, player_id: PlayerID, position: tuple[int, int] | None):
+        self.player_id = player_id
+        self.position = position
+
+    @property
+    def character(self):
+        return self.player_id.character
+
+    @property
+    def nickname(self):
+        return self.player_id.nickname
+
+
+class CompactBoard:
+    __slots__ = ("players", "slots", "positions", "occupancy")
+
+    def __init__(self, players: list[PlayerID]):
+        self.players: tuple[PlayerID, ...] = tuple(players)
+        self.slots: dict[PlayerID, int] = {player: slot for slot, player in enumerate(self.players)}
+        self.positions = array("b", [NOT_PLACED] * len(self.players))
+        self.occupancy = array("Q", [0] * len(SPACE_CAPACITY))
+        for slot, player in enumerate(self.players):
+            self.__place(slot, to_index(player.character.get_starting_position()))
+
+    @classmethod
+    def from_board(cls, board: Board) -> "CompactBoard":
+        compact = cls(players=[])
+        compact.players = tuple(board.player_tokens)
+        compact.slots = {player: slot for slot, player in enumerate(compact.players)}
+        compact.positions = array("b", [NOT_PLACED] * len(compact.players))
+        for slot, token in enumerate(board.player_tokens.values()):
+            if token.position is not None:
+                compact.__place(slot, to_index(token.position))
+        return compact
+
+    def copy(self) -> "CompactBoard":
+        board = CompactBoard.__new__(CompactBoard)
+        board.players = self.players
+        board.slots = self.slots
+        board.positions = array("b", self.positions)
+        board.occupancy = array("Q", self.occupancy)
+        return board
+
+    def can_add(self, position: (int, int)) -> bool:
+        index = to_index(position)
+        return self.occupancy[index].bit_count() < SPACE_CAPACITY[index]
+
+    def move(self, player_id, position):
+        slot = self.slots[player_id]
+        index = to_index(position)
+        if self.occupancy[index].bit_count() >= SPACE_CAPACITY[index]:
+            print("Error: Cannot add player to space")
+            return
+        self.__lift(slot)
+        self.__place(slot, index)
+
+    def set_positions(self, positions: dict[PlayerID, (int, int)]):
+        # Places tokens directly without capacity checks, used to restore a board that was sent over the network.
+        slots = [self.slots[player_id] for player_id in positions]
+        for slot in slots:
+            self.__lift(slot)
+        for slot, position in zip(slots, positions.values()):
+            self.__place(slot, to_index(position))
+
+    def get_movement_options(self, player_id) -> list[(Direction, (int, int))]:
+        occupancy = self.occupancy
+        return [(direction, position) for direction, position, index in
+                FLAT_MOVEMENT_GRAPH[self.positions[self.slots[player_id]]]
+                if occupancy[index].bit_count() < SPACE_CAPACITY[index]]
+
+    def get_player_room(self, player_id) -> Location | None:
+        return ROOM_AT[self.positions[self.slots[player_id]]]
+
+    def get_room_at(self, position: (int, int)) -> Location | None:
+        return ROOM_AT[to_index(position)]
+
+    def is_in_room(self, player_id):
+        return self.get_player_room(player_id) is not None
+
+    def get_player_id(self, character: Character):
+        for player in self.players:
+            if player.character == character:
+                return player
+
+    def get_player_position(self, player_id):
+        index = self.positions[self.slots[player_id]]
+        return None if index == NOT_PLACED else to_position(index)
+
+    def get_players_at(self, position: (int, int)) -> list[PlayerID]:
+        occupants = self.occupancy[to_index(position)]
+        return [player for slot, player in enumerate(self.players) if occupants >> slot & 1]
+
+    @property
+    def player_tokens(self) -> dict[PlayerID, BoardToken]:
+        return {player: BoardToken(player, self.get_player_position(player)) for player in self.players}
+
+    def get_character_position_description(self, player_id: PlayerID):
+        room = self.get_player_room(player_id)
+        if room is not None:
+            return room.value
+        row, column = self.get_player_position(player_id)
+        if row % 2 == 0:
+            first_room, second_room = ROOM_AT[to_index((row, column - 1))], ROOM_AT[to_index((row, column + 1))]
+        else:
+            first_room, second_room = ROOM_AT[to_index((row - 1, column))], ROOM_AT[to_index((row + 1, column))]
+        return f"the hallway between\nthe {first_room.value} and the {second_room.value}"
+
+    def __place(self, slot: int, index: int):
+        self.positions[slot] = index
+        self.occupancy[index] |= 1 << slot
+
+    def __lift(self, slot: int):
+        index = self.positions[slot]
+        if index != NOT_PLACED:
+            self.occupancy[index] &= ~(1 << slot)
+            self.positions[slot] = NOT_PLACED
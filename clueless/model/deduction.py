@@ -0,0 +1,171 @@
+from clueless.messages.messages import Suggest, Disprove, Disproved, Accuse, ResumeState, BaseMessage
+from clueless.messages.registry import handles, dispatch_table
+from clueless.model.board_enums import Character, Weapon, Location
+from clueless.model.card import Card, CARDS, card_mask, suggestion_mask, cards_in
+from clueless.model.player import PlayerID
+
+# Tracks what a player can infer about the envelope and the other hands from the messages every client receives.
+#
+# The 6 x 6 x 9 (character, weapon, location) hypotheses are the bits of one integer, hypothesis
+# character * 54 + weapon * 9 + location, so eliminating every hypothesis that contains a card is a single AND.
+# The card-ownership matrix is two card bitmasks per player: cards the player holds and cards they cannot hold.
+
+_WEAPONS, _LOCATIONS = len(Weapon), len(Location)
+HYPOTHESIS_COUNT = len(Character) * _WEAPONS * _LOCATIONS
+ALL_HYPOTHESES = (1 << HYPOTHESIS_COUNT) - 1
+ALL_CARDS = (1 << len(CARDS)) - 1
+
+
+_HYPOTHESES = [(character, weapon, location)
+               for character in Character for weapon in Weapon for location in Location]
+_HYPOTHESIS_INDEX = {hypothesis: h for h, hypothesis in enumerate(_HYPOTHESES)}
+# card_id -> bitmask of the hypotheses that have the card in the envelope
+HYPOTHESES_WITH: tuple[int, ...] = tuple(
+    sum(1 << h for h, hypothesis in enumerate(_HYPOTHESES) if card.member in hypothesis) for card in CARDS
+)
+
+
+class DeductionEngine:
+    def __init__(self, players: list[PlayerID], me: PlayerID, hand: list[Card]):
+        # players in turn order, the order cards were dealt in
+        self.players = list(players)
+        self.index = {player_id: i for i, player_id in enumerate(self.players)}
+        dealt = len(CARDS) - 3
+        self.hand_sizes = [dealt // len(self.players) + (i < dealt % len(self.players))
+                           for i in range(len(self.players))]
+        self.owned = [0] * len(self.players)
+        self.lacks = [0] * len(self.players)
+        # (player index, card mask): the player showed one of these cards, but we did not see which
+        self.clauses: list[(int, int)] = []
+        self.hypotheses = ALL_HYPOTHESES
+        # the last suggestion seen, which a Disproved notice refers to
+        self.suggestion: Suggest | None = None
+        self.handlers = dispatch_table(type(self))
+
+        me_index = self.index[me]
+        hand_mask = card_mask(hand)
+        self.owned[me_index] = hand_mask
+        self.lacks[me_index] = ALL_CARDS & ~hand_mask
+        self.__propagate()
+
+    def observe(self, message: BaseMessage):
+        handler = self.handlers.get(message.name)
+        if handler is not None:
+            handler(self, message)
+            self.__propagate()
+
+    @handles(Suggest)
+    def observe_suggestion(self, suggest: Suggest):
+        self.suggestion = suggest
+
+    @handles(Disprove)
+    def observe_disprove(self, disprove: Disprove):
+        self.suggestion = None
+        self.__disproved(disprove.suggest, disprove.player_id, disprove.card)
+
+    @handles(Disproved)
+    def observe_disproved(self, disproved: Disproved):
+        suggest, self.suggestion = self.suggestion, None
+        if suggest is not None and suggest.player_id == disproved.suggester:
+            self.__disproved(suggest, disproved.player_id, None)
+
+    @handles(ResumeState)
+    def observe_resume(self, resume: ResumeState):
+        # the Suggest a later Disproved refers to may have been missed while disconnected
+        self.suggestion = None
+
+    def __disproved(self, suggest: Suggest, disprover_id: PlayerID, card: Card | None):
+        suggester = self.index[suggest.player_id]
+        suggested = suggestion_mask(suggest.suggestion)
+        disprover = self.index[disprover_id]
+        # every player between the suggester and whoever disproved had none of the suggested cards
+        # (a disprove "by" the suggester means nobody could disprove it)
+        offset = 1
+        while (suggester + offset) % len(self.players) not in (suggester, disprover):
+            self.lacks[(suggester + offset) % len(self.players)] |= suggested
+            offset += 1
+        if disprover == suggester:
+            return
+        if card is not None:
+            self.owned[disprover] |= card.bit
+        else:
+            self.clauses.append((disprover, suggested))
+
+    @handles(Accuse)
+    def observe_accusation(self, accuse: Accuse):
+        if not accuse.is_correct:
+            self.hypotheses &= ~(1 << _HYPOTHESIS_INDEX[tuple(accuse.accusation)])
+
+    def solution(self) -> tuple[Character, Weapon, Location] | None:
+        if self.hypotheses.bit_count() == 1:
+            return _HYPOTHESES[self.hypotheses.bit_length() - 1]
+        return None
+
+    def possible_solutions(self) -> list[(Character, Weapon, Location)]:
+        return [_HYPOTHESES[h] for h in range(HYPOTHESIS_COUNT) if self.hypotheses >> h & 1]
+
+    def envelope_candidates(self) -> list[Card]:
+        # cards that are still in at least one possible solution
+        return [card for card in CARDS if self.hypotheses & HYPOTHESES_WITH[card.card_id]]
+
+    def owner_of(self, card: Card) -> PlayerID | None:
+        for i, owned in enumerate(self.owned):
+            if owned & card.bit:
+                return self.players[i]
+        return None
+
+    def __propagate(self):
+        # Applies the rules below until nothing changes:
+        #   - a card held by a player is not in the envelope, and nobody else holds it
+        #   - a player who showed one of several cards holds the only one they can hold
+        #   - a player whose known cards fill their hand holds nothing else, and one who can only hold as many
+        #     cards as their hand size holds all of them
+        #   - a card nobody can hold is in every possible solution, and a card in every possible solution is held
+        #     by nobody
+        #   - a card that is not in the envelope and that only one player can hold is held by that player
+        changed = True
+        while changed:
+            before = (self.hypotheses, tuple(self.owned), tuple(self.lacks), len(self.clauses))
+
+            all_owned = 0
+            for owned in self.owned:
+                all_owned |= owned
+            for i, owned in enumerate(self.owned):
+                self.lacks[i] |= all_owned & ~owned
+            for card in cards_in(all_owned):
+                self.hypotheses &= ~HYPOTHESES_WITH[card.card_id]
+
+            remaining_clauses = []
+            for i, cards in self.clauses:
+                if cards & self.owned[i]:
+                    continue
+                possible = cards & ~self.lacks[i]
+                if possible & (possible - 1) == 0:
+                    self.owned[i] |= possible
+                else:
+                    remaining_clauses.append((i, possible))
+            self.clauses = remaining_clauses
+
+            for i, size in enumerate(self.hand_sizes):
+                if self.owned[i].bit_count() == size:
+                    self.lacks[i] = ALL_CARDS & ~self.owned[i]
+                elif (ALL_CARDS & ~self.lacks[i]).bit_count() == size:
+                    self.owned[i] = ALL_CARDS & ~self.lacks[i]
+
+            # cards at least one player can hold, and cards more than one player can hold
+            holdable = shared = 0
+            for lacks in self.lacks:
+                shared |= holdable & ~lacks
+                holdable |= ALL_CARDS & ~lacks
+            for card in CARDS:
+                with_card = HYPOTHESES_WITH[card.card_id]
+                if not holdable & card.bit:
+                    self.hypotheses &= with_card
+                elif not self.hypotheses & ~with_card:
+                    for i in range(len(self.players)):
+                        self.lacks[i] |= card.bit
+                elif not self.hypotheses & with_card and not shared & card.bit:
+                    holder = next(i for i, lacks in enumerate(self.lacks) if not lacks & card.bit)
+                    self.owned[holder] |= card.bit
+
+            changed = before != (self.hypotheses, tuple(self.owned), tuple(self.lacks), len(self.clauses))
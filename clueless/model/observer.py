@@ -0,0 +1,67 @@
+from clueless.messages.messages import BaseMessage, YourTurn, Move, Suggest, Accuse, EndTurn, ResumeState
+from clueless.model import rules
+from clueless.model.board import Board
+from clueless.model.board_enums import Direction
+from clueless.model.compact_board import FLAT_MOVEMENT_GRAPH, board_positions, to_index
+from clueless.model.player import PlayerID
+from clueless.model.rules import GameState, Phase
+
+# A game as one of its players sees it, followed through clueless.model.rules from the messages the server sends.
+# Nobody's hand and no solution are known (both are 0), so a suggestion is never disproved, and every accusation
+# the rules are shown is a wrong one: a correct one ends the game with EndGame instead.
+# The server has already checked each action, so IllegalAction here means messages were missed. YourTurn puts
+# the turn back in step.
+
+
+def public_game(players: list[PlayerID], board: Board, seat=0, phase=Phase.TURN_START, active: int | None = None,
+                moved_by_suggestion=0) -> GameState:
+    # players in turn order, which is the order they joined the lobby
+    return GameState(
+        players=tuple(players),
+        characters=tuple(player_id.character.ordinal_value for player_id in players),
+        hands=(0,) * len(players),
+        solution=0,
+        positions=board_positions(board),
+        seat=seat,
+        turn=0,
+        phase=phase,
+        active=(1 << len(players)) - 1 if active is None else active,
+        moved_by_suggestion=moved_by_suggestion,
+    )
+
+
+def resumed_game(players: list[PlayerID], resume: ResumeState) -> GameState:
+    seat = players.index(resume.current_player) if resume.current_player is not None else 0
+    # the suggester waiting on a disprove carries on once it arrives, which this state cannot wait for
+    phase = Phase.SUGGESTED if resume.phase == Phase.DISPROVING else resume.phase
+    return public_game(players, resume.board, seat, phase, resume.active, resume.moved_by_suggestion)
+
+
+def follow(state: GameState, message: BaseMessage) -> GameState:
+    match message:
+        case YourTurn():
+            seat = rules.seat_of(state, message.player_id)
+            if state.seat == seat and state.phase == Phase.TURN_START:
+                return state
+            return state._replace(seat=seat, phase=Phase.TURN_START)
+        case Move():
+            return rules.apply(state, rules.MoveAction(rules.seat_of(state, message.player_id),
+                                                       to_index(message.position)))
+        case Suggest():
+            character, weapon, _ = message.suggestion
+            return rules.apply(state, rules.SuggestAction(rules.seat_of(state, message.player_id), character, weapon))
+        case Accuse():
+            return rules.apply(state, rules.AccuseAction(rules.seat_of(state, message.player_id), *message.accusation))
+        case EndTurn():
+            seat = rules.seat_of(state, message.player_id)
+            if seat != state.seat or state.phase == Phase.GAME_OVER:
+                return state  # a wrong accusation already ended the turn
+            return rules.apply(state, rules.EndTurnAction(seat))
+    return state
+
+
+def movement_options(state: GameState, seat: int) -> list[(Direction, (int, int))]:
+    # rules.move_targets as the (direction, position) pairs Board.get_movement_options returns
+    targets = rules.move_targets(state, seat)
+    return [(direction, position) for direction, position, index in
+            FLAT_MOVEMENT_GRAPH[rules.position_of(state, seat)] if index in targets]
@@ -0,0 +1,263 @@
+import random
+from enum import IntEnum
+from typing import NamedTuple
+
+from clueless.model.board_enums import Character, Weapon, Location, ActionType
+from clueless.model.card import Card, CARDS, CHARACTER_CARDS, WEAPON_CARDS, LOCATION_CARDS, card_mask, cards_in
+from clueless.model.compact_board import FLAT_MOVEMENT_GRAPH, SPACE_CAPACITY, ROOM_AT, to_index
+from clueless.model.player import PlayerID
+
+# The rules of a game as pure functions over an immutable GameState:
+#     new_game(players, rng) -> GameState
+#     legal_actions(state) -> [action, ...]
+#     apply(state, action) -> GameState
+# Nothing is mutated, so a state can be kept, shared or branched from freely (replays, search, simulations).
+# Seats are indices into state.players, which is in turn order. Board positions are flat indices
+# (row * 5 + column, see compact_board) and are kept for every character, including those nobody plays.
+
+
+class IllegalAction(ValueError):
+    pass
+
+
+class Phase(IntEnum):
+    TURN_START = 0  # the current seat may move, accuse, or suggest if a suggestion brought them into a room
+    MOVED = 1  # the current seat must suggest if they moved into a room, otherwise they may end their turn
+    DISPROVING = 2  # waiting for the disprover to show one of the suggested cards
+    SUGGESTED = 3  # the suggestion was answered, the current seat may accuse or end their turn
+    GAME_OVER = 4
+
+
+class MoveAction(NamedTuple):
+    seat: int
+    position: int
+
+
+class SuggestAction(NamedTuple):
+    seat: int
+    character: Character
+    weapon: Weapon
+
+
+class DisproveAction(NamedTuple):
+    seat: int
+    card_id: int
+
+
+class AccuseAction(NamedTuple):
+    seat: int
+    character: Character
+    weapon: Weapon
+    location: Location
+
+
+class EndTurnAction(NamedTuple):
+    seat: int
+
+
+class GameState(NamedTuple):
+    players: tuple[PlayerID, ...]
+    characters: tuple[int, ...]  # ordinal of each seat's character, the index of its entry in positions
+    hands: tuple[int, ...]  # card mask per seat
+    solution: int  # card mask of the envelope
+    positions: tuple[int, ...]  # flat board index per character, in Character order
+    seat: int  # whose turn it is
+    turn: int
+    phase: Phase
+    active: int  # bitmask of the seats that have not accused wrongly
+    moved_by_suggestion: int  # bitmask of the seats a suggestion moved into a room since their last turn
+    suggestion: int = 0  # card mask of this turn's suggestion
+    disprover: int = -1
+    shown: int = -1  # card id shown for this turn's suggestion, -1 if nobody could disprove it
+    winner: int = -1
+
+
+# Actions are immutable, so legal_actions hands out the same prebuilt ones for every state
+_SEATS = range(len(Character))
+_SUGGEST_ACTIONS = [tuple(SuggestAction(seat, character, weapon) for character in Character for weapon in Weapon)
+                    for seat in _SEATS]
+_ACCUSE_ACTIONS = [tuple(AccuseAction(seat, character, weapon, location)
+                         for character in Character for weapon in Weapon for location in Location) for seat in _SEATS]
+_MOVE_ACTIONS = [{index: MoveAction(seat, index) for index in FLAT_MOVEMENT_GRAPH} for seat in _SEATS]
+_END_TURN_ACTIONS = [EndTurnAction(seat) for seat in _SEATS]
+
+
+def deal(rng: random.Random, player_count: int) -> ((Card, Card, Card), list[list[Card]]):
+    # Picks the envelope (character, location, weapon) and deals the other 18 cards round-robin
+    winning_combination = (rng.choice(CHARACTER_CARDS), rng.choice(LOCATION_CARDS), rng.choice(WEAPON_CARDS))
+    winning_mask = card_mask(winning_combination)
+    cards = [card for card in CARDS if not card.bit & winning_mask]
+    rng.shuffle(cards)
+    return winning_combination, [cards[i::player_count] for i in range(player_count)]
+
+
+def new_game(players: list[PlayerID], rng: random.Random | None = None) -> GameState:
+    winning_combination, hands = deal(rng or random.Random(), len(players))
+    return GameState(
+        players=tuple(players),
+        characters=tuple(player_id.character.ordinal_value for player_id in players),
+        hands=tuple(card_mask(hand) for hand in hands),
+        solution=card_mask(winning_combination),
+        positions=tuple(to_index(character.get_starting_position()) for character in Character),
+        seat=0,
+        turn=0,
+        phase=Phase.TURN_START,
+        active=(1 << len(players)) - 1,
+        moved_by_suggestion=0,
+    )
+
+
+def next_active_seat(active: int, seat: int, player_count: int) -> int | None:
+    # The next seat after `seat` that may still play, None once everyone has accused wrongly
+    for offset in range(1, player_count + 1):
+        candidate = (seat + offset) % player_count
+        if active >> candidate & 1:
+            return candidate
+    return None
+
+
+def first_disprover(hands: list[int], seat: int, suggestion: int) -> int | None:
+    # The first seat after `seat` holding one of the suggested cards
+    for offset in range(1, len(hands)):
+        candidate = (seat + offset) % len(hands)
+        if hands[candidate] & suggestion:
+            return candidate
+    return None
+
+
+def _can_suggest(phase: Phase, in_room: bool, moved_by_suggestion: bool) -> bool:
+    return in_room and (phase == Phase.MOVED or (phase == Phase.TURN_START and moved_by_suggestion))
+
+
+def _can_end_turn(phase: Phase, can_move: bool, can_suggest: bool) -> bool:
+    # a turn ends once accusing is the only other thing left to do
+    return not can_suggest and (phase != Phase.TURN_START or not can_move)
+
+
+def action_types(phase: Phase, can_move: bool, in_room: bool, moved_by_suggestion: bool) -> list[ActionType]:
+    # What the player whose turn it is may do next, the same list the client shows as buttons
+    can_move = phase == Phase.TURN_START and can_move
+    can_suggest = _can_suggest(phase, in_room, moved_by_suggestion)
+    available = []
+    if can_move:
+        available.append(ActionType.MOVE)
+    if can_suggest:
+        available.append(ActionType.SUGGEST)
+    available.append(ActionType.ACCUSE)
+    if _can_end_turn(phase, can_move, can_suggest):
+        available.append(ActionType.END_TURN)
+    return available
+
+
+def seat_of(state: GameState, player_id: PlayerID) -> int:
+    return state.players.index(player_id)
+
+
+def position_of(state: GameState, seat: int) -> int:
+    return state.positions[state.characters[seat]]
+
+
+def move_targets(state: GameState, seat: int) -> list[int]:
+    positions = state.positions
+    return [index for _, _, index in FLAT_MOVEMENT_GRAPH[positions[state.characters[seat]]]
+            if positions.count(index) < SPACE_CAPACITY[index]]
+
+
+def current_action_types(state: GameState) -> list[ActionType]:
+    # action_types() for the seat whose turn it is
+    seat = state.seat
+    return action_types(state.phase,
+                        can_move=state.phase == Phase.TURN_START and bool(move_targets(state, seat)),
+                        in_room=ROOM_AT[position_of(state, seat)] is not None,
+                        moved_by_suggestion=bool(state.moved_by_suggestion >> seat & 1))
+
+
+def legal_actions(state: GameState, accusations=True) -> list:
+    # Every action apply() accepts in this state. The 324 accusations can be left out, which is what search and
+    # simulations usually want until they know the solution.
+    if state.phase == Phase.GAME_OVER:
+        return []
+    if state.phase == Phase.DISPROVING:
+        return [DisproveAction(state.disprover, card.card_id)
+                for card in cards_in(state.hands[state.disprover] & state.suggestion)]
+    seat = state.seat
+    actions = []
+    for action_type in current_action_types(state):
+        match action_type:
+            case ActionType.MOVE:
+                actions.extend(_MOVE_ACTIONS[seat][index] for index in move_targets(state, seat))
+            case ActionType.SUGGEST:
+                actions.extend(_SUGGEST_ACTIONS[seat])
+            case ActionType.ACCUSE if accusations:
+                actions.extend(_ACCUSE_ACTIONS[seat])
+            case ActionType.END_TURN:
+                actions.append(_END_TURN_ACTIONS[seat])
+    return actions
+
+
+def apply(state: GameState, action) -> GameState:
+    phase = state.phase
+    if phase == Phase.GAME_OVER:
+        raise IllegalAction(f"{action} after the game is over")
+    if phase == Phase.DISPROVING:
+        if type(action) is not DisproveAction or action.seat != state.disprover:
+            raise IllegalAction(f"{action} while waiting for seat {state.disprover} to disprove")
+        if not state.hands[action.seat] & state.suggestion & CARDS[action.card_id].bit:
+            raise IllegalAction(f"{action} does not show a suggested card from the player's hand")
+        return GameState(state.players, state.characters, state.hands, state.solution, state.positions, state.seat,
+                         state.turn, Phase.SUGGESTED, state.active, state.moved_by_suggestion, state.suggestion,
+                         state.disprover, action.card_id)
+    seat = action.seat
+    if seat != state.seat:
+        raise IllegalAction(f"{action} out of turn, it is seat {state.seat}'s turn")
+
+    action_type = type(action)
+    if action_type is MoveAction:
+        if phase != Phase.TURN_START or action.position not in move_targets(state, seat):
+            raise IllegalAction(f"{action} is not a legal move")
+        positions = list(state.positions)
+        positions[state.characters[seat]] = action.position
+        return GameState(state.players, state.characters, state.hands, state.solution, tuple(positions), seat,
+                         state.turn, Phase.MOVED, state.active, state.moved_by_suggestion)
+    if action_type is AccuseAction:
+        if card_mask((action.character, action.weapon, action.location)) == state.solution:
+            return state._replace(phase=Phase.GAME_OVER, winner=seat)
+        # a wrong accusation ends the player's turn, and their game
+        return _end_turn(state, state.active & ~(1 << seat))
+    room = ROOM_AT[state.positions[state.characters[seat]]]
+    can_suggest = _can_suggest(phase, room is not None, state.moved_by_suggestion >> seat & 1)
+    if action_type is SuggestAction:
+        if not can_suggest:
+            raise IllegalAction(f"{action} is not allowed now")
+        return _suggest(state, action, room)
+    if action_type is EndTurnAction:
+        if not _can_end_turn(phase, phase == Phase.TURN_START and bool(move_targets(state, seat)), can_suggest):
+            raise IllegalAction(f"{action} is not allowed now")
+        return _end_turn(state, state.active)
+    raise IllegalAction(f"{action} is not allowed now")
+
+
+def _suggest(state: GameState, action: SuggestAction, room: Location) -> GameState:
+    room_index = state.positions[state.characters[action.seat]]
+    suggestion = card_mask((action.character, action.weapon, room))
+    # the suggested character is brought into the room
+    positions = state.positions
+    moved_by_suggestion = state.moved_by_suggestion
+    suggested_ordinal = action.character.ordinal_value
+    if positions[suggested_ordinal] != room_index:
+        positions = positions[:suggested_ordinal] + (room_index,) + positions[suggested_ordinal + 1:]
+        if suggested_ordinal in state.characters:
+            moved_by_suggestion |= 1 << state.characters.index(suggested_ordinal)
+    disprover = first_disprover(state.hands, action.seat, suggestion)
+    return GameState(state.players, state.characters, state.hands, state.solution, positions, action.seat, state.turn,
+                     Phase.SUGGESTED if disprover is None else Phase.DISPROVING, state.active, moved_by_suggestion,
+                     suggestion, -1 if disprover is None else disprover)
+
+
+def _end_turn(state: GameState, active: int) -> GameState:
+    moved_by_suggestion = state.moved_by_suggestion & ~(1 << state.seat)
+    seat = next_active_seat(active, state.seat, len(state.players))
+    if seat is None:
+        return state._replace(phase=Phase.GAME_OVER, active=active, moved_by_suggestion=moved_by_suggestion)
+    return GameState(state.players, state.characters, state.hands, state.solution, state.positions, seat,
+                     state.turn + 1, Phase.TURN_START, active, moved_by_suggestion)
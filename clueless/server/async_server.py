@@ -0,0 +1,80 @@
+import asyncio
+
+from PodSixNet.Channel import Channel
+from PodSixNet.rencode import dumps, loads
+
+from clueless.messages.registry import dispatch_table
+
+from event_log import EventLogWriter
+from game_registry import GameRegistry
+from metrics import BroadcastMetrics
+from routing import ChannelHandlers, GameRouter
+
+# Same framing as PodSixNet, so the existing GameConnection client can connect to either runtime
+TERMINATOR = Channel.endchars.encode()
+
+
+class AsyncClientChannel(ChannelHandlers):
+    # asyncio stream counterpart of server.ClientChannel
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, server: "AsyncClueServer"):
+        self._reader = reader
+        self._writer = writer
+        self._server = server
+        self.addr = writer.get_extra_info("peername")
+        self.handlers = dispatch_table(type(self))
+
+    def Send(self, data: dict):
+        return self.SendEncoded(dumps(data) + TERMINATOR)
+
+    def SendEncoded(self, outgoing: bytes):
+        # the transport buffers the bytes and writes them as soon as the socket is writable
+        self._writer.write(outgoing)
+        return len(outgoing)
+
+    async def serve(self):
+        self.Send({"action": "connected"})
+        try:
+            while True:
+                frame = await self._reader.readuntil(TERMINATOR)
+                data = loads(frame[:-len(TERMINATOR)])
+                if type(data) is dict and 'action' in data:
+                    self.Network(data)
+                else:
+                    print("OOB data:", data)
+                await self._writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._server.del_player(self)
+            self._writer.close()
+
+    def __repr__(self):
+        return f"AsyncClientChannel({self.addr})"
+
+
+class AsyncClueServer(GameRouter):
+    # Runs the same games as ClueServer, but the event loop sleeps until a socket is ready or a timer fires,
+    # instead of polling every 0.1ms.
+
+    def __init__(self, host="127.0.0.1", port=10000, server_resolved_disprove=False, event_log_dir=None):
+        self.host = host
+        self.port = port
+        self.metrics = BroadcastMetrics()
+        self.registry = GameRegistry(metrics=self.metrics, server_resolved_disprove=server_resolved_disprove,
+                                     event_log=EventLogWriter(event_log_dir) if event_log_dir else None)
+
+    async def serve(self):
+        server = await asyncio.start_server(self.__accept, self.host, self.port, backlog=128)
+        print('Server launched')
+        print(f'Socket: {server.sockets[0]}')
+        async with server:
+            await server.serve_forever()
+
+    async def __accept(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        channel = AsyncClientChannel(reader, writer, self)
+        print("New Client Connected " + str(channel.addr))
+        await channel.serve()
+
+    def Launch(self):
+        asyncio.run(self.serve())
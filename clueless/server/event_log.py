@@ -0,0 +1,239 @@
+import os
+import queue
+import random
+import struct
+import threading
+import time
+from pathlib import Path
+
+from clueless.messages import codec
+from clueless.messages.codec import CodecError, ListOf, PlayerIDField
+from clueless.messages.messages import BaseMessage, Move, Suggest, Disprove, Accuse, EndTurn, EndGame
+from clueless.messages.registry import MESSAGES
+from clueless.model.compact_board import to_index
+from clueless.model.player import PlayerID
+from clueless.model import rules
+
+# Append-only log of one game: the deal seed and players, then every action the server received and every message
+# it sent, in order. Records are length-prefixed like framing.py, followed by a kind byte:
+#     START     seed (8 bytes), flags (1 byte), players in turn order
+#     INBOUND   codec payload of the action
+#     OUTBOUND  recipients (bitmask of seats, 1 byte), codec payload of the message
+# The seed makes the deal reproducible, so replay() can run a whole game through clueless.model.rules.
+#
+# GameEventLog only builds records; one EventLogWriter thread per server writes every game's log and fsyncs each
+# file at most once per fsync_interval, so a crash loses at most that much of a game.
+
+RECORD_HEADER = struct.Struct("!IB")  # record length (kind byte included), kind
+START_HEADER = struct.Struct("!QB")  # seed, flags
+START, INBOUND, OUTBOUND = 0, 1, 2
+SERVER_RESOLVED_DISPROVE = 1
+_PLAYERS = ListOf(PlayerIDField())
+
+
+def new_seed() -> int:
+    return random.SystemRandom().getrandbits(64)
+
+
+class GameEventLog:
+    def __init__(self, writer: "EventLogWriter", path: Path):
+        self.writer = writer
+        self.path = path
+        self.closed = False
+
+    def start(self, seed: int, players: list[PlayerID], server_resolved_disprove: bool):
+        record = self.__new_record(START)
+        record += START_HEADER.pack(seed, SERVER_RESOLVED_DISPROVE if server_resolved_disprove else 0)
+        _PLAYERS.encode(players, record)
+        self.__append(record)
+
+    def inbound(self, message: BaseMessage):
+        record = self.__new_record(INBOUND)
+        codec.encode_into(message, record)
+        self.__append(record)
+
+    def outbound(self, message: BaseMessage, recipients: int):
+        record = self.__new_record(OUTBOUND)
+        record.append(recipients)
+        codec.encode_into(message, record)
+        self.__append(record)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.writer.submit(self.path, None)
+
+    @staticmethod
+    def __new_record(kind: int) -> bytearray:
+        record = bytearray(RECORD_HEADER.size)
+        record[-1] = kind
+        return record
+
+    def __append(self, record: bytearray):
+        if self.closed:
+            return
+        struct.pack_into("!I", record, 0, len(record) - 4)
+        self.writer.submit(self.path, record)
+
+
+class EventLogWriter:
+    def __init__(self, directory, fsync_interval=0.05):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.fsync_interval = fsync_interval
+        self.records_written = 0
+        self.fsyncs = 0
+        self._queue: queue.SimpleQueue[(Path, bytearray | None) | None] = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self.__run, name="event-log-writer", daemon=True)
+        self._thread.start()
+
+    def open(self, game_id: int) -> GameEventLog:
+        return GameEventLog(self, self.directory / f"game-{game_id}.log")
+
+    def submit(self, path: Path, record: bytearray | None):
+        # record None closes the file once everything before it is written
+        self._queue.put((path, record))
+
+    def close(self):
+        # writes and fsyncs everything submitted so far, then stops the thread
+        self._queue.put(None)
+        self._thread.join()
+
+    def __run(self):
+        files = {}
+        failed = set()  # logs that could not be written, their records are dropped until they are closed
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            dirty = set()
+            closing = []
+            for item in batch:
+                if item is None:
+                    stopping = True
+                    continue
+                path, record = item
+                if record is None:
+                    closing.append(path)
+                    continue
+                if path in failed:
+                    continue
+                try:
+                    if path not in files:
+                        files[path] = open(path, "ab")
+                    files[path].write(record)
+                except OSError as e:
+                    self.__drop(files, failed, path, e)
+                    continue
+                dirty.add(path)
+                self.records_written += 1
+            for path in dirty - failed:
+                try:
+                    files[path].flush()
+                    os.fsync(files[path].fileno())
+                except OSError as e:
+                    self.__drop(files, failed, path, e)
+                    continue
+                self.fsyncs += 1
+            for path in closing + (list(files) if stopping else []):
+                failed.discard(path)
+                log_file = files.pop(path, None)
+                if log_file is not None:
+                    try:
+                        log_file.close()
+                    except OSError as e:
+                        print(f"Could not close event log {path}: {e}")
+            if not stopping:
+                # everything that arrives meanwhile goes into the next batch, and its single fsync
+                time.sleep(self.fsync_interval)
+
+    @staticmethod
+    def __drop(files: dict, failed: set, path: Path, error: OSError):
+        # One game's log failing must not stop the others from being written
+        print(f"Could not write event log {path}, dropping the rest of it: {error}")
+        failed.add(path)
+        log_file = files.pop(path, None)
+        if log_file is not None:
+            try:
+                log_file.close()
+            except OSError:
+                pass
+
+
+def read_log(path) -> (int, list[PlayerID], bool, list[(int, int, memoryview)]):
+    # Returns (seed, players, server_resolved_disprove, [(kind, recipients, payload), ...]). Payloads are views
+    # into the file contents, decoded by the caller only if needed.
+    data = memoryview(Path(path).read_bytes())
+    records = []
+    pos = 0
+    while pos < len(data):
+        if len(data) - pos < RECORD_HEADER.size:
+            break  # the last record was cut short by a crash
+        length, kind = RECORD_HEADER.unpack_from(data, pos)
+        end = pos + 4 + length
+        if end > len(data):
+            break
+        body = pos + RECORD_HEADER.size
+        if kind == OUTBOUND:
+            records.append((kind, data[body], data[body + 1:end]))
+        else:
+            records.append((kind, 0, data[body:end]))
+        pos = end
+    if not records or records[0][0] != START:
+        raise CodecError(f"{path} does not start with a START record")
+    seed, flags = START_HEADER.unpack_from(records[0][2], 0)
+    players, _ = _PLAYERS.decode(records[0][2], START_HEADER.size)
+    return seed, players, bool(flags & SERVER_RESOLVED_DISPROVE), records[1:]
+
+
+def replay(path) -> (rules.GameState, int):
+    # Runs the logged game through the rules from the recorded deal, returning the final state and the number of
+    # records read. The rules check every action again, so IllegalAction means the log and the rules disagree.
+    # The players' actions come from the INBOUND records. The card shown for a suggestion is taken from the
+    # Disprove the server sent the suggester, which covers both disprove protocols (asking players in turn, or
+    # resolved by the server); the players' Disprove replies are not needed.
+    seed, players, _, records = read_log(path)
+    state = rules.new_game(players, random.Random(seed))
+    seats = {player_id: seat for seat, player_id in enumerate(players)}
+    accused_wrongly = None  # the server waits for an EndTurn after a wrong accusation, the rules end the turn
+    for kind, _, payload in records:
+        type_id = payload[0]
+        if kind == OUTBOUND:
+            if type_id != Disprove.type_id:
+                continue
+            disprove = codec.decode(payload, MESSAGES.by_id)
+            if disprove.card is not None:
+                state = rules.apply(state, rules.DisproveAction(seats[disprove.player_id], disprove.card.card_id))
+            continue
+        if type_id == Disprove.type_id:
+            continue
+        # INBOUND records are actions, so every one of them names its player
+        message = codec.decode(payload, MESSAGES.by_id)
+        seat = seats[message.player_id]
+        if type_id == Move.type_id:
+            state = rules.apply(state, rules.MoveAction(seat, to_index(message.position)))
+        elif type_id == Suggest.type_id:
+            character, weapon, _ = message.suggestion
+            state = rules.apply(state, rules.SuggestAction(seat, character, weapon))
+        elif type_id == Accuse.type_id:
+            state = rules.apply(state, rules.AccuseAction(seat, *message.accusation))
+            accused_wrongly = seat if state.winner != seat else None
+        elif type_id == EndTurn.type_id:
+            if seat == accused_wrongly:
+                accused_wrongly = None
+            else:
+                state = rules.apply(state, rules.EndTurnAction(seat))
+    return state, len(records) + 1
+
+
+def logged_winner(path) -> PlayerID | None:
+    # The winner according to the server's EndGame broadcast, to compare with the replay
+    _, _, _, records = read_log(path)
+    for kind, _, payload in reversed(records):
+        if kind == OUTBOUND and payload[0] == EndGame.type_id:
+            return codec.decode(payload, MESSAGES.by_id).accuse.player_id
+    return None
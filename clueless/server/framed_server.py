@@ -0,0 +1,74 @@
+import asyncio
+
+from clueless.messages.codec import CodecError
+from clueless.messages.framing import FrameReader, encode_frame
+from clueless.messages.registry import dispatch_table
+
+from event_log import EventLogWriter
+from game_registry import GameRegistry
+from metrics import BroadcastMetrics
+from routing import ChannelHandlers, GameRouter
+
+
+class FramedClientChannel(ChannelHandlers, asyncio.BufferedProtocol):
+    # Speaks length-prefixed binary frames (clueless.messages.framing) instead of the PodSixNet format.
+    # As a BufferedProtocol the event loop reads into the channel's FrameReader directly.
+    encode_frame = staticmethod(encode_frame)  # send_to_channels encodes a broadcast once per wire format
+
+    def __init__(self, server: "FramedClueServer"):
+        self._server = server
+        self._reader = FrameReader()
+        self._transport: asyncio.Transport | None = None
+        self.addr = None
+        self.handlers = dispatch_table(type(self))
+
+    def connection_made(self, transport: asyncio.Transport):
+        self._transport = transport
+        self.addr = transport.get_extra_info("peername")
+        print("New Client Connected " + str(self.addr))
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self._reader.writable(sizehint)
+
+    def buffer_updated(self, nbytes: int):
+        self._reader.advance(nbytes)
+        try:
+            for message in self._reader.messages():
+                self.Receive(message)
+        except (CodecError, IndexError, ValueError) as e:
+            # a frame that does not decode leaves the rest of the stream unreadable (the asyncio runtime drops the
+            # connection on errors as well)
+            print(f"Dropping client channel {self}: {e}")
+            self._transport.close()
+
+    def connection_lost(self, exc: Exception | None):
+        self._server.del_player(self)
+
+    def SendEncoded(self, outgoing: bytes):
+        self._transport.write(outgoing)
+        return len(outgoing)
+
+    def __repr__(self):
+        return f"FramedClientChannel({self.addr})"
+
+
+class FramedClueServer(GameRouter):
+    # The asyncio runtime with length-prefixed binary framing on the wire
+
+    def __init__(self, host="127.0.0.1", port=10000, server_resolved_disprove=False, event_log_dir=None):
+        self.host = host
+        self.port = port
+        self.metrics = BroadcastMetrics()
+        self.registry = GameRegistry(metrics=self.metrics, server_resolved_disprove=server_resolved_disprove,
+                                     event_log=EventLogWriter(event_log_dir) if event_log_dir else None)
+
+    async def serve(self):
+        server = await asyncio.get_running_loop().create_server(lambda: FramedClientChannel(self), self.host,
+                                                                self.port, backlog=128)
+        print('Server launched')
+        print(f'Socket: {server.sockets[0]}')
+        async with server:
+            await server.serve_forever()
+
+    def Launch(self):
+        asyncio.run(self.serve())
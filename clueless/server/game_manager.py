@@ -1,12 +1,17 @@
-from clueless.messages.messages import DealCards, YourTurn, BaseMessage, Suggest, Move, EndTurn, RequestDisprove, Accuse, \
-    Disprove, EndGame
+from clueless.messages.messages import DealCards, YourTurn, BaseMessage, BaseClientAction, Suggest, Move, EndTurn, \
+    RequestDisprove, Accuse, Disprove, Disproved, EndGame, ResumeState, Rejected
+from clueless.model import rules
 from clueless.model.board import Board
-from clueless.model.board_enums import Character, Location, Weapon, CardType
+from clueless.model.board_enums import Character
 import random
 
-from clueless.model.card import Card
+from clueless.model.card import cards_in
+from clueless.model.compact_board import ROOM_AT, board_at, to_index
 from clueless.model.player import PlayerID
-from server_player import ServerPlayer
+from clueless.model.rules import Phase
+from event_log import GameEventLog
+from metrics import BroadcastMetrics
+from server_player import ServerPlayer, send_to_channels
 
 
 # future features:
@@ -15,8 +20,13 @@ from server_player import ServerPlayer
 #       - dropping from a lobby
 #       - selecting your character
 class GameManager:
+    # The game itself is a rules.GameState: every action is checked and applied by rules.apply, and an action the
+    # rules do not allow is answered with Rejected instead of being broadcast. Kept next to the state is the protocol
+    # around it: whose disprove is being waited on, and the EndTurn a player sends after a wrong accusation, which
+    # the rules do not need.
 
-    def __init__(self, players: [ServerPlayer]):
+    def __init__(self, players: [ServerPlayer], metrics: BroadcastMetrics = None, server_resolved_disprove=False,
+                 rng: random.Random = None, event_log: GameEventLog = None):
         # Play order = by Character Enum order, which is also the order the players joined the lobby
         self.current_player = None
         self.players: list[ServerPlayer] = sorted(players, key=lambda x: x.player_id.character.ordinal_value)
@@ -24,34 +34,74 @@ class GameManager:
 
         dummy_players: list[PlayerID] = [PlayerID(nickname=character.name, character=character) for character in \
                                          unassigned_characters]
-        self.board: Board = Board(players=[player.player_id for player in self.players] + dummy_players)
+        self.board_players = [player.player_id for player in self.players] + dummy_players
         self.turn = -1
-        self.winning_combination = None
+        self.state: rules.GameState | None = None
+        self.metrics = metrics or BroadcastMetrics()
+        # When set, the server uses the hands it dealt to skip players who cannot disprove a suggestion,
+        # instead of asking every player in turn.
+        self.server_resolved_disprove = server_resolved_disprove
+        # dealing draws from this generator only, so a seeded one deals the same game every time
+        self.rng = rng or random.Random()
+        # every action received and message sent is appended here, if set (see event_log)
+        self.event_log = event_log
+        self.seats = {player.player_id: seat for seat, player in enumerate(self.players)}
+        self.pending_disprove: (PlayerID, Suggest) | None = None  # who was asked to disprove, and what
+        self.accused_wrongly: int | None = None  # seat whose EndTurn is awaited after a wrong accusation
+
+    @property
+    def board(self) -> Board:
+        # built from the state on every call: a board handed to a loopback client is never changed under it
+        if self.state is None:
+            return Board(players=self.board_players)
+        return board_at(self.board_players, self.state.positions)
+
+    @property
+    def phase(self) -> Phase:
+        if self.state is None:
+            return Phase.TURN_START
+        if self.pending_disprove is not None:
+            # players without a matching card are asked too, so this can outlast the rules' DISPROVING
+            return Phase.DISPROVING
+        if self.accused_wrongly is not None:
+            return Phase.SUGGESTED  # the rules have moved on to the next seat, the accuser only has to end the turn
+        return self.state.phase
 
     def start_game(self):
         # Distribute Cards
-        cards = self.__create_cards()
-        print(self.winning_combination)
-        for i in range(0, len(cards)):
-            self.players[i % len(self.players)].cards.append(cards[i])
+        self.state = rules.new_game([player.player_id for player in self.players], self.rng)
+        print(cards_in(self.state.solution))
+        for player, hand in zip(self.players, self.state.hands):
+            player.cards = cards_in(hand)
         for player in self.players:
-            player.Send(DealCards(cards=player.cards))
+            self.SendToPlayers([player], DealCards(cards=player.cards))
         self.next_turn()
 
     def next_turn(self):
-        self.turn += 1
-        self.current_player = self.players[self.turn % len(self.players)]
-        if self.current_player.active:
-            self.SendToAll(YourTurn(turn_id=self.turn, player_id=self.current_player.player_id))
-        else:
-            self.next_turn()
+        # players who accused wrongly are skipped, but the turn counter still counts their turns
+        if self.state.phase == Phase.GAME_OVER:
+            print("Every player accused wrongly, nobody wins.")
+            self.close_event_log()
+            return
+        seat = self.state.seat
+        self.turn += (seat - self.turn) % len(self.players) or len(self.players)
+        self.current_player = self.players[seat]
+        self.SendToAll(YourTurn(turn_id=self.turn, player_id=self.current_player.player_id))
 
     def end_turn(self, end_action: EndTurn):
+        if self.accused_wrongly is not None and self.seats.get(end_action.player_id) == self.accused_wrongly:
+            self.accused_wrongly = None
+        elif not self.apply(end_action, rules.EndTurnAction(self.seats.get(end_action.player_id))):
+            return
+        self.record(end_action)
         self.SendToAll(end_action)
         self.next_turn()
 
     def move(self, player, move_action: Move):
-        # TODO: Add error handling: throw when the move is invalid
+        action = rules.MoveAction(self.seats.get(move_action.player_id), to_index(move_action.position))
+        if not self.apply(move_action, action):
+            return
+        self.record(move_action)
         self.SendToAll(move_action)
 
     def find_index_player(self, player_id):
@@ -62,70 +112,166 @@ class GameManager:
         return index
 
     def suggest(self, suggest_action: Suggest):
-        # move accused to accuser's location
+        seat = self.seats.get(suggest_action.player_id)
+        character, weapon, location = suggest_action.suggestion
+        if self.state is not None and seat is not None and location != ROOM_AT[rules.position_of(self.state, seat)]:
+            self.reject(suggest_action, f"{location.value} is not the room the suggester is in")
+            return
+        if not self.apply(suggest_action, rules.SuggestAction(seat, character, weapon)):
+            return
+        self.record(suggest_action)
         self.SendToAll(suggest_action)
+        if self.server_resolved_disprove:
+            self.resolve_disprove(suggest_action)
+            return
 
         print("up to here")
         index = self.find_index_player(suggest_action.player_id)
         next_player = self.players[(index + 1) % len(self.players)]
-        request_disprove = RequestDisprove(suggest_action)
-        self.SendToPlayerWithId(next_player.player_id, request_disprove)
+        self.request_disprove(next_player.player_id, suggest_action)
         # TODO: move weapon into location
-        # TODO: move suggested character
 
     def disprove(self, disprove: Disprove):
+        if self.pending_disprove is None or disprove.player_id != self.pending_disprove[0]:
+            self.reject(disprove, "nobody asked this player to disprove")
+            return
+        seat = self.seats[disprove.player_id]
+        suggest = self.pending_disprove[1]
         if not disprove.card:
-            disproving_player = disprove.player_id
-            index = self.find_index_player(disproving_player)
+            if self.state.hands[seat] & self.state.suggestion:
+                self.reject(disprove, "the player holds a suggested card and has to show it")
+                return
+            self.record(disprove)
+            index = self.find_index_player(disprove.player_id)
             next_player = self.players[(index + 1) % len(self.players)]
-            if next_player.player_id == disprove.suggest.player_id:
+            if next_player.player_id == suggest.player_id:
                 print("No players could disprove.")
-                self.SendToAll(Disprove(disprove.suggest.player_id, None, disprove.suggest))
+                self.disproved(Disprove(suggest.player_id, None, suggest))
             else:
-                request_disprove = RequestDisprove(disprove.suggest)
-                self.SendToPlayerWithId(next_player.player_id, request_disprove)
+                self.request_disprove(next_player.player_id, suggest)
+        elif self.apply(disprove, rules.DisproveAction(seat, disprove.card.card_id)):
+            self.record(disprove)
+            self.disproved(disprove)
+
+    def resolve_disprove(self, suggest: Suggest):
+        # Only the first player (in turn order after the suggester) holding a matching card is involved, the one
+        # the rules are waiting for. With one matching card there is nothing to choose, so the disprove is sent
+        # right away.
+        if self.state.phase != Phase.DISPROVING:
+            print("No players could disprove.")
+            self.disproved(Disprove(suggest.player_id, None, suggest))
+            return
+        player = self.players[self.state.disprover]
+        matching_cards = cards_in(self.state.hands[self.state.disprover] & self.state.suggestion)
+        if len(matching_cards) == 1:
+            self.state = rules.apply(self.state, rules.DisproveAction(self.state.disprover, matching_cards[0].card_id))
+            self.disproved(Disprove(player.player_id, matching_cards[0], suggest))
         else:
-            self.SendToAll(disprove)
+            self.request_disprove(player.player_id, suggest)
+
+    def request_disprove(self, player_id: PlayerID, suggest: Suggest):
+        self.pending_disprove = (player_id, suggest)
+        self.SendToPlayerWithId(player_id, RequestDisprove(suggest))
+
+    def disproved(self, disprove: Disprove):
+        # the suggestion is answered, the suggester carries on with their turn
+        self.pending_disprove = None
+        # only the suggester is shown the card, everyone else just learns who disproved it
+        suggester = self.players[self.state.seat].player_id
+        self.SendToPlayerWithId(suggester, disprove)
+        self.SendToPlayers([player for player in self.players if player.player_id != suggester],
+                           Disproved(disprove.player_id, suggester))
 
     def accuse(self, accuser, accuse_action: Accuse):
-        character, weapon, location = accuse_action.accusation
-        if (character.value, location.value, weapon.value) == (self.winning_combination[0].card_value, self.winning_combination[1].card_value, self.winning_combination[2].card_value):
+        seat = self.seats.get(accuse_action.player_id)
+        if not self.apply(accuse_action, rules.AccuseAction(seat, *accuse_action.accusation)):
+            return
+        self.record(accuse_action)
+        if self.state.winner == seat:
             game_over_message = f"Game Over! {accuser.player_id.nickname} made the correct accusation."
             accuse_action.is_correct = True
             self.SendToAll(EndGame(accuse_action))
             print(game_over_message)
+            self.close_event_log()
         else:
-            accuser.active = False
+            # the rules have ended the turn, the accuser still sends an EndTurn to pass it on
+            self.accused_wrongly = seat
             self.SendToAll(accuse_action)
 
-    def __create_cards(self):
-        cards = []
-
-        # choose specific combination and distribute the rest
+    ################################
+    #            RULES             #
+    ################################
 
-        self.winning_combination = (Card(CardType.CHARACTER, random.choice(list(Character)).value),
-                                    Card(CardType.LOCATION, random.choice(list(Location)).value),
-                                    Card(CardType.WEAPON, random.choice(list(Weapon)).value))
-        cards.extend(
-            [Card(CardType.CHARACTER, x.value)
-             for x in Character if not x.value == self.winning_combination[0].card_value])
-        cards.extend([Card(CardType.LOCATION, x.value)
-                      for x in Location if not x.value == self.winning_combination[1].card_value])
-        cards.extend([Card(CardType.WEAPON, x.value)
-                      for x in Weapon if not x.value == self.winning_combination[2].card_value])
-        random.shuffle(cards)
-        return cards
+    def apply(self, message: BaseClientAction, action) -> bool:
+        # Moves the game on by one action, unless the rules do not allow it; the sender is told why in that case
+        if self.state is None or action.seat is None:
+            self.reject(message, "the player is not in a game in progress")
+            return False
+        if self.pending_disprove is not None and type(action) is not rules.DisproveAction:
+            self.reject(message, f"waiting for {self.pending_disprove[0].nickname} to disprove")
+            return False
+        if self.accused_wrongly is not None:
+            self.reject(message, f"waiting for {self.players[self.accused_wrongly].nickname} to end their turn")
+            return False
+        try:
+            self.state = rules.apply(self.state, action)
+        except rules.IllegalAction as e:
+            self.reject(message, str(e))
+            return False
+        return True
 
-    ## disprove
+    def reject(self, message: BaseClientAction, reason: str):
+        print(f"Rejected {message.name} from {message.player_id}: {reason}")
+        self.SendToPlayerWithId(message.player_id, Rejected(message.name, message.uuid, reason))
 
     ################################
     #       NETWORKING HELPERS     #
     ################################
 
     def SendToPlayerWithId(self, player_id: PlayerID, data: BaseMessage):
-        for player in self.players:
-            if player_id == player.player_id:
-                player.Send(data)
+        self.SendToPlayers([player for player in self.players if player_id == player.player_id], data)
 
     def SendToAll(self, data: BaseMessage):
-        [p.Send(data) for p in self.players]
+        self.SendToPlayers(self.players, data)
+
+    def SendToPlayers(self, players: list[ServerPlayer], data: BaseMessage):
+        # serialize once and queue the same buffer on every recipient's channel
+        self.record_sent(players, data)
+        # players who lost their connection keep their seat, they catch up with snapshot() when they resume
+        send_to_channels([p.channel for p in players if p.channel is not None], data, self.metrics)
+
+    def snapshot(self, player: ServerPlayer, game_id: int, players: [(PlayerID, bool)]) -> ResumeState:
+        # The state of the game as one message, for a player taking their seat back
+        pending = self.pending_disprove
+        state = self.state
+        return ResumeState(
+            player_id=player.player_id,
+            game_id=game_id,
+            players=players,
+            board=self.board,
+            cards=player.cards,
+            turn_id=self.turn if self.current_player is not None else None,
+            current_player=self.current_player.player_id if self.current_player is not None else None,
+            phase=self.phase,
+            active=state.active if state is not None else 0,
+            moved_by_suggestion=state.moved_by_suggestion if state is not None else 0,
+            pending_disprove=pending[1] if pending is not None and pending[0] == player.player_id else None,
+        )
+
+    ################################
+    #          EVENT LOG           #
+    ################################
+
+    def record(self, action: BaseMessage):
+        if self.event_log is not None:
+            self.event_log.inbound(action)
+
+    def record_sent(self, players: list[ServerPlayer], data: BaseMessage):
+        if self.event_log is not None:
+            recipients = ((1 << len(self.players)) - 1 if players is self.players
+                          else sum(1 << self.seats[p.player_id] for p in players))
+            self.event_log.outbound(data, recipients)
+
+    def close_event_log(self):
+        if self.event_log is not None:
+            self.event_log.close()
@@ -0,0 +1,235 @@
+import random
+
+from PodSixNet.Channel import Channel
+
+from clueless.messages.messages import StartGame, UpdatePlayers, AssignPlayerID, BaseMessage, BaseClientAction, \
+    Move, Suggest, Disprove, EndTurn, Accuse, ResumeGame, ResumeState, Rejected
+from clueless.model.board_enums import Character
+from clueless.model.player import PlayerID
+
+from event_log import EventLogWriter, new_seed
+from game_manager import GameManager
+from metrics import BroadcastMetrics
+from server_player import ServerPlayer, send_to_channels
+
+
+class GameSession:
+    # One lobby and, once every player is ready, the game played by that lobby.
+    MAX_PLAYERS = len(Character)
+
+    def __init__(self, game_id: int, metrics: BroadcastMetrics, server_resolved_disprove=False,
+                 event_log: EventLogWriter = None):
+        self.game_id = game_id
+        self.server_resolved_disprove = server_resolved_disprove
+        self.event_log = event_log
+        self.player_queue: dict[Channel, ServerPlayer] = {}  # connected players
+        self.sessions: dict[str, ServerPlayer] = {}  # session token -> player, for every seat, connected or not
+        self.game_manager: GameManager | None = None
+        self.metrics = metrics
+
+    @property
+    def is_open(self):
+        return self.game_manager is None and len(self.player_queue) < self.MAX_PLAYERS
+
+    ################################
+    #       LOBBY MANAGEMENT       #
+    ################################
+
+    def add_player(self, channel, nickname):
+        print(f"New Player {channel.addr} in game {self.game_id}")
+        minted_id = PlayerID(character=list(Character)[len(self.player_queue)], nickname=nickname)
+        player = ServerPlayer(minted_id, channel=channel)
+        self.player_queue[channel] = player
+        self.sessions[player.session_token] = player
+        self.SendToChannel(channel, AssignPlayerID(player_id=minted_id, game_id=self.game_id,
+                                                   session_token=player.session_token))
+        self.send_players()
+        print("players in queue", [p for p in self.player_queue])
+
+    def del_player(self, channel):
+        player = self.player_queue.pop(channel)
+        if self.game_manager is not None:
+            # the seat is kept for the player to resume, the game goes on without sending them anything
+            print(f"Player {channel.addr} disconnected from game {self.game_id}")
+            player.channel = None
+            return
+        print(f"Deleting Player {channel.addr} from game {self.game_id}")
+        del self.sessions[player.session_token]
+        self.send_players()
+
+    def resume(self, channel, session_token: str) -> bool:
+        # Gives a returning player their seat on a new channel and sends them the whole state in one message
+        player = self.sessions.get(session_token)
+        if player is None:
+            return False
+        print(f"Player {channel.addr} resumed {player.player_id} in game {self.game_id}")
+        if player.channel is not None:
+            # the old connection is still open, or its close has not been noticed yet
+            self.player_queue.pop(player.channel, None)
+        player.channel = channel
+        self.player_queue[channel] = player
+        if self.game_manager is None:
+            players = [(p.player_id, p.ready) for p in self.player_queue.values()]
+            self.SendToChannel(channel, ResumeState(player.player_id, self.game_id, players))
+        else:
+            players = [(p.player_id, p.ready) for p in self.game_manager.players]
+            self.SendToChannel(channel, self.game_manager.snapshot(player, self.game_id, players))
+        return True
+
+    def send_players(self):
+        self.SendToAll(UpdatePlayers(players=[(player.player_id, player.ready) for player in self.player_queue.values()]))
+
+    def set_ready_for_player(self, channel):
+        (self.player_queue[channel]).ready = True
+        print("READY")
+        self.send_players()
+        if all(player.ready for player in self.player_queue.values()):
+            self.start_game()
+
+    ################################
+    #      GAME MANAGEMENT       #
+    ################################
+
+    def start_game(self):
+        # the seed of the deal is logged, so the game can be replayed
+        seed = new_seed()
+        game_log = self.event_log.open(self.game_id) if self.event_log is not None else None
+        self.game_manager = GameManager(players=self.player_queue.values(), metrics=self.metrics,
+                                        server_resolved_disprove=self.server_resolved_disprove,
+                                        rng=random.Random(seed), event_log=game_log)
+        if game_log is not None:
+            game_log.start(seed, [player.player_id for player in self.game_manager.players],
+                           self.server_resolved_disprove)
+        self.game_manager.SendToAll(StartGame(board=self.game_manager.board))
+        self.game_manager.start_game()
+
+    def close(self):
+        if self.game_manager is not None:
+            self.game_manager.close_event_log()
+
+    def acting_player(self, channel, action: BaseClientAction) -> ServerPlayer | None:
+        # Players may only act for themselves, and only once the game has started; the rules check the rest
+        player = self.player_queue.get(channel)
+        if player is None or self.game_manager is None or player.player_id != action.player_id:
+            print(f"Rejected {action.name} from {channel.addr}: not this player's action in a game in progress")
+            self.SendToChannel(channel, Rejected(action.name, action.uuid, "not your action in a game in progress"))
+            return None
+        return player
+
+    def move(self, channel, move_action: Move):
+        player_to_move = self.acting_player(channel, move_action)
+        if player_to_move is not None:
+            self.game_manager.move(player_to_move, move_action)
+
+    def suggest(self, channel, suggest_action: Suggest):
+        if self.acting_player(channel, suggest_action) is not None:
+            self.game_manager.suggest(suggest_action)
+
+    def accuse(self, channel, accuse_action: Accuse):
+        player_accusing = self.acting_player(channel, accuse_action)
+        if player_accusing is not None:
+            self.game_manager.accuse(player_accusing, accuse_action)
+
+    def disprove(self, channel, disprove_action: Disprove):
+        if self.acting_player(channel, disprove_action) is not None:
+            self.game_manager.disprove(disprove_action)
+
+    def end_turn(self, channel, end_turn_action: EndTurn):
+        if self.acting_player(channel, end_turn_action) is not None:
+            self.game_manager.end_turn(end_turn_action)
+
+    ################################
+    #       NETWORKING HELPERS     #
+    ################################
+
+    def SendToPlayer(self, player_id, data: BaseMessage):
+        self.SendToChannels([channel for channel, p in self.player_queue.items() if player_id == p.player_id], data)
+
+    def SendToChannel(self, channel: Channel, data: BaseMessage):
+        self.SendToChannels([channel], data)
+
+    def SendToAll(self, data: BaseMessage):
+        self.SendToChannels(list(self.player_queue), data)
+
+    def SendToChannels(self, channels: list[Channel], data: BaseMessage):
+        send_to_channels(channels, data, self.metrics)
+
+
+class GameRegistry:
+    # Hosts any number of independent games in one server process.
+    # Each channel is tagged with the id of the game it joined, so routing a message is one dict lookup.
+    # Sharded servers give each registry its own id sequence (first_game_id, first_game_id + game_id_step, ...)
+    # so a game id also identifies the process hosting it.
+    def __init__(self, metrics: BroadcastMetrics = None, first_game_id: int = 0, game_id_step: int = 1,
+                 server_resolved_disprove=False, event_log: EventLogWriter = None):
+        self.games: dict[int, GameSession] = {}
+        # lobbies that may still have a free seat, oldest first (a dict is used as an ordered set)
+        self.open_game_ids: dict[int, None] = {}
+        self.metrics = metrics or BroadcastMetrics()
+        self._next_game_id = first_game_id
+        self._game_id_step = game_id_step
+        self.server_resolved_disprove = server_resolved_disprove
+        self.event_log = event_log  # writes a log of every game, if set
+
+    def join(self, channel, nickname: str, game_id: int | None = None) -> GameSession:
+        # Joins the requested game, or the oldest lobby with a free seat if no game id is given
+        if game_id is not None and game_id in self.games and self.games[game_id].is_open:
+            game = self.games[game_id]
+        else:
+            if game_id is not None:
+                print(f"Game {game_id} is not open, joining another lobby")
+            game = self.__open_game()
+        channel.game_id = game.game_id
+        game.add_player(channel, nickname=nickname)
+        return game
+
+    def resume(self, channel, game_id: int, session_token: str, nickname: str, request_uuid: str) -> GameSession:
+        # Puts a returning player back in their seat, or in a new lobby if their game or seat is gone. In that case
+        # the ResumeGame is rejected first, so the client leaves its game before the lobby's messages arrive.
+        game = self.games.get(game_id)
+        if game is not None and game.resume(channel, session_token):
+            channel.game_id = game.game_id
+            return game
+        print(f"No seat to resume in game {game_id}, joining a lobby")
+        rejected = Rejected(ResumeGame.name, request_uuid, f"there is no seat to resume in game {game_id}")
+        send_to_channels([channel], rejected, self.metrics)
+        return self.join(channel, nickname=nickname)
+
+    def game_for(self, channel) -> GameSession | None:
+        return self.games.get(getattr(channel, "game_id", None))
+
+    def leave(self, channel):
+        game = self.game_for(channel)
+        if game is None or channel not in game.player_queue:
+            return
+        game.del_player(channel)
+        if not game.player_queue:
+            game.close()
+            del self.games[game.game_id]
+            self.open_game_ids.pop(game.game_id, None)
+        elif game.is_open:
+            self.open_game_ids[game.game_id] = None
+
+    def stats(self) -> dict[str, int]:
+        in_progress = sum(1 for game in self.games.values() if game.game_manager is not None)
+        return {
+            "games": len(self.games),
+            "lobbies": len(self.games) - in_progress,
+            "in_progress": in_progress,
+            "players": sum(len(game.player_queue) for game in self.games.values()),
+            # players in lobbies a new player could still join
+            "waiting": sum(len(game.player_queue) for game in self.games.values() if game.is_open),
+        }
+
+    def __open_game(self) -> GameSession:
+        # lobbies fill up or start without telling the registry, so closed ones are dropped lazily here
+        for game_id in list(self.open_game_ids):
+            if self.games[game_id].is_open:
+                return self.games[game_id]
+            del self.open_game_ids[game_id]
+        game = GameSession(self._next_game_id, self.metrics, server_resolved_disprove=self.server_resolved_disprove,
+                           event_log=self.event_log)
+        self._next_game_id += self._game_id_step
+        self.games[game.game_id] = game
+        self.open_game_ids[game.game_id] = None
+        return game
@@ -0,0 +1,44 @@
+from clueless.messages.messages import BaseMessage
+from clueless.messages.registry import dispatch_table
+
+from game_registry import GameRegistry
+from metrics import BroadcastMetrics
+from routing import ChannelHandlers, GameRouter
+
+# In-process transport: clients connect with a LoopbackConnection (clueless.client.connection) and both sides
+# hand each other message objects directly, with no socket and no serialization. Games run exactly as they do
+# behind ClueServer, so tests and simulations can drive the real server and client code from one process.
+
+
+class LoopbackChannel(ChannelHandlers):
+    # In-process counterpart of server.ClientChannel
+
+    def __init__(self, connection, server: "LoopbackServer", addr):
+        self._connection = connection
+        self._server = server
+        self.addr = addr
+        self.handlers = dispatch_table(type(self))
+
+    def SendMessage(self, message: BaseMessage):
+        # recipients of a broadcast share the same message object, like they share the encoded bytes over sockets
+        self._connection.deliver(message)
+
+    def Close(self):
+        self._server.del_player(self)
+
+    def __repr__(self):
+        return f"LoopbackChannel({self.addr})"
+
+
+class LoopbackServer(GameRouter):
+
+    def __init__(self, server_resolved_disprove=False):
+        self.metrics = BroadcastMetrics()
+        self.registry = GameRegistry(metrics=self.metrics, server_resolved_disprove=server_resolved_disprove)
+        self._connections = 0
+
+    def accept(self, connection) -> LoopbackChannel:
+        self._connections += 1
+        channel = LoopbackChannel(connection, self, ("loopback", self._connections))
+        print("New Client Connected " + str(channel.addr))
+        return channel
@@ -0,0 +1,26 @@
+class BroadcastMetrics:
+    # Counts how many times outgoing messages are serialized compared to how many channels they are delivered to.
+    # With encode-once fan-out every send is serialized once per wire format, no matter how many players receive it.
+    def __init__(self):
+        self.sends = 0
+        self.serializations = 0
+        self.deliveries = 0
+
+    def record(self, recipients: int, serializations=1):
+        # one serialization per wire format among the recipients, none if they are all in-process channels
+        self.sends += 1
+        self.serializations += serializations
+        self.deliveries += recipients
+
+    @property
+    def serializations_per_send(self) -> float:
+        return self.serializations / self.sends if self.sends else 0.0
+
+    @property
+    def serializations_saved(self) -> int:
+        # serializations a per-recipient fan-out would have done on top of ours
+        return self.deliveries - self.serializations
+
+    def __repr__(self):
+        return (f"BroadcastMetrics(sends={self.sends}, serializations={self.serializations}, "
+                f"deliveries={self.deliveries}, saved={self.serializations_saved})")
@@ -0,0 +1,94 @@
+from clueless.messages.messages import BaseMessage, JoinGame, ResumeGame, Move, Suggest, Disprove, EndTurn, Accuse, Ready
+from clueless.messages.registry import MESSAGES, handles
+
+from game_registry import GameRegistry
+
+
+class ChannelHandlers:
+    # Server side handling of client messages, shared by the PodSixNet and asyncio channels.
+    # Subclasses provide self._server (a GameRouter) and self.handlers = dispatch_table(type(self)).
+
+    # From PodSixNet:
+    # Whenever the client does connection.Send(mydata), the Network() method will be called.
+    # We dispatch every message through one precomputed action name -> handler table instead of
+    # PodSixNet's per-action Network_myaction() methods.
+    def Network(self, data):
+        if data['action'] not in self.handlers:
+            print(f"No handler for {data['action']} from client channel {self}")
+            return
+        self.Receive(MESSAGES.for_name(data['action']).deserialize(data))
+
+    def Receive(self, message: BaseMessage):
+        # Handles a message object, decoded by Network() or handed over as is by the loopback transport
+        handler = self.handlers.get(message.name)
+        if handler is None:
+            print(f"No handler for {message.name} from client channel {self}")
+            return
+        print(f"Received {message.name} from client channel {self}")
+        handler(self, message)
+
+    @handles(JoinGame)
+    def handle_join_game(self, join_game: JoinGame):
+        self._server.add_player(self, nickname=join_game.nickname, game_id=join_game.game_id)
+
+    @handles(ResumeGame)
+    def handle_resume_game(self, resume_game: ResumeGame):
+        self._server.resume_player(self, resume_game.game_id, resume_game.session_token, resume_game.nickname,
+                                   resume_game.uuid)
+
+    @handles(Ready)
+    def handle_ready(self, ready: Ready):
+        self._server.set_ready_for_player(self)
+
+    @handles(Move)
+    def handle_move(self, move_action: Move):
+        self._server.move(self, move_action)
+
+    @handles(Suggest)
+    def handle_suggest(self, suggest_action: Suggest):
+        self._server.suggest(self, suggest_action)
+
+    @handles(Accuse)
+    def handle_accuse(self, accuse_action: Accuse):
+        self._server.accuse(self, accuse_action)
+
+    @handles(Disprove)
+    def handle_disprove(self, disprove_action: Disprove):
+        self._server.disprove(self, disprove_action)
+
+    @handles(EndTurn)
+    def handle_end_turn(self, end_turn_action: EndTurn):
+        self._server.end_turn(self, end_turn_action)
+
+
+class GameRouter:
+    # Every channel belongs to one game in the registry, messages are forwarded to that game.
+    # Subclasses provide self.registry.
+    registry: GameRegistry
+
+    def add_player(self, channel, nickname, game_id: int | None = None):
+        self.registry.join(channel, nickname=nickname, game_id=game_id)
+
+    def resume_player(self, channel, game_id: int, session_token: str, nickname: str, request_uuid: str):
+        self.registry.resume(channel, game_id, session_token, nickname, request_uuid)
+
+    def del_player(self, channel):
+        self.registry.leave(channel)
+
+    def set_ready_for_player(self, channel):
+        self.registry.game_for(channel).set_ready_for_player(channel)
+
+    def move(self, channel, move_action: Move):
+        self.registry.game_for(channel).move(channel, move_action)
+
+    def suggest(self, channel, suggest_action: Suggest):
+        self.registry.game_for(channel).suggest(channel, suggest_action)
+
+    def accuse(self, channel, accuse_action: Accuse):
+        self.registry.game_for(channel).accuse(channel, accuse_action)
+
+    def disprove(self, channel, disprove_action: Disprove):
+        self.registry.game_for(channel).disprove(channel, disprove_action)
+
+    def end_turn(self, channel, end_turn_action: EndTurn):
+        self.registry.game_for(channel).end_turn(channel, end_turn_action)
@@ -1,77 +1,41 @@
+import argparse
+
 from PodSixNet.Channel import Channel
 from PodSixNet.Server import Server
 import time
 
-from clueless.messages.messages import JoinGame, StartGame, UpdatePlayers, AssignPlayerID, BaseClientAction, BaseMessage, Move, \
-    Suggest, Disprove, EndTurn, Accuse
-from clueless.model.board_enums import Character
-from clueless.model.player import PlayerID
+from clueless.messages.registry import dispatch_table
 
-from game_manager import GameManager
-from server_player import ServerPlayer
+from event_log import EventLogWriter
+from game_registry import GameRegistry
+from metrics import BroadcastMetrics
+from routing import ChannelHandlers, GameRouter
 
 
-class ClientChannel(Channel):
+class ClientChannel(ChannelHandlers, Channel):
 
     def __init__(self, conn=None, addr=(), server=None, map=None):
         super().__init__(conn, addr, server, map)
-
-    def Network(self, data):
-        print(data)
+        self.handlers = dispatch_table(type(self))
 
     def Close(self):
         self._server.del_player(self)
 
-    # From PodSixNet:
-    # Whenever the client does connection.Send(mydata), the Network() method will be called.
-    # The method Network_myaction() will only be called if your data has a key called ‘action’
-    # with a value of “myaction”. In other words if it looks something like this:
-    #
-    # data = {"action": "myaction", "blah": 123, ...}
-
-    def Network_join_game(self, data):
-        nickname = JoinGame.deserialize(data).nickname
-        print(f"Received join_game with nickname {nickname} from client channel {self}")
-        self._server.add_player(self, nickname=nickname)
-
-    def Network_ready(self, data):
-        print(f"Received ready from client channel {self}")
-        self._server.set_ready_for_player(self)
-
-    def Network_ClientAction_move(self, data):
-        move_action = Move.deserialize(data)
-        print(f"Received ClientAction_move from client channel {self}")
-        self._server.move(self, move_action)
-
-    def Network_ClientAction_suggest(self, data):
-        suggest_action = Suggest.deserialize(data)
-        print(f"Received ClientAction_suggest from client channel {self}")
-        self._server.suggest(self, suggest_action)
-
-    def Network_ClientAction_accuse(self, data):
-        accuse_action = Accuse.deserialize(data)
-        print(f"Received ClientAction_accuse from client channel {self}")
-        self._server.accuse(self, accuse_action)
-
-    def Network_ClientAction_disprove(self, data):
-        disprove_action = Disprove.deserialize(data)
-        print(f"Received ClientAction_disprove from client channel {self}")
-        self._server.disprove(self, disprove_action)
-
-    def Network_ClientAction_end_turn(self, data):
-        end_turn_action = EndTurn.deserialize(data)
-        print(f"Received ClientAction_end_turn from client channel {self}")
-        self._server.end_turn(end_turn_action)
-
-
-class ClueServer(Server):
+    def SendEncoded(self, outgoing: bytes):
+        # Queues bytes already produced by encode_message, skipping the per-channel rencode in Send()
+        self.sendqueue.append(outgoing)
+        return len(outgoing)
+
+
+class ClueServer(GameRouter, Server):
     channelClass = ClientChannel
 
-    def __init__(self):
+    def __init__(self, host="127.0.0.1", port=10000, server_resolved_disprove=False, event_log_dir=None):
         # Server.__init__(self, localaddr=("192.168.50.119", 10000), listeners=6)
-        Server.__init__(self, localaddr=("127.0.0.1", 10000), listeners=6)
-        self.player_queue: dict[ClientChannel, ServerPlayer] = {}
-        self.game_manager: GameManager = None
+        Server.__init__(self, localaddr=(host, port), listeners=128)
+        self.metrics = BroadcastMetrics()
+        self.registry = GameRegistry(metrics=self.metrics, server_resolved_disprove=server_resolved_disprove,
+                                     event_log=EventLogWriter(event_log_dir) if event_log_dir else None)
         print('Server launched')
         print(f'Socket: {self.socket}')
 
@@ -80,75 +44,10 @@ class ClueServer(Server):
     def Connected(self, channel, addr):
         print("New Client Connected " + str(channel.addr))
 
-    ################################
-    #       LOBBY MANAGEMENT       #
-    ################################
-
-    def add_player(self, channel, nickname):
-        print("New Player" + str(channel.addr))
-        minted_id = PlayerID(character=list(Character)[len(self.player_queue)], nickname=nickname)
-        self.player_queue[channel] = ServerPlayer(minted_id, channel=channel)
-        self.SendToChannel(channel, AssignPlayerID(player_id=minted_id))
-        self.send_players()
-        print("players in queue", [p for p in self.player_queue])
-
     def del_player(self, channel):
-        print("Deleting Player" + str(channel.addr))
-        del self.player_queue[channel]
-        self.send_players()
-
-    def send_players(self):
-        self.SendToAll(UpdatePlayers(players=[(player.player_id, player.ready) for player in self.player_queue.values()]))
-
-    def set_ready_for_player(self, channel):
-        (self.player_queue[channel]).ready = True
-        print("READY")
-        self.send_players()
-        if all(player.ready for player in self.player_queue.values()):
-            self.start_game()
-
-    ################################
-    #      GAME MANAGEMENT       #
-    ################################
-
-    def start_game(self):
-        self.game_manager = GameManager(players=self.player_queue.values())
-        self.SendToAll(StartGame(board=self.game_manager.board))
-        self.game_manager.start_game()
-
-    def move(self, channel, move_action: Move):
-        player_to_move = self.player_queue[channel]
-        self.game_manager.move(player_to_move, move_action)
-
-    def suggest(self, channel, suggest_action: Suggest):
-        self.game_manager.suggest(suggest_action)
-        # TODO: list out rules of when suggest can be called
-
-    def accuse(self, channel, accuse_action: Accuse):
-        player_accusing = self.player_queue[channel]
-        self.game_manager.accuse(player_accusing, accuse_action)
-
-    def disprove(self, channel, disprove_action: Disprove):
-        self.game_manager.disprove(disprove_action)
-
-    def end_turn(self, end_turn_action: EndTurn):
-        self.game_manager.end_turn(end_turn_action)
-
-    ################################
-    #       NETWORKING HELPERS     #
-    ################################
-
-    def SendToPlayer(self, player_id, data: BaseMessage):
-        for channel, p in self.player_queue.items():
-            if player_id == p.player_id:
-                channel.Send(data.serialize())
-
-    def SendToChannel(self, channel: Channel, data: BaseMessage):
-        channel.Send(data.serialize())
-
-    def SendToAll(self, data: BaseMessage):
-        serialized = data.serialize()
-        [p.Send(serialized) for p in self.player_queue]
+        super().del_player(channel)
+        if channel in self.channels:
+            self.channels.remove(channel)  # PodSixNet never drops closed channels on its own
 
     def Launch(self):
         while True:
@@ -157,5 +56,36 @@ class ClueServer(Server):
 
 
 if __name__ == '__main__':
-    print('Hi PyCharm!')
-    ClueServer().Launch()
+    parser = argparse.ArgumentParser(description="Clueless game server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=10000)
+    parser.add_argument("--runtime", choices=["asyncio", "podsixnet", "sharded", "framed"], default="asyncio",
+                        help="asyncio sleeps until a socket is ready, podsixnet is the original polling loop, "
+                             "sharded spreads games over one asyncio worker process per core (Linux only), "
+                             "framed is the asyncio runtime speaking length-prefixed binary frames "
+                             "(clients connect with FramedConnection)")
+    parser.add_argument("--workers", type=int, default=None, help="sharded runtime: worker processes (default: cores)")
+    parser.add_argument("--stats-interval", type=float, default=None,
+                        help="sharded runtime: print worker stats every N seconds")
+    parser.add_argument("--server-resolved-disprove", action="store_true",
+                        help="only ask the first player who can disprove a suggestion, using the dealt hands")
+    parser.add_argument("--event-log-dir", default=None,
+                        help="append a replayable log of every game to game-<id>.log in this directory")
+    args = parser.parse_args()
+    if args.runtime == "podsixnet":
+        ClueServer(host=args.host, port=args.port, server_resolved_disprove=args.server_resolved_disprove,
+                   event_log_dir=args.event_log_dir).Launch()
+    elif args.runtime == "sharded":
+        from sharded_server import ShardedClueServer
+        ShardedClueServer(host=args.host, port=args.port, workers=args.workers,
+                          server_resolved_disprove=args.server_resolved_disprove,
+                          event_log_dir=args.event_log_dir).Launch(
+            stats_interval=args.stats_interval)
+    elif args.runtime == "framed":
+        from framed_server import FramedClueServer
+        FramedClueServer(host=args.host, port=args.port, server_resolved_disprove=args.server_resolved_disprove,
+                         event_log_dir=args.event_log_dir).Launch()
+    else:
+        from async_server import AsyncClueServer
+        AsyncClueServer(host=args.host, port=args.port, server_resolved_disprove=args.server_resolved_disprove,
+                        event_log_dir=args.event_log_dir).Launch()
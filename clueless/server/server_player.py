@@ -1,20 +1,61 @@
+import secrets
+
 from PodSixNet.Channel import Channel
+from PodSixNet.rencode import dumps
 
 from clueless.messages.messages import BaseMessage
 from clueless.model.player import PlayerID, PlayerIDWrapper
 
+from metrics import BroadcastMetrics
+
+
+def encode_message(message: BaseMessage) -> bytes:
+    # Encodes a message into the bytes PodSixNet puts on the wire, so one encoding can be queued on many channels.
+    return dumps(message.serialize()) + Channel.endchars.encode()
+
+
+def send_to_channels(channels: list, message: BaseMessage, metrics: BroadcastMetrics):
+    # Encodes the message once per wire format and queues the same bytes on every channel using it: a channel's
+    # encode_frame (PodSixNet's format when it has none). Channels with a SendMessage method (the loopback transport)
+    # take the message object itself, and the message is not encoded at all if only they receive it.
+    if not channels:
+        return
+    encoded = {}
+    for channel in channels:
+        if hasattr(channel, "SendMessage"):
+            channel.SendMessage(message)
+            continue
+        encode = getattr(channel, "encode_frame", encode_message)
+        outgoing = encoded.get(encode)
+        if outgoing is None:
+            outgoing = encoded[encode] = encode(message)
+        channel.SendEncoded(outgoing)
+    metrics.record(recipients=len(channels), serializations=len(encoded))
+
 
 class ServerPlayer(PlayerIDWrapper):
     def __init__(self, player_id: PlayerID, channel: Channel):
         PlayerIDWrapper.__init__(self, player_id)
-        self._active = True  # deactivate for false accusation
         self._ready = False
         self._channel = channel
         self._cards = []
+        self.session_token = secrets.token_urlsafe(16)
+
+    @property
+    def channel(self):
+        return self._channel
+
+    @channel.setter
+    def channel(self, channel):
+        # None while the player is disconnected from a game in progress
+        self._channel = channel
 
     def Send(self, message: BaseMessage):
         self._channel.Send(message.serialize())
 
+    def SendEncoded(self, outgoing: bytes):
+        self._channel.SendEncoded(outgoing)
+
     @property
     def ready(self):
         return self._ready
@@ -23,14 +64,6 @@ class ServerPlayer(PlayerIDWrapper):
     def ready(self, ready):
         self._ready = ready
 
-    @property
-    def active(self):
-        return self._active
-
-    @active.setter
-    def active(self, active):
-        self._active = active
-
     @property
     def cards(self):
         return self._cards
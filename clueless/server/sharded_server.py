@@ -0,0 +1,259 @@
+import asyncio
+import multiprocessing
+import os
+import pickle
+import socket
+
+from PodSixNet.rencode import loads
+
+from clueless.messages.messages import JoinGame, ResumeGame
+from clueless.messages.registry import MESSAGES
+
+from async_server import AsyncClientChannel, TERMINATOR
+from event_log import EventLogWriter
+from game_registry import GameRegistry
+from metrics import BroadcastMetrics
+from routing import GameRouter
+
+# Linux only: connections are handed to workers by passing their file descriptor over a unix socket.
+#
+#                    ┌──> worker 0: GameRegistry(game ids 0, n, 2n, ...)
+#   front acceptor ──┼──> worker 1: GameRegistry(game ids 1, n+1, ...)
+#                    └──> ...
+#
+# The front reads a connection's first message (JoinGame) and picks the worker: the one hosting the requested
+# game id, otherwise the worker currently filling a lobby, otherwise the least loaded one. The worker then owns
+# the socket for the rest of the connection, and the front never sees game traffic.
+# A lobby starts once everyone in it is ready, however many that is, so the front cannot count seats to know when
+# a lobby is done. It keeps sending anonymous joins to the filling worker until that worker reports no open lobby
+# and every join sent to it handled; only then can the next lobby go elsewhere without being split.
+# Workers push their stats to the front every STATS_INTERVAL seconds, and right away when a lobby changes.
+
+STATS_INTERVAL = 1.0
+CONTROL_BUFFER = 1 << 16
+FIRST_MESSAGE_LIMIT = CONTROL_BUFFER - 1024  # what the front buffers before hand-off, leaving room for the pickle
+FIRST_MESSAGE_TIMEOUT = 10.0
+
+
+class ShardWorker(GameRouter):
+    # Runs in its own process, hosting a share of the games on its own event loop
+
+    def __init__(self, index: int, count: int, control: socket.socket, server_resolved_disprove=False,
+                 event_log_dir=None):
+        self.index = index
+        self.control = control
+        self.metrics = BroadcastMetrics()
+        self.anonymous_joins = 0  # JoinGames without a game id, the front counts the ones it sent here
+        # game ids are unique across workers, so every worker's writer can share the directory
+        self.registry = GameRegistry(metrics=self.metrics, first_game_id=index, game_id_step=count,
+                                     server_resolved_disprove=server_resolved_disprove,
+                                     event_log=EventLogWriter(event_log_dir) if event_log_dir else None)
+
+    def stats(self) -> dict:
+        return dict(self.registry.stats(), worker=self.index, pid=os.getpid(), sends=self.metrics.sends,
+                    deliveries=self.metrics.deliveries, anonymous_joins=self.anonymous_joins)
+
+    def add_player(self, channel, nickname, game_id: int | None = None):
+        if game_id is None:
+            self.anonymous_joins += 1
+        super().add_player(channel, nickname, game_id)
+        self.__send_stats()
+
+    def set_ready_for_player(self, channel):
+        super().set_ready_for_player(channel)
+        self.__send_stats()
+
+    def del_player(self, channel):
+        super().del_player(channel)
+        self.__send_stats()
+
+    async def serve(self):
+        loop = asyncio.get_running_loop()
+        stopped = loop.create_future()
+        loop.add_reader(self.control.fileno(), self.__receive_connection, stopped)
+        self.__report_stats()
+        await stopped
+
+    def __receive_connection(self, stopped: asyncio.Future):
+        payload, fds, _, _ = socket.recv_fds(self.control, CONTROL_BUFFER, 1)
+        if not payload:
+            # front acceptor is gone
+            stopped.set_result(None)
+            return
+        initial = pickle.loads(payload)
+        asyncio.ensure_future(self.__adopt(fds[0], initial))
+
+    async def __adopt(self, fd: int, initial: bytes):
+        # Bytes the front already read are fed to the reader before the transport starts reading the socket
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        reader.feed_data(initial)
+        protocol = asyncio.StreamReaderProtocol(reader)
+        transport, _ = await loop.create_connection(lambda: protocol, sock=socket.socket(fileno=fd))
+        writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+        channel = AsyncClientChannel(reader, writer, self)
+        print(f"Worker {self.index} adopted client {channel.addr}")
+        await channel.serve()
+
+    def __report_stats(self):
+        self.__send_stats()
+        asyncio.get_running_loop().call_later(STATS_INTERVAL, self.__report_stats)
+
+    def __send_stats(self):
+        try:
+            self.control.send(pickle.dumps(self.stats()))
+        except BlockingIOError:
+            pass  # front is behind on reading stats, the next report replaces this one anyway
+
+    @staticmethod
+    def run(index: int, count: int, control: socket.socket, server_resolved_disprove: bool, event_log_dir,
+            front_ends: list[socket.socket] = ()):
+        for front_end in front_ends:
+            front_end.close()
+        control.setblocking(False)
+        asyncio.run(ShardWorker(index, count, control, server_resolved_disprove, event_log_dir).serve())
+
+
+class WorkerHandle:
+    # The front acceptor's view of one worker process
+    def __init__(self, index: int, process: multiprocessing.Process, control: socket.socket):
+        self.index = index
+        self.process = process
+        self.control = control
+        self.reported: dict = {}
+        self.placed_since_report = 0
+        self.anonymous_joins = 0  # sent to this worker so far
+
+    @property
+    def load(self) -> int:
+        return self.reported.get("players", 0) + self.placed_since_report
+
+    @property
+    def between_lobbies(self) -> bool:
+        # no open lobby on the worker, and no join on its way that could open one
+        return self.reported.get("waiting", 0) == 0 and self.reported.get("anonymous_joins", 0) == self.anonymous_joins
+
+
+class ShardedClueServer:
+    def __init__(self, host="127.0.0.1", port=10000, workers: int | None = None, server_resolved_disprove=False,
+                 event_log_dir=None):
+        self.host = host
+        self.port = port
+        self.server_resolved_disprove = server_resolved_disprove
+        self.event_log_dir = event_log_dir
+        self.worker_count = workers or os.cpu_count()
+        self.workers: list[WorkerHandle] = []
+        # anonymous joins go to the same worker until the lobby it is filling is done
+        self.filling_worker: WorkerHandle | None = None
+
+    def stats(self) -> dict[int, dict]:
+        return {worker.index: worker.reported for worker in self.workers}
+
+    def start_workers(self):
+        context = multiprocessing.get_context("fork")
+        for index in range(self.worker_count):
+            front_end, worker_end = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+            # the fork copies the front's ends of every control socket made so far; the worker closes them, or it
+            # would never see its own control socket close when the front exits
+            front_ends = [worker.control for worker in self.workers] + [front_end]
+            process = context.Process(target=ShardWorker.run, daemon=True,
+                                      args=(index, self.worker_count, worker_end, self.server_resolved_disprove,
+                                            self.event_log_dir, front_ends))
+            process.start()
+            worker_end.close()
+            self.workers.append(WorkerHandle(index, process, front_end))
+
+    async def serve(self):
+        loop = asyncio.get_running_loop()
+        for worker in self.workers:
+            loop.add_reader(worker.control.fileno(), self.__receive_stats, worker)
+        listener = socket.create_server((self.host, self.port), backlog=1024)
+        listener.setblocking(False)
+        print(f'Sharded server launched with {self.worker_count} workers')
+        print(f'Socket: {listener}')
+        while True:
+            client, addr = await loop.sock_accept(listener)
+            asyncio.ensure_future(self.__hand_off(client, addr))
+
+    async def __hand_off(self, client: socket.socket, addr):
+        loop = asyncio.get_running_loop()
+        try:
+            buffered = await asyncio.wait_for(self.__read_first_message(client), FIRST_MESSAGE_TIMEOUT)
+            if buffered is None:
+                client.close()
+                return
+            worker = self.__place(buffered[:buffered.index(TERMINATOR)])
+            # send_fds blocks when the worker is behind on reading its control socket
+            await loop.run_in_executor(None, socket.send_fds, worker.control, [pickle.dumps(buffered)],
+                                       [client.fileno()])
+        except asyncio.TimeoutError:
+            print(f"Client {addr} sent no first message within {FIRST_MESSAGE_TIMEOUT}s, closing")
+            client.close()
+            return
+        except OSError as e:
+            print(f"Could not hand off client {addr}: {e}")
+            client.close()
+            return
+        client.close()  # the worker holds its own copy of the descriptor now
+        print(f"Handed client {addr} to worker {worker.index}")
+
+    @staticmethod
+    async def __read_first_message(client: socket.socket) -> bytes | None:
+        # Returns None when the client disconnects or its first message does not fit in one hand-off
+        loop = asyncio.get_running_loop()
+        buffered = b""
+        while TERMINATOR not in buffered:
+            if len(buffered) >= FIRST_MESSAGE_LIMIT:
+                print(f"First message over {FIRST_MESSAGE_LIMIT} bytes, closing")
+                return None
+            chunk = await loop.sock_recv(client, FIRST_MESSAGE_LIMIT - len(buffered))
+            if not chunk:
+                return None
+            buffered += chunk
+        return buffered
+
+    def __place(self, first_frame: bytes) -> WorkerHandle:
+        game_id = None
+        anonymous_join = False
+        try:
+            first_message = loads(first_frame)
+            if type(first_message) is dict and first_message.get('action') in (JoinGame.name, ResumeGame.name):
+                game_id = MESSAGES.for_name(first_message['action']).deserialize(first_message).game_id
+                anonymous_join = first_message['action'] == JoinGame.name and game_id is None
+        except ValueError:
+            print("Could not read first message, placing client by load")
+        if game_id is not None:
+            worker = self.workers[game_id % self.worker_count]
+        elif not anonymous_join:
+            worker = min(self.workers, key=lambda w: w.load)
+        else:
+            if self.filling_worker is None or self.filling_worker.between_lobbies:
+                self.filling_worker = min(self.workers, key=lambda w: w.load)
+            worker = self.filling_worker
+            worker.anonymous_joins += 1
+        worker.placed_since_report += 1
+        return worker
+
+    def __receive_stats(self, worker: WorkerHandle):
+        payload = worker.control.recv(CONTROL_BUFFER)
+        if not payload:
+            print(f"Worker {worker.index} exited")
+            asyncio.get_running_loop().remove_reader(worker.control.fileno())
+            return
+        worker.reported = pickle.loads(payload)
+        worker.placed_since_report = 0
+
+    async def __print_stats(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            for index, stats in self.stats().items():
+                print(f"worker {index}: {stats}")
+
+    def Launch(self, stats_interval: float | None = None):
+        self.start_workers()
+
+        async def main():
+            if stats_interval:
+                asyncio.ensure_future(self.__print_stats(stats_interval))
+            await self.serve()
+        asyncio.run(main())
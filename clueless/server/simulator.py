@@ -0,0 +1,184 @@
+import argparse
+import contextlib
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from clueless.messages.messages import BaseMessage, UpdatePlayers, StartGame, Move, Suggest, Disprove, Accuse, \
+    EndTurn, EndGame
+from clueless.model.board_enums import Character
+from clueless.model.bots import Bot, POLICIES
+from clueless.model.player import PlayerID
+
+from event_log import GameEventLog
+from game_manager import GameManager
+from server_player import ServerPlayer
+
+# Plays whole games in-process: the server's GameManager deals and runs turns and disproves, and every seat is a Bot
+# reacting to the same messages a client would receive. Nothing is encoded, messages are handed over as objects.
+# Game n of a run always uses seed (first seed + n), whatever the number of workers, so any game can be replayed
+# on its own with play_game(seed, ...).
+
+
+class HeadlessGameManager(GameManager):
+    # Queues outgoing messages for the simulator instead of encoding them for channels
+    def __init__(self, players, outbox: deque, **kwargs):
+        super().__init__(players, **kwargs)
+        self.outbox = outbox
+
+    def SendToPlayers(self, players: list[ServerPlayer], data: BaseMessage):
+        self.record_sent(players, data)
+        self.outbox.extend((player.player_id, data) for player in players)
+
+
+class GameResult:
+    def __init__(self, seed: int, winner: int | None, turns: int, suggestions: int, accusations: int):
+        self.seed = seed
+        self.winner = winner  # seat index, None if the game was abandoned or everyone accused wrongly
+        self.turns = turns
+        self.suggestions = suggestions
+        self.accusations = accusations
+
+    def __repr__(self):
+        return (f"GameResult(seed={self.seed}, winner={self.winner}, turns={self.turns}, "
+                f"suggestions={self.suggestions}, accusations={self.accusations})")
+
+
+class SimulationStats:
+    # Totals over many games, small enough to send back from a worker process
+    def __init__(self, seats: int):
+        self.games = 0
+        self.wins = [0] * seats
+        self.no_winner = 0
+        self.turns = 0
+        self.suggestions = 0
+        self.accusations = 0
+        self.cpu_seconds = 0.0  # time spent playing, summed over workers
+
+    def add(self, result: GameResult):
+        self.games += 1
+        if result.winner is None:
+            self.no_winner += 1
+        else:
+            self.wins[result.winner] += 1
+        self.turns += result.turns
+        self.suggestions += result.suggestions
+        self.accusations += result.accusations
+
+    def merge(self, other: "SimulationStats"):
+        self.games += other.games
+        self.wins = [a + b for a, b in zip(self.wins, other.wins)]
+        self.no_winner += other.no_winner
+        self.turns += other.turns
+        self.suggestions += other.suggestions
+        self.accusations += other.accusations
+        self.cpu_seconds += other.cpu_seconds
+
+    @property
+    def games_per_core_second(self) -> float:
+        return self.games / self.cpu_seconds if self.cpu_seconds else 0.0
+
+    def __repr__(self):
+        return (f"SimulationStats(games={self.games}, wins={self.wins}, no_winner={self.no_winner}, "
+                f"turns={self.turns}, suggestions={self.suggestions}, accusations={self.accusations})")
+
+
+def play_game(seed: int, policies: list[str], server_resolved_disprove=False, max_turns=1000,
+              event_log: GameEventLog = None) -> GameResult:
+    outbox: deque[(PlayerID, BaseMessage)] = deque()
+    player_ids = [PlayerID(character, f"{policy}-{seat}")
+                  for seat, (character, policy) in enumerate(zip(Character, policies))]
+    players = [ServerPlayer(player_id, channel=None) for player_id in player_ids]
+    game = HeadlessGameManager(players, outbox, server_resolved_disprove=server_resolved_disprove,
+                               rng=random.Random(seed), event_log=event_log)
+    if event_log is not None:
+        event_log.start(seed, [player.player_id for player in game.players], server_resolved_disprove)
+    bots = {player_id: Bot(player_id, POLICIES[policy](), random.Random(f"{seed}:{seat}"))
+            for seat, (player_id, policy) in enumerate(zip(player_ids, policies))}
+    server_players = {player.player_id: player for player in players}
+    suggestions = accusations = 0
+
+    # same opening as GameSession once the lobby is ready
+    game.SendToAll(UpdatePlayers(players=[(player_id, True) for player_id in player_ids]))
+    game.SendToAll(StartGame(board=game.board))
+    game.start_game()
+
+    try:
+        while outbox:
+            recipient, message = outbox.popleft()
+            if isinstance(message, EndGame):
+                return GameResult(seed, player_ids.index(message.accuse.player_id), game.turn + 1, suggestions,
+                                  accusations)
+            for action in bots[recipient].receive(message):
+                match action:
+                    case Move():
+                        game.move(server_players[action.player_id], action)
+                    case Suggest():
+                        suggestions += 1
+                        game.suggest(action)
+                    case Disprove():
+                        game.disprove(action)
+                    case Accuse():
+                        accusations += 1
+                        game.accuse(server_players[action.player_id], action)
+                    case EndTurn():
+                        if game.turn + 1 >= max_turns or not game.state.active:
+                            return GameResult(seed, None, game.turn + 1, suggestions, accusations)
+                        game.end_turn(action)
+        return GameResult(seed, None, game.turn + 1, suggestions, accusations)
+    finally:
+        # an abandoned game ends without an EndGame, so its log is closed here
+        game.close_event_log()
+
+def play_games(first_seed: int, count: int, policies: list[str], server_resolved_disprove=False,
+               max_turns=1000) -> SimulationStats:
+    stats = SimulationStats(seats=len(policies))
+    start = time.process_time()
+    # GameManager reports every game on stdout
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for seed in range(first_seed, first_seed + count):
+            stats.add(play_game(seed, policies, server_resolved_disprove, max_turns))
+    stats.cpu_seconds = time.process_time() - start
+    return stats
+
+
+def run_simulations(games: int, policies: list[str], first_seed=0, workers: int | None = None, chunk_size=500,
+                    server_resolved_disprove=False, max_turns=1000) -> SimulationStats:
+    total = SimulationStats(seats=len(policies))
+    chunks = [(first_seed + start, min(chunk_size, games - start)) for start in range(0, games, chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(play_games, seed, count, policies, server_resolved_disprove, max_turns)
+                   for seed, count in chunks]
+        for future in futures:
+            total.merge(future.result())
+    return total
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Play Clueless games between bots without a server or client")
+    parser.add_argument("--games", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game, game n uses seed + n")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: cores)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="games per task sent to a worker")
+    parser.add_argument("--policies", default="deduction,deduction,random,random",
+                        help=f"comma separated policy per seat, from: {', '.join(POLICIES)}")
+    parser.add_argument("--max-turns", type=int, default=1000, help="abandon a game after this many turns")
+    parser.add_argument("--server-resolved-disprove", action="store_true")
+    args = parser.parse_args()
+
+    seat_policies = args.policies.split(",")
+    worker_count = args.workers or os.cpu_count()
+    started = time.perf_counter()
+    result = run_simulations(args.games, seat_policies, args.seed, worker_count, args.chunk_size,
+                             args.server_resolved_disprove, args.max_turns)
+    elapsed = time.perf_counter() - started
+
+    print(f"{result.games} games in {elapsed:.1f}s on {worker_count} workers: {result.games / elapsed:,.0f} games/s, "
+          f"{result.games_per_core_second:,.0f} games/s per core")
+    for seat, (policy, wins) in enumerate(zip(seat_policies, result.wins)):
+        print(f"  seat {seat} ({policy}): {wins / result.games:.1%} wins")
+    print(f"  no winner: {result.no_winner / result.games:.1%}")
+    print(f"  per game: {result.turns / result.games:.1f} turns, {result.suggestions / result.games:.1f} suggestions, "
+          f"{result.accusations / result.games:.2f} accusations")
@@ -1,7 +1,320 @@
+import contextlib
+import io
+import queue
+import random
+import tempfile
+import threading
 import unittest
+from pathlib import Path
+
+from PodSixNet.rencode import loads
+
+from clueless.client.connection import LoopbackConnection, NetworkThread
+from clueless.messages.messages import AssignPlayerID, BaseMessage, Suggest, Disprove, RequestDisprove, Accuse, EndGame, \
+    DealCards, Disproved, ResumeGame, ResumeState, Move, EndTurn, Rejected
+from clueless.model.board import Board
+from clueless.model.bots import Bot, DeductionPolicy
+from clueless.model.board_enums import Character, Weapon, Location, Direction
+from clueless.model.card import Card, card_mask, cards_in
+from clueless.model.compact_board import CompactBoard, to_index
+from clueless.model.rules import Phase
+from clueless.model.deduction import DeductionEngine
+from clueless.model.player import PlayerID
+from event_log import EventLogWriter, replay
+from game_manager import GameManager
+from loopback_server import LoopbackServer
+from server_player import ServerPlayer
+from simulator import play_game
+
+
+class RecordingChannel:
+    def __init__(self):
+        self.received: list[BaseMessage] = []
+
+    def SendEncoded(self, outgoing: bytes):
+        self.received.append(BaseMessage.deserialize(loads(outgoing[:-len(b"\0---\0")])))
+
+
+def make_game(player_count: int, **kwargs) -> (GameManager, list[RecordingChannel]):
+    channels = [RecordingChannel() for _ in range(player_count)]
+    players = [ServerPlayer(PlayerID(character, character.name), channel)
+               for character, channel in zip(Character, channels)]
+    return GameManager(players, **kwargs), channels
+
+
+def suggest_from(game: GameManager, channels: list[RecordingChannel], seat: int, room: Location,
+                 hands: dict[int, list[Card]] | None = None):
+    # Puts the seat in the room with a suggestion to make, dealing the given hands (empty for everyone else) if any.
+    # A game is started first if need be; what was sent so far is cleared.
+    if game.state is None:
+        game.start_game()
+    state = game.state
+    if hands is not None:
+        state = state._replace(hands=tuple(card_mask(hands.get(s, [])) for s in range(len(game.players))))
+        for s, player in enumerate(game.players):
+            player.cards = hands.get(s, [])
+    positions = list(state.positions)
+    positions[state.characters[seat]] = to_index(room.get_position())
+    game.state = state._replace(seat=seat, phase=Phase.MOVED, positions=tuple(positions))
+    game.current_player = game.players[seat]
+    for channel in channels:
+        channel.received.clear()
 
 
 class MyTestCase(unittest.TestCase):
+    SUGGESTION = (Character.PLUM, Weapon.ROPE, Location.HALL)
+
+    def setUp(self):
+        self.enterContext(contextlib.redirect_stdout(io.StringIO()))
+
+    def test_server_resolved_disprove_skips_players_without_cards(self):
+        game, channels = make_game(4, server_resolved_disprove=True)
+        suggest_from(game, channels, 0, Location.HALL, {
+            2: [Card.new_weapon_card(Weapon.ROPE), Card.new_weapon_card(Weapon.DAGGER)],
+            3: [Card.new_location_card(Location.HALL)]})
+        game.suggest(Suggest(game.players[0].player_id, self.SUGGESTION))
+        # nobody is asked, the only choice is made by the server; only the suggester is shown the card
+        self.assertEqual([m.name for m in channels[0].received], [Suggest.name, Disprove.name])
+        disprove: Disprove = channels[0].received[-1]
+        self.assertEqual(disprove.player_id, game.players[2].player_id)
+        self.assertEqual(disprove.card.card_value, Weapon.ROPE.value)
+        for channel in channels[1:]:
+            self.assertEqual([m.name for m in channel.received], [Suggest.name, Disproved.name])
+            self.assertEqual(channel.received[-1].player_id, game.players[2].player_id)
+            self.assertEqual(channel.received[-1].suggester, game.players[0].player_id)
+
+    def test_server_resolved_disprove_asks_player_with_a_choice(self):
+        game, channels = make_game(3, server_resolved_disprove=True)
+        suggest_from(game, channels, 0, Location.HALL,
+                     {2: [Card.new_weapon_card(Weapon.ROPE), Card.new_location_card(Location.HALL)]})
+        game.suggest(Suggest(game.players[0].player_id, self.SUGGESTION))
+        self.assertEqual([m.name for m in channels[1].received], [Suggest.name])
+        self.assertEqual([m.name for m in channels[2].received], [Suggest.name, RequestDisprove.name])
+
+    def test_server_resolved_disprove_without_matching_cards(self):
+        game, channels = make_game(3, server_resolved_disprove=True)
+        suggest_from(game, channels, 1, Location.HALL, {})
+        game.suggest(Suggest(game.players[1].player_id, self.SUGGESTION))
+        disprove: Disprove = channels[1].received[-1]
+        self.assertIsNone(disprove.card)
+        self.assertEqual(disprove.player_id, game.players[1].player_id)
+        disproved: Disproved = channels[0].received[-1]
+        self.assertEqual(disproved.player_id, game.players[1].player_id)
+
+    def test_disprove_round_trips_by_default(self):
+        game, channels = make_game(3)
+        suggest_from(game, channels, 0, Location.HALL, {2: [Card.new_weapon_card(Weapon.ROPE)]})
+        game.suggest(Suggest(game.players[0].player_id, self.SUGGESTION))
+        self.assertEqual([m.name for m in channels[1].received], [Suggest.name, RequestDisprove.name])
+
+    def test_dealt_hands_and_accusation_use_the_winning_cards(self):
+        game, channels = make_game(3)
+        game.start_game()
+        hands = [set(player.cards) for player in game.players]
+        self.assertEqual(sum(len(hand) for hand in hands), 18)
+        self.assertFalse(set.union(*hands) & set(cards_in(game.state.solution)))
+        character, weapon, location = (card.member for card in cards_in(game.state.solution))
+        game.accuse(game.players[0], Accuse(game.players[0].player_id, (character, weapon, location)))
+        self.assertEqual(channels[1].received[-1].name, EndGame.name)
+
+    def test_deduction_keeps_the_solution_and_narrows_it_down(self):
+        game, channels = make_game(4, server_resolved_disprove=True)
+        game.start_game()
+        players = [player.player_id for player in game.players]
+        engines = [DeductionEngine(players, player.player_id, player.cards) for player in game.players]
+        character, weapon, location = (card.member for card in cards_in(game.state.solution))
+        rng = random.Random(11)
+        for turn in range(40):
+            suggester = game.players[turn % 4]
+            suggest = Suggest(suggester.player_id,
+                              (rng.choice(list(Character)), rng.choice(list(Weapon)), rng.choice(list(Location))))
+            suggest_from(game, [], turn % 4, suggest.suggestion[2])
+            received = [len(channel.received) for channel in channels]
+            game.suggest(suggest)
+            asked = [p for p, c in zip(game.players, channels) if c.received[-1].name == RequestDisprove.name]
+            if asked:
+                # the disprover has a choice, pick the first matching card
+                holder = asked[0]
+                game.disprove(Disprove(holder.player_id, [c for c in holder.cards if c.matches(suggest.suggestion)][0],
+                                       suggest))
+            for engine, channel, start in zip(engines, channels, received):
+                [engine.observe(message) for message in channel.received[start:]]
+                self.assertIn((character, weapon, location), engine.possible_solutions())
+        self.assertTrue(all(len(engine.possible_solutions()) < 324 // 4 for engine in engines))
+
+    def test_illegal_actions_are_rejected(self):
+        game, channels = make_game(3)
+        game.start_game()
+        for channel in channels:
+            channel.received.clear()
+        scarlet, mustard = game.players[0].player_id, game.players[1].player_id
+        game.move(game.players[1], Move(mustard, (1, 4)))  # not Mustard's turn
+        suggest = Suggest(scarlet, self.SUGGESTION)
+        game.suggest(suggest)  # Scarlet is in a hallway
+        game.move(game.players[0], Move(scarlet, (4, 4)))  # not next to Scarlet's hallway
+        self.assertEqual([m.name for m in channels[1].received], [Rejected.name])
+        self.assertEqual([m.name for m in channels[0].received], [Rejected.name, Rejected.name])
+        self.assertEqual(channels[0].received[0].action_uuid, suggest.uuid)
+        self.assertEqual(channels[2].received, [])
+        self.assertEqual(game.board.get_player_position(scarlet), Character.SCARLET.get_starting_position())
+        move = Move(scarlet, Location.HALL.get_position())
+        game.move(game.players[0], move)
+        game.end_turn(EndTurn(scarlet))  # has to suggest in the Hall first
+        self.assertEqual([m.name for m in channels[2].received], [Move.name])
+        self.assertEqual(game.board.get_player_position(scarlet), Location.HALL.get_position())
+        self.assertEqual(channels[0].received[-1].name, Rejected.name)
+
+    def test_simulated_games_are_reproducible(self):
+        policies = ["deduction", "random", "deduction"]
+        first, second = play_game(5, policies), play_game(5, policies)
+        self.assertIsNotNone(first.winner)
+        self.assertEqual(repr(first), repr(second))
+        self.assertEqual(repr(play_game(5, policies, server_resolved_disprove=True)),
+                         repr(play_game(5, policies, server_resolved_disprove=True)))
+
+    def test_logged_games_replay_through_the_rules(self):
+        with tempfile.TemporaryDirectory() as directory:
+            writer = EventLogWriter(directory)
+            with contextlib.redirect_stdout(io.StringIO()):
+                results = [play_game(seed, ["deduction", "random", "deduction"], server_resolved_disprove=seed % 2,
+                                     event_log=writer.open(seed)) for seed in range(6)]
+            writer.close()
+            for result in results:
+                state, _ = replay(Path(directory) / f"game-{result.seed}.log")
+                self.assertEqual(state.winner, -1 if result.winner is None else result.winner)
+
+    def test_a_log_that_cannot_be_written_does_not_stop_the_others(self):
+        with tempfile.TemporaryDirectory() as directory:
+            (Path(directory) / "game-0.log").mkdir()
+            writer = EventLogWriter(directory)
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                results = [play_game(seed, ["deduction", "random"], event_log=writer.open(seed)) for seed in range(2)]
+                writer.close()
+            self.assertIn("game-0.log", output.getvalue())
+            state, _ = replay(Path(directory) / "game-1.log")
+            self.assertEqual(state.winner, -1 if results[1].winner is None else results[1].winner)
+
+    def test_bots_play_over_the_loopback_transport(self):
+        server = LoopbackServer()
+        connections = [LoopbackConnection(server, queue.SimpleQueue()) for _ in range(3)]
+        bots = {}
+        ended = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i, connection in enumerate(connections):
+                connection.join_game(nickname=f"bot-{i}")
+            for connection in connections:
+                connection.ready()
+            while len(ended) < len(connections):
+                for connection in connections:
+                    while not connection.message_queue.empty():
+                        message = connection.message_queue.get()
+                        if isinstance(message, AssignPlayerID):
+                            bots[connection] = Bot(message.player_id, DeductionPolicy(), random.Random(1))
+                        elif isinstance(message, EndGame):
+                            ended.append(message)
+                        [connection.Send(action) for action in bots[connection].receive(message)]
+        self.assertEqual(len(ended), 3)
+        self.assertIs(ended[0], ended[1])  # recipients share the message object, nothing was encoded
+        self.assertEqual(server.metrics.serializations, 0)
+
+    def test_disconnected_bot_resumes_its_seat(self):
+        server = LoopbackServer()
+        connections = [LoopbackConnection(server, queue.SimpleQueue()) for _ in range(3)]
+        dropped = connections[1]
+        bots, tokens = {}, {}
+        ended = []
+
+        def pump():
+            pending = True
+            while pending:
+                pending = False
+                for connection in list(connections):
+                    while not connection.message_queue.empty():
+                        pending = True
+                        message = connection.message_queue.get()
+                        if isinstance(message, AssignPlayerID):
+                            bots[connection] = Bot(message.player_id, DeductionPolicy(), random.Random(1))
+                            tokens[connection] = (message.game_id, message.session_token)
+                        elif isinstance(message, EndGame):
+                            ended.append(message)
+                        [connection.Send(action) for action in bots[connection].receive(message)]
+                        if isinstance(message, DealCards) and connection is dropped:
+                            connection.close()
+                            connections.remove(connection)
+                            break
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i, connection in enumerate(connections):
+                connection.join_game(nickname=f"bot-{i}")
+            for connection in connections:
+                connection.ready()
+            pump()  # the game stops at the dropped bot's turn, or at its disprove
+            self.assertEqual(ended, [])
+            bot = bots[dropped]
+            resumed = LoopbackConnection(server, queue.SimpleQueue())
+            game_id, token = tokens[dropped]
+            resumed.Send(ResumeGame(game_id, token, bot.player_id.nickname))
+            state = resumed.message_queue.get_nowait()
+            self.assertIsInstance(state, ResumeState)
+            game_manager = server.registry.games[game_id].game_manager
+            self.assertEqual(state.cards, bot.cards)
+            for player_id in bot.players:
+                self.assertEqual(state.board.get_player_position(player_id),
+                                 game_manager.board.get_player_position(player_id))
+            self.assertTrue(state.pending_disprove is not None or state.current_player == bot.player_id)
+            bots[resumed] = bot
+            connections.append(resumed)
+            [resumed.Send(action) for action in bot.receive(state)]
+            pump()
+        self.assertEqual(len(ended), 3)
+
+    def test_a_seat_that_is_gone_is_rejected_before_joining_a_lobby(self):
+        server = LoopbackServer()
+        connection = LoopbackConnection(server, queue.SimpleQueue())
+        resume = ResumeGame(7, "no-such-token", "late")
+        with contextlib.redirect_stdout(io.StringIO()):
+            connection.Send(resume)
+        rejected = connection.message_queue.get_nowait()
+        self.assertIsInstance(rejected, Rejected)
+        self.assertEqual((rejected.action, rejected.action_uuid), (ResumeGame.name, resume.uuid))
+        self.assertIsInstance(connection.message_queue.get_nowait(), AssignPlayerID)
+
+    def test_network_thread_that_fails_reports_a_disconnected_connection(self):
+        class BrokenConnection(LoopbackConnection):
+            def update(self, timeout=0.0):
+                raise OSError("connection reset")
+
+        woken = threading.Event()
+        network = NetworkThread(lambda host, port, arrivals: BrokenConnection(LoopbackServer(), arrivals), "", 0,
+                                queue.SimpleQueue(), on_message=woken.set)
+        self.assertTrue(woken.wait(1))
+        self.assertFalse(network.connected)
+        network.close()
+
+    def test_movement_options_include_secret_passage_and_skip_occupied_hallways(self):
+        plum, green = PlayerID(Character.PLUM, "plum"), PlayerID(Character.GREEN, "green")
+        board = Board(players=[plum, green])
+        board.move(plum, (0, 0))
+        board.move(green, (1, 0))
+        self.assertEqual(board.get_movement_options(plum),
+                         [(Direction.RIGHT, (0, 1)), (Direction.SECRET_PASSAGEWAY, (4, 4))])
+
+    def test_compact_board_follows_the_same_rules(self):
+        players = [PlayerID(character, character.name) for character in Character]
+        board, compact = Board(players=players), CompactBoard(players=players)
+        rng = random.Random(8)
+        for _ in range(200):
+            player_id = rng.choice(players)
+            options = board.get_movement_options(player_id)
+            self.assertEqual(compact.get_movement_options(player_id), options)
+            if options:
+                _, position = rng.choice(options)
+                board.move(player_id, position)
+                compact.move(player_id, position)
+        copy = CompactBoard.from_board(board).copy()
+        for player_id in players:
+            self.assertEqual(copy.get_player_position(player_id), board.get_player_position(player_id))
+            self.assertEqual(copy.is_in_room(player_id), board.is_in_room(player_id))
 
 
 if __name__ == '__main__':
@@ -1,6 +1,14 @@
+import pickle
 import unittest
 
-from messages.messages import BaseMessage, JoinGame
+from PodSixNet.rencode import dumps, loads
+
+from clueless.model.board import Board
+from clueless.model.board_enums import Character, Weapon, Location, CardType
+from clueless.model.card import Card
+from clueless.model.player import PlayerID
+from messages.framing import FrameReader, encode_frame
+from messages.messages import BaseMessage, JoinGame, Suggest, Disprove, StartGame, YourTurn
 
 
 class MyTestCase(unittest.TestCase):
@@ -16,3 +24,50 @@ class MyTestCase(unittest.TestCase):
         deserialized: JoinGame = JoinGame.deserialize(serialized)
         self.assertEqual(deserialized.uuid, original.uuid)
         self.assertEqual(deserialized.nickname, original.nickname)
+
+    def test_disprove_round_trip(self):
+        player_id = PlayerID(Character.PLUM, "Alice")
+        suggest = Suggest(player_id=player_id, suggestion=(Character.SCARLET, Weapon.ROPE, Location.HALL))
+        original = Disprove(player_id=PlayerID(Character.GREEN, "Bob"),
+                            card=Card.new_weapon_card(Weapon.ROPE),
+                            suggest=suggest)
+        deserialized: Disprove = Disprove.deserialize(original.serialize())
+        self.assertEqual(deserialized.name, "ClientAction_disprove")
+        self.assertEqual(deserialized.player_id, original.player_id)
+        self.assertEqual((deserialized.card.card_type, deserialized.card.card_value), (CardType.WEAPON, "Rope"))
+        self.assertEqual(deserialized.suggest.uuid, suggest.uuid)
+        self.assertEqual(deserialized.suggest.suggestion, suggest.suggestion)
+
+    def test_start_game_round_trip(self):
+        players = [PlayerID(character, character.name) for character in Character]
+        board = Board(players=players)
+        board.move(players[0], (0, 4))
+        deserialized: StartGame = StartGame.deserialize(StartGame(board=board).serialize())
+        for player_id in players:
+            self.assertEqual(deserialized.board.get_player_position(player_id), board.get_player_position(player_id))
+        self.assertTrue(deserialized.board.is_in_room(players[0]))
+
+    def test_payload_smaller_than_pickle(self):
+        original = YourTurn(turn_id=3, player_id=PlayerID(Character.SCARLET, "Alice"))
+        self.assertLess(len(original.serialize()["payload"]), len(pickle.dumps(original).hex()) // 4)
+
+    def test_survives_podsixnet_encoding(self):
+        original = YourTurn(turn_id=200, player_id=PlayerID(Character.WHITE, "Zoë"))
+        deserialized: YourTurn = YourTurn.deserialize(loads(dumps(original.serialize())))
+        self.assertEqual(deserialized.uuid, original.uuid)
+        self.assertEqual(deserialized.turn_id, 200)
+        self.assertEqual(deserialized.player_id, original.player_id)
+
+    def test_frames_split_across_reads(self):
+        originals = [YourTurn(turn_id=turn, player_id=PlayerID(Character.WHITE, "Zoë" * turn)) for turn in range(40)]
+        stream = b"".join(encode_frame(message) for message in originals)
+        reader = FrameReader(capacity=16)
+        received = []
+        for start in range(0, len(stream), 7):
+            chunk = stream[start:start + 7]
+            with reader.writable(len(chunk)) as buffer:
+                buffer[:len(chunk)] = chunk
+            reader.advance(len(chunk))
+            received.extend(reader.messages())
+        self.assertEqual([message.uuid for message in received], [message.uuid for message in originals])
+        self.assertEqual(received[-1].player_id, originals[-1].player_id)
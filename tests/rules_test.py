@@ -0,0 +1,54 @@
+import random
+import unittest
+
+from clueless.model.board import Board
+from clueless.model.board_enums import Character, Weapon, Location
+from clueless.model.card import cards_in
+from clueless.model.compact_board import to_position
+from clueless.model.player import PlayerID
+from clueless.model.rules import new_game, legal_actions, apply, Phase, IllegalAction, MoveAction, SuggestAction, \
+    AccuseAction, EndTurnAction, position_of
+
+PLAYERS = [PlayerID(character, character.name) for character in list(Character)[:3]]
+
+
+class MyTestCase(unittest.TestCase):
+    def test_random_playouts_only_take_legal_actions(self):
+        for seed in range(20):
+            rng = random.Random(seed)
+            state = new_game(PLAYERS, rng)
+            for _ in range(300):
+                actions = legal_actions(state, accusations=False)
+                if not actions:
+                    break
+                previous, state = state, apply(state, rng.choice(actions))
+                self.assertIsNot(previous, state)
+            self.assertNotEqual(state.phase, Phase.GAME_OVER)
+
+    def test_moves_match_the_board(self):
+        state = new_game(PLAYERS, random.Random(1))
+        board = Board(players=[PlayerID(character, character.name) for character in Character])
+        moves = [to_position(action.position) for action in legal_actions(state) if type(action) is MoveAction]
+        self.assertEqual(moves, [position for _, position in board.get_movement_options(PLAYERS[0])])
+
+    def test_suggestion_and_accusations(self):
+        state = new_game(PLAYERS, random.Random(2))
+        with self.assertRaises(IllegalAction):
+            apply(state, EndTurnAction(1))
+        state = apply(state, MoveAction(0, 2))  # Scarlet moves into the Hall
+        with self.assertRaises(IllegalAction):
+            apply(state, EndTurnAction(0))  # has to suggest in a room
+        state = apply(state, SuggestAction(0, Character.PLUM, Weapon.ROPE))
+        self.assertEqual(position_of(state, 1), 2)  # Plum was brought to the Hall
+        while state.phase == Phase.DISPROVING:
+            state = apply(state, legal_actions(state)[0])
+        character, weapon, location = (card.member for card in cards_in(state.solution))
+        wrong_location = next(room for room in Location if room != location)
+        state = apply(state, AccuseAction(0, character, weapon, wrong_location))
+        self.assertEqual((state.seat, state.active), (1, 0b110))
+        state = apply(state, AccuseAction(1, character, weapon, location))
+        self.assertEqual((state.phase, state.winner), (Phase.GAME_OVER, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import asyncio
+import contextlib
+import io
+import multiprocessing
+import socket
+import sys
+import time
+import unittest
+
+from clueless.client.bot_client import run_load
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def serve(port: int, workers: int):
+    from sharded_server import ShardedClueServer
+    with contextlib.redirect_stdout(io.StringIO()):
+        ShardedClueServer(port=port, workers=workers).Launch()
+
+
+@unittest.skipUnless(sys.platform.startswith("linux"), "the sharded runtime passes sockets between processes")
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.enterContext(contextlib.redirect_stdout(io.StringIO()))
+        self.port = free_port()
+        self.server = multiprocessing.get_context("fork").Process(target=serve, args=(self.port, 2))
+        self.server.start()
+        self.addCleanup(self.server.join)
+        self.addCleanup(self.server.terminate)
+        for _ in range(100):
+            try:
+                socket.create_connection(("127.0.0.1", self.port)).close()
+                return
+            except ConnectionRefusedError:
+                time.sleep(0.05)
+        self.fail("sharded server did not start")
+
+    def test_lobbies_smaller_than_a_full_game_are_not_split_across_workers(self):
+        stats = asyncio.run(run_load("127.0.0.1", self.port, bots=12, lobby_size=4, policies=["random"],
+                                     timeout=30))
+        self.assertEqual(stats.errors, {})
+        self.assertEqual((stats.games_started, stats.games_finished), (3, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()